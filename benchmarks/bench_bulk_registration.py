@@ -0,0 +1,46 @@
+"""
+Compare the registration throughput of a large generated module, registering
+each service with its own call against registering the whole batch at once.
+
+    python benchmarks/bench_bulk_registration.py [number of services]
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import sys
+import time
+
+from tinyioc.container import IocContainer
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideSingleton
+from tinyioc.types import ServiceLifetime
+
+
+class TenantModule(IocModule):
+    pass
+
+
+def main(count: int) -> None:
+    classes = [type(f"Service{n}", (), {}) for n in range(count)]
+    provides = [ProvideSingleton(cls, tenant=n) for n, cls in enumerate(classes)]
+
+    container = IocContainer()
+    container.register_module(TenantModule)
+    start = time.perf_counter()
+    for provide in provides:
+        container.register_service(provide.entry, ServiceLifetime.SINGLETON, TenantModule, None, provide.kwargs)
+    one_by_one = time.perf_counter() - start
+
+    container = IocContainer()
+    container.register_module(TenantModule)
+    start = time.perf_counter()
+    container.register_many(provides, TenantModule)
+    bulk = time.perf_counter() - start
+
+    print(f"{count} services")
+    print(f"  register_service: {one_by_one * 1000:8.2f} ms  ({count / one_by_one:12,.0f} services/s)")
+    print(f"  register_many:    {bulk * 1000:8.2f} ms  ({count / bulk:12,.0f} services/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,122 @@
+"""
+Compare the generated wiring (`python -m tinyioc.codegen`) with the dynamic container:
+the cold start of a process registering the services and resolving one of each, and the
+latency of resolving a transient service with two singleton dependencies. The cold start excludes
+importing the services, which costs the same to both.
+
+    python benchmarks/bench_codegen.py [number of services]
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import timeit
+
+# The services are plain dataclasses, auto-wired by the container: the wiring imports them
+# without importing the registrations
+SERVICES_HEADER = textwrap.dedent("""
+    from dataclasses import dataclass
+
+
+    class Config:
+        def __init__(self, url="sqlite://"):
+            self.url = url
+""")
+
+SERVICE = textwrap.dedent("""
+
+    @dataclass
+    class Repository{n}:
+        config: Config
+
+
+    @dataclass
+    class Handler{n}:
+        repository: Repository{n}
+        config: Config
+""")
+
+REGISTRY = textwrap.dedent("""
+    from tinyioc import ServiceLifetime, register_singleton, register_transient
+    from app import services
+
+    register_singleton(services.Config, url="postgres://db")
+    for n in range({count}):
+        register_singleton(getattr(services, f"Repository{{n}}"))
+        register_transient(getattr(services, f"Handler{{n}}"))
+""")
+
+# Both workers import the services first: the cold start is the time spent wiring them, and building one of each
+DYNAMIC_WORKER = textwrap.dedent("""
+    import time
+    from app import services
+    from tinyioc import get_service
+    start = time.perf_counter()
+    import app.registry
+    for n in range({count}):
+        get_service(getattr(services, f"Handler{{n}}"))
+    print(time.perf_counter() - start)
+""")
+
+GENERATED_WORKER = textwrap.dedent("""
+    import time
+    from app import services
+    import tinyioc
+    start = time.perf_counter()
+    from app import wiring
+    for n in range({count}):
+        getattr(wiring, f"get_handler{{n}}")()
+    print(time.perf_counter() - start)
+""")
+
+
+def run_worker(code: str, cwd: str, runs: int = 5) -> float:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([cwd, os.getcwd()]))
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True,
+                             capture_output=True, text=True).stdout
+        timings.append(float(out))
+    return min(timings)
+
+
+def main(count: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        package = os.path.join(root, "app")
+        os.mkdir(package)
+        open(os.path.join(package, "__init__.py"), "w").close()
+        with open(os.path.join(package, "services.py"), "w") as f:
+            f.write(SERVICES_HEADER + "".join(SERVICE.format(n=n) for n in range(count)))
+        with open(os.path.join(package, "registry.py"), "w") as f:
+            f.write(REGISTRY.format(count=count))
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.getcwd()]))
+        subprocess.run([sys.executable, "-m", "tinyioc.codegen", "app.registry", "-o", "app/wiring.py"],
+                       cwd=root, env=env, check=True)
+        # Deployed apps load their modules from the bytecode cache, rather than compiling them
+        subprocess.run([sys.executable, "-m", "compileall", "-q", "app"], cwd=root, check=True)
+
+        dynamic = run_worker(DYNAMIC_WORKER.format(count=count), root)
+        generated = run_worker(GENERATED_WORKER.format(count=count), root)
+        print(f"{count * 2 + 1} services")
+        print(f"{'':>10} {'cold start ms':>14} {'resolve ns':>11}")
+
+        sys.path.insert(0, root)
+        import app.registry  # noqa: F401
+        from app import services, wiring
+        from tinyioc.container import IocContainer
+
+        get = IocContainer.get_instance().get
+        number = 100000
+        dynamic_ns = timeit.timeit(lambda: get(services.Handler0), number=number) / number * 1e9
+        generated_ns = timeit.timeit(wiring.get_handler0, number=number) / number * 1e9
+        print(f"{'dynamic':>10} {dynamic * 1000:>14.1f} {dynamic_ns:>11.0f}")
+        print(f"{'generated':>10} {generated * 1000:>14.1f} {generated_ns:>11.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,58 @@
+"""
+Measure the cost of the sampled instrumentation on an injected function: with sampling disabled,
+with a low sampling rate, where most calls only increment a counter, and with every call sampled.
+
+    python benchmarks/bench_instrumentation.py [calls]
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import sys
+import time
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.instrumentation import enable_injection_sampling, disable_injection_sampling
+
+
+class Clock:
+    pass
+
+
+class Repository:
+    pass
+
+
+@inject()
+def handler(clock: Clock, repository: Repository):
+    return clock
+
+
+def measure(count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        handler()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main(count: int) -> None:
+    container = IocContainer.get_instance()
+    container.register_service(Clock)
+    container.register_service(Repository)
+    container.validate([handler])
+
+    disabled_us = measure(count)
+    enable_injection_sampling(0.001)
+    sampled_us = measure(count)
+    enable_injection_sampling(1)
+    always_us = measure(count)
+    disable_injection_sampling()
+
+    print(f"{'sampling':>10} {'us/call':>8}")
+    print(f"{'disabled':>10} {disabled_us:>8.3f}")
+    print(f"{'0.1%':>10} {sampled_us:>8.3f}")
+    print(f"{'100%':>10} {always_us:>8.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
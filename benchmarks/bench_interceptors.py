@@ -0,0 +1,50 @@
+"""
+Measure the cost of calling a method of an intercepted service, against
+calling it on the raw instance.
+
+    python benchmarks/bench_interceptors.py
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import timeit
+
+from tinyioc.container import IocContainer
+from tinyioc.types import ServiceLifetime
+
+
+class Repository:
+    def find(self, key):
+        return key
+
+
+class InterceptedRepository(Repository):
+    pass
+
+
+def passthrough(method):
+    def wrapper(*args, **kwargs):
+        return method(*args, **kwargs)
+    return wrapper
+
+
+def main() -> None:
+    container = IocContainer()
+    container.register_service(Repository, ServiceLifetime.SINGLETON)
+    container.register_service(InterceptedRepository, ServiceLifetime.SINGLETON)
+    container.add_interceptor(passthrough, iface=InterceptedRepository)
+
+    raw = container.get(Repository)
+    intercepted = container.get(InterceptedRepository)
+    number = 1_000_000
+
+    raw_time = min(timeit.repeat(lambda: raw.find(1), number=number, repeat=5))
+    intercepted_time = min(timeit.repeat(lambda: intercepted.find(1), number=number, repeat=5))
+
+    print(f"  raw call:          {raw_time / number * 1e9:8.1f} ns")
+    print(f"  intercepted call:  {intercepted_time / number * 1e9:8.1f} ns")
+    print(f"  interception cost: {(intercepted_time - raw_time) / number * 1e9:8.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
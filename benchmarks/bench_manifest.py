@@ -0,0 +1,77 @@
+"""
+Compare the bootstrap time of a worker process that imports every module to
+register its services, against one that loads a manifest of the registrations.
+
+    python benchmarks/bench_manifest.py [number of service modules]
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+SERVICE_MODULE = textwrap.dedent("""
+    from tinyioc import injectable, ServiceLifetime
+
+    @injectable(ServiceLifetime.SINGLETON, url="sqlite://", timeout={n})
+    class Service{n}:
+        def __init__(self, url, timeout):
+            self.url = url
+            self.timeout = timeout
+""")
+
+IMPORT_WORKER = textwrap.dedent("""
+    import time
+    start = time.perf_counter()
+    import app
+    print(time.perf_counter() - start)
+""")
+
+MANIFEST_WORKER = textwrap.dedent("""
+    import time
+    start = time.perf_counter()
+    from tinyioc.manifest import load_manifest
+    load_manifest({path!r})
+    print(time.perf_counter() - start)
+""")
+
+
+def run_worker(code: str, cwd: str, runs: int = 5) -> float:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([cwd, os.getcwd()]))
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True,
+                             capture_output=True, text=True).stdout
+        timings.append(float(out))
+    return min(timings)
+
+
+def main(count: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        package = os.path.join(root, "app")
+        os.mkdir(package)
+        with open(os.path.join(package, "__init__.py"), "w") as f:
+            for n in range(count):
+                f.write(f"from app.service_{n} import Service{n}\n")
+        for n in range(count):
+            with open(os.path.join(package, f"service_{n}.py"), "w") as f:
+                f.write(SERVICE_MODULE.format(n=n))
+
+        manifest = os.path.join(root, "manifest.json")
+        subprocess.run([sys.executable, "-c", f"import app; from tinyioc.manifest import export_manifest; "
+                                              f"export_manifest({manifest!r})"],
+                       cwd=root, env=dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.getcwd()])), check=True)
+
+        imported = run_worker(IMPORT_WORKER, root)
+        loaded = run_worker(MANIFEST_WORKER.format(path=manifest), root)
+
+    print(f"{count} service modules")
+    print(f"  import and register:  {imported * 1000:8.2f} ms")
+    print(f"  load manifest:        {loaded * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
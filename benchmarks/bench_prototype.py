@@ -0,0 +1,54 @@
+"""
+Compare the cost of injecting a service with an expensive constructor (parsing a schema)
+with the transient lifetime, which runs the constructor every time, and with the prototype lifetime,
+which copies a template instance.
+
+    python benchmarks/bench_prototype.py [injections]
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import json
+import sys
+import time
+
+from tinyioc.container import IocContainer
+from tinyioc.types import ServiceLifetime
+
+SCHEMA = json.dumps({
+    "fields": [{"name": f"field{i}", "type": "string", "required": i % 2 == 0, "max_length": 64} for i in range(200)]
+})
+
+
+class Validator:
+    def __init__(self):
+        schema = json.loads(SCHEMA)
+        self.fields = {field["name"]: field for field in schema["fields"]}
+        self.required = frozenset(name for name, field in self.fields.items() if field["required"])
+        self.errors = []
+
+
+def measure(container: IocContainer, service: type, count: int) -> float:
+    get = container.get
+    start = time.perf_counter()
+    for _ in range(count):
+        get(service)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main(count: int) -> None:
+    transient = IocContainer()
+    transient.register_service(Validator, ServiceLifetime.TRANSIENT)
+    prototype = IocContainer()
+    prototype.register_service(Validator, ServiceLifetime.PROTOTYPE)
+
+    transient_us = measure(transient, Validator, count)
+    prototype_us = measure(prototype, Validator, count)
+    print(f"{'lifetime':>10} {'us/injection':>14}")
+    print(f"{'transient':>10} {transient_us:>14.2f}")
+    print(f"{'prototype':>10} {prototype_us:>14.2f}")
+    print(f"prototype is {transient_us / prototype_us:.0f}x faster")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,75 @@
+"""
+Compare the cost of a function injected with a per-call resource, provided by a generator factory,
+with the same function entering the resource in a hand-written `with` block, and with a function
+injected with a transient service, without setup and teardown.
+
+    python benchmarks/bench_resources.py [calls]
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import contextlib
+import sys
+import time
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.types import ServiceLifetime
+
+
+class Transaction:
+    pass
+
+
+class PlainTransaction(Transaction):
+    """The transient service, registered apart from the resource"""
+
+
+def transaction():
+    tx = Transaction()
+    yield tx
+
+
+def create_transaction() -> PlainTransaction:
+    return PlainTransaction()
+
+
+def measure(fn, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main(count: int) -> None:
+    container = IocContainer.get_instance()
+    container.register_factory(transaction, register_for=Transaction)
+    container.register_factory(create_transaction, ServiceLifetime.TRANSIENT)
+
+    @inject()
+    def injected(tx: Transaction):
+        return tx
+
+    @inject()
+    def transient(tx: PlainTransaction):
+        return tx
+
+    managed = contextlib.contextmanager(transaction)
+
+    def handwritten():
+        with managed() as tx:
+            return tx
+
+    container.validate([injected, transient])
+    transient_us = measure(transient, count)
+    injected_us = measure(injected, count)
+    handwritten_us = measure(handwritten, count)
+    print(f"{'call':>12} {'us/call':>8}")
+    print(f"{'transient':>12} {transient_us:>8.2f}")
+    print(f"{'resource':>12} {injected_us:>8.2f}")
+    print(f"{'with block':>12} {handwritten_us:>8.2f}")
+    print(f"setup and teardown: {injected_us - transient_us:.2f}us injected, {handwritten_us:.2f}us by hand")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,62 @@
+"""
+Measure the resolution throughput of the container with 1, 2, 4, 8 and 16 threads,
+for singleton and transient services. On a free-threaded build of CPython (3.13t)
+the throughput should scale with the number of cores.
+
+    python benchmarks/bench_threads.py [resolutions per thread]
+
+Run it from the repository root, with tinyioc importable (e.g. `pip install -e .`).
+"""
+
+import sys
+import sysconfig
+import threading
+import time
+
+from tinyioc.container import IocContainer
+from tinyioc.types import ServiceLifetime
+
+
+class SingletonService:
+    pass
+
+
+class TransientService:
+    pass
+
+
+def measure(container: IocContainer, service: type, threads: int, count: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def resolve():
+        get = container.get
+        barrier.wait()
+        for _ in range(count):
+            get(service)
+
+    workers = [threading.Thread(target=resolve) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * count / (time.perf_counter() - start)
+
+
+def main(count: int) -> None:
+    container = IocContainer()
+    container.register_service(SingletonService, ServiceLifetime.SINGLETON)
+    container.register_service(TransientService, ServiceLifetime.TRANSIENT)
+
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(f"Python {sys.version.split()[0]}, {'free-threaded' if free_threaded else 'with GIL'}")
+    print(f"{'threads':>8} {'singleton/s':>14} {'transient/s':>14}")
+    for threads in (1, 2, 4, 8, 16):
+        singleton = measure(container, SingletonService, threads, count)
+        transient = measure(container, TransientService, threads, count)
+        print(f"{threads:>8} {singleton:>14,.0f} {transient:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
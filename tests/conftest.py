@@ -0,0 +1,7 @@
+import tinyioc.testing
+
+
+def pytest_configure(config):
+    # The fixtures plugin is registered by its entry point once tinyioc is installed
+    if not config.pluginmanager.has_plugin("tinyioc"):
+        config.pluginmanager.register(tinyioc.testing, "tinyioc")
@@ -0,0 +1,70 @@
+import time
+
+from tinyioc.decorators import injectable, cached_method
+from tinyioc.helpers import IocContainer, get_service, replace_service, unregister_service
+from tinyioc.module.module import GlobalModule
+
+
+@injectable()
+class FeatureFlags:
+    def __init__(self):
+        self.evaluations = 0
+
+    @cached_method(maxsize=2)
+    def is_enabled(self, flag: str) -> bool:
+        self.evaluations += 1
+        return flag.startswith("new")
+
+    @cached_method(ttl=0.05)
+    def snapshot(self) -> int:
+        self.evaluations += 1
+        return self.evaluations
+
+
+def test_cached_method():
+    flags = get_service(FeatureFlags)
+    assert flags.is_enabled("new_ui")
+    assert flags.is_enabled("new_ui")
+    assert not flags.is_enabled("old_ui")
+    assert flags.evaluations == 2
+
+    # The third key evicts the least recently used one
+    flags.is_enabled("beta")
+    flags.is_enabled("new_ui")
+    assert flags.evaluations == 4
+
+    stats = IocContainer.get_instance().stats()[GlobalModule][FeatureFlags]["method_caches"]["is_enabled"]
+    assert stats == {"hits": 1, "misses": 4, "evictions": 2, "size": 2}
+
+
+def test_cached_method_ttl():
+    flags = get_service(FeatureFlags)
+    first = flags.snapshot()
+    assert flags.snapshot() == first
+    time.sleep(0.06)
+    assert flags.snapshot() != first
+
+
+def test_cached_method_cleared():
+    flags = get_service(FeatureFlags)
+    flags.is_enabled("new_ui")
+
+    replace_service(FeatureFlags, FeatureFlags())
+    evaluations = flags.evaluations
+    flags.is_enabled("new_ui")
+    assert flags.evaluations == evaluations + 1
+
+    unregister_service(FeatureFlags)
+
+
+def test_cached_method_keyword_arguments():
+    class Scores:
+        @cached_method()
+        def score(self, *args, **kwargs):
+            return args, kwargs
+
+    scores = Scores()
+    assert scores.score(x=1) == ((), {"x": 1})
+    # Positional arguments looking like the key of keyword arguments don't collide with them
+    assert scores.score((), frozenset({("x", 1)})) == (((), frozenset({("x", 1)})), {})
+    assert scores.score(x=1) == ((), {"x": 1})
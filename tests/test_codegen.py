@@ -0,0 +1,135 @@
+import importlib.util
+from dataclasses import dataclass
+
+import pytest
+
+from tinyioc.codegen import generate_wiring
+from tinyioc.decorators import inject
+from tinyioc.module.module import IocModule, FromModule
+from tinyioc.types import ServiceLifetime
+
+
+class Settings:
+    def __init__(self, url: str = "sqlite://"):
+        self.url = url
+
+
+class Clock:
+    pass
+
+
+class Audit:
+    pass
+
+
+class AuditModule(IocModule):
+    pass
+
+
+@dataclass
+class Repository:
+    settings: Settings
+    audit: Audit = FromModule(AuditModule)
+
+
+class Handler:
+    @inject()
+    def __init__(self, repository: Repository, clock: Clock):
+        self.repository = repository
+        self.clock = clock
+
+
+class Db:
+    pass
+
+
+class Sessions:
+    @inject()
+    def __init__(self, db: Db):
+        self.db = db
+
+
+@inject()
+def query(db: Db, sessions: Sessions):
+    return db, sessions
+
+
+@inject()
+def handle(name: str, handler: Handler):
+    return name, handler
+
+
+@inject()
+async def handle_async(handler: Handler):
+    return handler
+
+
+def load(source: str, path) -> object:
+    path.write_text(source)
+    spec = importlib.util.spec_from_file_location("generated_wiring", path)
+    wiring = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(wiring)
+    return wiring
+
+
+@pytest.fixture
+def wiring(ioc_container, tmp_path):
+    ioc_container.register_module(AuditModule)
+    ioc_container.register_service(Settings, kwargs={"url": "postgres://db"})
+    ioc_container.register_instance(Clock())
+    ioc_container.register_service(Audit, module=AuditModule)
+    ioc_container.register_service(Repository, ServiceLifetime.PROTOTYPE)
+    ioc_container.register_service(Handler, ServiceLifetime.TRANSIENT)
+    source = generate_wiring(ioc_container, [handle, handle_async])
+    compile(source, "wiring.py", "exec")
+    return load(source, tmp_path / "wiring.py")
+
+
+def test_codegen(wiring, ioc_container):
+    handler = wiring.get_handler()
+    assert handler is not wiring.get_handler()
+    # The registered instance is delegated to the container
+    assert handler.clock is ioc_container.get(Clock)
+    assert handler.repository.settings.url == "postgres://db"
+    assert handler.repository.settings is wiring.get_settings()
+    assert handler.repository.audit is wiring.get_audit_module_audit()
+    # Prototypes are copies of a template
+    assert wiring.get_repository() is not wiring.get_repository()
+    assert wiring.get(Settings) is wiring.get_settings()
+    assert wiring.get(Audit, AuditModule) is wiring.get_audit_module_audit()
+    assert wiring.get(Audit) is None
+
+    name, handler = wiring.handle("signup")
+    assert name == "signup"
+    assert isinstance(handler, Handler)
+    custom = Handler(repository=None, clock=None)
+    assert wiring.handle("signup", handler=custom)[1] is custom
+
+
+@pytest.mark.asyncio
+async def test_codegen_async(wiring):
+    assert isinstance(await wiring.handle_async(), Handler)
+
+
+def test_codegen_shared(ioc_container, tmp_path):
+    ioc_container.register_service(Db)
+    ioc_container.register_service(Sessions, ServiceLifetime.THREAD_LOCAL)
+    ioc_container.register_service(Repository, ServiceLifetime.PROTOTYPE)
+    ioc_container.register_service(Settings)
+    ioc_container.register_service(Audit, module=AuditModule)
+    wiring = load(generate_wiring(ioc_container, [query]), tmp_path / "wiring.py")
+    # The thread-local service is delegated, its dependency is wired statically: they share the singleton
+    db, sessions = wiring.query()
+    assert db is sessions.db
+    assert wiring.get_db() is ioc_container.get(Db)
+    # The prototype template is shared as well
+    assert wiring.get_repository().settings is ioc_container.get(Repository).settings
+
+
+def test_codegen_cli(tmp_path, capsys):
+    from tinyioc.codegen import main
+
+    main(["test_codegen", "-o", str(tmp_path / "wiring.py")])
+    source = (tmp_path / "wiring.py").read_text()
+    assert source.startswith('"""\nWiring generated by `python -m tinyioc.codegen test_codegen`')
+    compile(source, "wiring.py", "exec")
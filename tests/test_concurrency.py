@@ -0,0 +1,62 @@
+import threading
+import time
+
+from tinyioc.container import IocContainer
+from tinyioc.module.module import IocModule
+
+
+class SlowService:
+    instances = 0
+
+    def __init__(self):
+        SlowService.instances += 1
+        time.sleep(0.01)
+
+
+class ConcurrentModule(IocModule):
+    pass
+
+
+def test_singleton_built_once():
+    container = IocContainer()
+    container.register_service(SlowService)
+    barrier = threading.Barrier(8)
+    resolved = []
+
+    def resolve():
+        barrier.wait()
+        resolved.append(container.get(SlowService))
+
+    threads = [threading.Thread(target=resolve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowService.instances == 1
+    assert len(resolved) == 8
+    assert all(svc is resolved[0] for svc in resolved)
+
+
+def test_modules_changed_while_resolving():
+    container = IocContainer()
+    container.register_service(SlowService)
+    stop = threading.Event()
+    missing = []
+
+    def reader():
+        while not stop.is_set():
+            if container.get(SlowService) is None:
+                missing.append(True)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    for _ in range(200):
+        container.register_module(ConcurrentModule)
+        container.unregister_module(ConcurrentModule)
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert not missing
@@ -0,0 +1,127 @@
+import importlib
+import json
+import sys
+
+import pytest
+
+from tinyioc.config import load_config, configure_container
+from tinyioc.container import IocContainer
+from tinyioc.importing import import_object
+from tinyioc.ioc_exception import IocException
+CONFIG = '''
+[[services]]
+interface = "cfgapp.api:Storage"
+implementation = "cfgapp.heavy.SqlStorage"
+kwargs = { url = "sqlite://" }
+
+[[services]]
+implementation = "cfgapp.api:Clock"
+lifetime = "transient"
+
+[[modules]]
+path = "cfgapp.api:ReportModule"
+
+[[modules.services]]
+interface = "cfgapp.api:Reporter"
+implementation = "cfgapp.heavy:create_reporter"
+factory = true
+'''
+
+API = '''
+from tinyioc.module.module import IocModule
+
+
+class Storage:
+    pass
+
+
+class Clock:
+    pass
+
+
+class Reporter:
+    def __init__(self, storage):
+        self.storage = storage
+
+
+class ReportModule(IocModule):
+    pass
+'''
+
+HEAVY = '''
+from tinyioc.module.module import FromModule, GlobalModule
+from cfgapp.api import Storage, Reporter
+
+
+class SqlStorage(Storage):
+    def __init__(self, url: str):
+        self.url = url
+
+
+def create_reporter(storage: Storage = FromModule(GlobalModule)) -> Reporter:
+    return Reporter(storage)
+'''
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    package = tmp_path / "cfgapp"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "api.py").write_text(API)
+    (package / "heavy.py").write_text(HEAVY)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in ("cfgapp", "cfgapp.api", "cfgapp.heavy"):
+        sys.modules.pop(name, None)
+
+
+def test_toml_config(app):
+    path = app / "services.toml"
+    path.write_text(CONFIG)
+    container = IocContainer()
+    load_config(str(path), container)
+    assert "cfgapp.heavy" not in sys.modules
+
+    api = importlib.import_module("cfgapp.api")
+    assert container.get(api.Clock) is not container.get(api.Clock)
+    assert "cfgapp.heavy" not in sys.modules
+
+    storage = container.get(api.Storage)
+    assert "cfgapp.heavy" in sys.modules
+    assert storage.url == "sqlite://"
+    assert container.get(api.Storage) is storage
+
+    # The module binds its services when it's first used
+    assert container.get(api.Reporter) is None
+    assert container.get(api.Reporter, api.ReportModule).storage is storage
+
+
+def test_json_config(app):
+    path = app / "services.json"
+    path.write_text(json.dumps({"services": [
+        {"interface": "cfgapp.api:Storage", "implementation": "cfgapp.heavy:SqlStorage", "kwargs": {"url": "mem"}},
+    ]}))
+    container = IocContainer()
+    load_config(str(path), container)
+    assert container.get(import_object("cfgapp.api:Storage")).url == "mem"
+
+
+@pytest.mark.parametrize("config, message", [
+    ({"services": [{"interface": "a:B"}]}, r"services\[0\]: implementation"),
+    ({"services": [{"implementation": "a:B", "lifetime": "forever"}]}, "unknown lifetime"),
+    ({"services": [{"implementation": "a:B", "scope": "singleton"}]}, "unknown keys scope"),
+    ({"modules": [{"path": "a:M", "services": [{"implementation": "a:B", "module": "a:N"}]}]}, "enclosing module"),
+    ({"services": [{"implementation": "B"}]}, "not an import path"),
+])
+def test_invalid_config(config, message):
+    container = IocContainer()
+    with pytest.raises(IocException, match=message):
+        configure_container(config, container)
+
+
+def test_unsupported_format(tmp_path):
+    path = tmp_path / "services.yaml"
+    path.write_text("")
+    with pytest.raises(IocException):
+        load_config(str(path), IocContainer())
@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from tinyioc.container import IocContainer
+from tinyioc.ioc_exception import IocValidationException
+from tinyioc.module.module import IocModule, FromModule
+from tinyioc.types import ServiceLifetime
+
+
+class Settings:
+    pass
+
+
+class Cache:
+    pass
+
+
+class CacheModule(IocModule):
+    pass
+
+
+@dataclass
+class Repository:
+    settings: Settings
+    cache: Cache = field(default=FromModule(CacheModule))
+    table: str = "users"
+    tags: list = field(default_factory=list)
+
+
+def test_dataclass_injection():
+    container = IocContainer()
+    container.register_module(CacheModule)
+    settings = Settings()
+    cache = Cache()
+    container.register_instance(settings)
+    container.register_instance(cache, CacheModule)
+    container.register_service(Repository, ServiceLifetime.TRANSIENT)
+
+    repository = container.get(Repository)
+    assert repository.settings is settings
+    assert repository.cache is cache
+    assert repository.table == "users"
+    assert repository.tags == []
+    # The plan is computed once, at registration
+    assert [name for name, _, _ in container.lookup(Repository).plan] == ["settings", "cache"]
+    container.validate([])
+
+
+def test_dataclass_kwargs():
+    container = IocContainer()
+    container.register_module(CacheModule)
+    custom = Settings()
+    container.register_service(Repository, kwargs={"settings": custom, "table": "accounts"})
+    container.register_service(Cache, module=CacheModule)
+
+    repository = container.get(Repository)
+    assert repository.settings is custom
+    assert repository.table == "accounts"
+    assert isinstance(repository.cache, Cache)
+
+
+def test_dataclass_validation():
+    container = IocContainer()
+    container.register_service(Repository)
+
+    with pytest.raises(IocValidationException) as e:
+        container.validate([])
+    assert len(e.value.errors) == 2
+
+
+def test_attrs_injection():
+    attr = pytest.importorskip("attr")
+
+    @attr.s(auto_attribs=True)
+    class Mailer:
+        _settings: Settings
+        sender: str = "noreply@example.com"
+
+    container = IocContainer()
+    settings = Settings()
+    container.register_instance(settings)
+    container.register_service(Mailer)
+
+    mailer = container.get(Mailer)
+    assert mailer._settings is settings
+    assert mailer.sender == "noreply@example.com"
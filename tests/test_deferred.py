@@ -0,0 +1,59 @@
+from tinyioc.decorators import injectable
+from tinyioc.deferred import Deferred, ServiceRef
+from tinyioc.helpers import register_instance, register_transient, unregister_service, get_service
+
+
+class Database:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class Repository:
+    def __init__(self, database: Database, config: dict):
+        self.database = database
+        self.config = config
+
+
+def test_deferred_kwargs():
+    loads = []
+
+    def load_config():
+        loads.append(True)
+        return {"debug": True}
+
+    @injectable(config=Deferred(load_config))
+    class ApiService:
+        def __init__(self, config: dict):
+            self.config = config
+
+    # Nothing is evaluated until the service is built
+    assert not loads
+    svc = get_service(ApiService)
+    assert svc.config == {"debug": True}
+    assert get_service(ApiService) is svc
+    assert len(loads) == 1
+
+    unregister_service(ApiService)
+
+
+def test_service_ref_transient():
+    loads = []
+
+    def load_config():
+        loads.append(True)
+        return {"pool": 5}
+
+    register_transient(Repository, database=ServiceRef(Database), config=Deferred(load_config, memoize=True))
+    register_instance(Database("sqlite://"))
+
+    first = get_service(Repository)
+    second = get_service(Repository)
+    assert first is not second
+    assert first.database.url == "sqlite://"
+    assert second.database is first.database
+    # The memoized value is computed once, and shared by the transient instances
+    assert first.config is second.config
+    assert len(loads) == 1
+
+    unregister_service(Repository)
+    unregister_service(Database)
@@ -0,0 +1,66 @@
+import contextvars
+import multiprocessing
+import os
+import pickle
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.executors import ContextThreadPoolExecutor, ContainerProcessPoolExecutor
+
+tenant = contextvars.ContextVar("tenant", default=None)
+
+
+class Greeter:
+    def __init__(self, greeting: str):
+        self.greeting = greeting
+
+    def greet(self, name: str) -> str:
+        return f"{self.greeting} {name} from {tenant.get()} in {os.getpid()}"
+
+
+@inject()
+def greet(name: str, greeter: Greeter):
+    return greeter.greet(name)
+
+
+def register_tenant():
+    tenant.set("worker")
+
+
+def test_pickle_injected_function():
+    assert pickle.loads(pickle.dumps(greet)) is greet
+
+
+def test_thread_pool(ioc_container):
+    ioc_container.register_service(Greeter, kwargs={"greeting": "hi"})
+    token = tenant.set("acme")
+    try:
+        with ContextThreadPoolExecutor(2) as executor:
+            results = list(executor.map(greet, ["ann", "bob"]))
+    finally:
+        tenant.reset(token)
+    assert results == [f"hi ann from acme in {os.getpid()}", f"hi bob from acme in {os.getpid()}"]
+
+
+def test_process_pool():
+    container = IocContainer()
+    container.register_service(Greeter, kwargs={"greeting": "hello"})
+
+    with ContainerProcessPoolExecutor(1, multiprocessing.get_context("spawn"), register_tenant,
+                                      container=container) as executor:
+        result = executor.submit(greet, "ann").result(timeout=60)
+    assert result.startswith("hello ann from worker in ")
+    assert result != f"hello ann from worker in {os.getpid()}"
+
+
+def test_forked_process_pool(ioc_container):
+    ioc_container.register_service(Greeter, kwargs={"greeting": "hey"})
+
+    class LocalService:
+        pass
+
+    # The forked workers inherit the registry, including the services that can't be exported
+    ioc_container.register_service(LocalService)
+    with ContainerProcessPoolExecutor(1, multiprocessing.get_context("fork")) as executor:
+        result = executor.submit(greet, "bob").result(timeout=60)
+    assert result.startswith("hey bob from None in ")
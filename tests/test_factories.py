@@ -0,0 +1,120 @@
+import pytest
+
+from tinyioc.helpers import register_instance, register_factory, unregister_service, get_service, \
+    get_service_async, unregister_module
+from tinyioc.decorators import inject
+from tinyioc.ioc_exception import IocException
+from tinyioc.module.decorators import module
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideInstance, ProvideFactory
+from tinyioc.types import ServiceLifetime
+
+
+class Settings:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class Engine:
+    def __init__(self, url: str, pool_size: int):
+        self.url = url
+        self.pool_size = pool_size
+
+
+def create_engine(settings: Settings) -> Engine:
+    return Engine(settings.url, pool_size=5)
+
+
+def test_factory_singleton():
+    register_instance(Settings("sqlite://"))
+    register_factory(create_engine, register_for=Engine)
+
+    called = False
+
+    @inject()
+    def test_fun(engine: Engine):
+        nonlocal called
+        assert engine.url == "sqlite://"
+        assert engine.pool_size == 5
+        called = True
+
+    test_fun()
+    assert called
+    assert get_service(Engine) is get_service(Engine)
+
+    unregister_service(Engine)
+    unregister_service(Settings)
+
+
+def test_factory_return_annotation():
+    register_instance(Settings("sqlite://"))
+    register_factory(create_engine)
+
+    @inject()
+    def test_fun(engine: Engine):
+        return engine
+
+    assert test_fun().url == "sqlite://"
+
+    def create_settings():
+        return Settings("sqlite://")
+
+    with pytest.raises(IocException):
+        register_factory(create_settings)
+
+    unregister_service(Engine)
+    unregister_service(Settings)
+
+
+def test_factory_transient():
+    register_instance(Settings("sqlite://"))
+    register_factory(create_engine, ServiceLifetime.TRANSIENT, register_for=Engine)
+
+    assert get_service(Engine) is not get_service(Engine)
+
+    unregister_service(Engine)
+    unregister_service(Settings)
+
+
+def test_factory_module():
+    @module()
+    class DbModule(IocModule):
+        provides = [
+            ProvideInstance(Settings("postgres://")),
+            ProvideFactory(create_engine, provide_for=Engine)
+        ]
+
+    engine = get_service(Engine, DbModule)
+    assert engine.url == "postgres://"
+    assert get_service(Engine) is None
+
+    unregister_module(DbModule)
+
+
+@pytest.mark.asyncio
+async def test_async_factory():
+    async def create_async_engine(settings: Settings) -> Engine:
+        return Engine(settings.url, pool_size=10)
+
+    register_instance(Settings("sqlite://"))
+    register_factory(create_async_engine, register_for=Engine)
+
+    with pytest.raises(IocException):
+        get_service(Engine)
+
+    called = False
+
+    @inject()
+    async def test_fun(engine: Engine):
+        nonlocal called
+        assert engine.pool_size == 10
+        called = True
+
+    await test_fun()
+    assert called
+    assert await get_service_async(Engine) is await get_service_async(Engine)
+    # Once built, the singleton is available synchronously too
+    assert get_service(Engine) is not None
+
+    unregister_service(Engine)
+    unregister_service(Settings)
@@ -0,0 +1,57 @@
+from tinyioc.helpers import IocContainer, register_singleton, register_transient, unregister_service, unregister_module, \
+    get_services, get_service
+from tinyioc.module.decorators import module
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideSingleton
+
+
+class ServiceA:
+    pass
+
+
+class ServiceB:
+    pass
+
+
+class Missing:
+    pass
+
+
+def test_get_many():
+    register_singleton(ServiceA)
+    register_transient(ServiceB)
+
+    a, b, missing = get_services((ServiceA, ServiceB, Missing))
+    assert a is get_service(ServiceA)
+    assert isinstance(b, ServiceB)
+    assert missing is None
+
+    unregister_service(ServiceA)
+    unregister_service(ServiceB)
+
+
+def test_resolver():
+    @module()
+    class ResolverModule(IocModule):
+        provides = [
+            ProvideSingleton(ServiceA),
+            ProvideSingleton(ServiceB)
+        ]
+
+    resolve = IocContainer.get_instance().resolver((ServiceA, ServiceB), ResolverModule)
+    first = resolve()
+    assert isinstance(first[0], ServiceA)
+    assert isinstance(first[1], ServiceB)
+    assert resolve() == first
+
+    # The cached entries follow the changes of the registry
+    container = IocContainer.get_instance()
+    container.unregister(ServiceB, ResolverModule)
+    assert resolve() == (first[0], None)
+    container.register_service(ServiceB, module=ResolverModule)
+    second = resolve()
+    assert isinstance(second[1], ServiceB) and second[1] is not first[1]
+    container.release_singletons(ResolverModule)
+    assert resolve()[0] is not first[0]
+
+    unregister_module(ResolverModule)
@@ -0,0 +1,122 @@
+import json
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.graph import main
+from tinyioc.module.module import GlobalModule, IocModule, FromModule
+from tinyioc.types import ServiceLifetime
+
+
+class Settings:
+    pass
+
+
+class Database:
+    @inject()
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+
+class Repository:
+    pass
+
+
+class Mailer:
+    pass
+
+
+class Audit:
+    pass
+
+
+class AuditModule(IocModule):
+    pass
+
+
+def create_repository(database: Database, audit: Audit = FromModule(AuditModule)) -> Repository:
+    return Repository()
+
+
+def test_graph():
+    container = IocContainer()
+    container.register_module(AuditModule)
+    container.register_service(Settings)
+    container.register_service(Database, ServiceLifetime.TRANSIENT)
+    container.register_factory(create_repository, register_for=Repository)
+    container.register_service(Mailer)
+
+    @inject()
+    def handler(repository: Repository, mailer: Mailer, retries: int = 3):
+        pass
+
+    graph = container.graph([handler])
+    # The plain arguments are not services
+    assert (GlobalModule, int) not in graph.nodes
+    assert "Missing services: AuditModule/Audit" in graph.summary().splitlines()
+    repository = (GlobalModule, Repository)
+    database = (GlobalModule, Database)
+    assert [node.name for node in graph.dependencies(repository)] == ["GlobalModule/Database", "AuditModule/Audit"]
+    assert graph.fan_in(database) == 1
+    assert graph.fan_out(repository) == 2
+    assert graph.depth(repository) == 2
+    assert [node.name for node in graph.critical_path()] == \
+        ["GlobalModule/Repository", "GlobalModule/Database", "GlobalModule/Settings"]
+    # The audit service is required, but not registered
+    assert not graph.nodes[(AuditModule, Audit)].registered
+    assert graph.unused() == []
+    assert graph.cycles() == []
+
+    # Without the handler, nothing depends on the mailer and the repository, which were never built
+    graph = container.graph([])
+    assert {node.name for node in graph.unused()} == {"GlobalModule/Repository", "GlobalModule/Mailer"}
+    container.get(Mailer)
+    assert [node.name for node in container.graph([]).unused()] == ["GlobalModule/Repository"]
+
+    data = json.loads(graph.to_json())
+    assert {"from": "GlobalModule/Database", "to": "GlobalModule/Settings"} in data["edges"]
+    assert data["critical_path"][0] == "GlobalModule/Repository"
+    dot = graph.to_dot()
+    assert dot.startswith("digraph tinyioc {")
+    assert '"GlobalModule/Repository" -> "GlobalModule/Database";' in dot
+
+
+class ServiceC:
+    pass
+
+
+class ServiceD:
+    pass
+
+
+def create_c(service_d: ServiceD) -> ServiceC:
+    return ServiceC()
+
+
+def create_d(service_c: ServiceC) -> ServiceD:
+    return ServiceD()
+
+
+def test_graph_cycles():
+    container = IocContainer()
+    container.register_factory(create_c, register_for=ServiceC)
+    container.register_factory(create_d, register_for=ServiceD)
+
+    graph = container.graph([])
+    cycles = graph.cycles()
+    assert len(cycles) == 1
+    assert [node.name for node in cycles[0]] == ["GlobalModule/ServiceC", "GlobalModule/ServiceD",
+                                                 "GlobalModule/ServiceC"]
+    assert graph.depth((GlobalModule, ServiceC)) == 1
+
+
+def test_graph_cli(tmp_path, capsys):
+    IocContainer.get_instance().register_service(Mailer)
+    try:
+        main(["tests.test_graph", "--format", "json", "--output", str(tmp_path / "graph.json")])
+        data = json.loads((tmp_path / "graph.json").read_text())
+        assert "GlobalModule/Mailer" in [node["id"] for node in data["nodes"]]
+
+        main(["tests.test_graph"])
+        assert "services" in capsys.readouterr().out
+    finally:
+        IocContainer.get_instance().unregister(Mailer)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from tinyioc.decorators import inject
+from tinyioc.helpers import register_instance
+from tinyioc.instrumentation import LatencyHistogram, enable_injection_sampling, disable_injection_sampling, \
+    dump_injection_stats, reset_injection_stats
+from tinyioc.ioc_exception import IocException
+
+
+class Clock:
+    pass
+
+
+@pytest.fixture
+def sampling():
+    reset_injection_stats()
+    yield enable_injection_sampling
+    disable_injection_sampling()
+    reset_injection_stats()
+
+
+def test_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.5) == 0
+    for _ in range(90):
+        histogram.record(0.000010)
+    for _ in range(10):
+        histogram.record(0.002)
+    histogram.record(1e-9)
+    histogram.record(1000.0)
+    assert histogram.count == 102
+    assert 0.000010 <= histogram.quantile(0.5) <= 0.000010 * 1.125
+    assert 0.002 <= histogram.quantile(0.95) <= 0.002 * 1.125
+    assert histogram.quantile(1) == 1000.0
+    # Constant memory, whatever the number of records
+    assert len(histogram.counts) == len(LatencyHistogram().counts)
+
+    for seconds in (1e-7, 3.3e-6, 0.0421, 7.5):
+        bound = LatencyHistogram.upper_bound(LatencyHistogram.bucket(seconds))
+        assert seconds < bound <= seconds * 1.25
+
+
+def test_sampling(ioc_container, sampling):
+    register_instance(Clock())
+
+    @inject()
+    def handler(clock: Clock):
+        time.sleep(0.001)
+        return clock
+
+    # Without sampling, nothing is recorded
+    disable_injection_sampling()
+    handler()
+    assert json.loads(dump_injection_stats())["functions"] == []
+
+    sampling(0.25)
+    for _ in range(8):
+        assert isinstance(handler(), Clock)
+    stats = json.loads(dump_injection_stats())
+    assert stats["sampling_rate"] == 0.25
+    [entry] = stats["functions"]
+    assert entry["function"].endswith("test_sampling.<locals>.handler")
+    assert entry["calls"] == 8
+    assert entry["sampled"] == 2
+    assert entry["body_seconds"]["count"] == 2
+    assert entry["body_seconds"]["sum"] >= 0.002
+    assert entry["overhead_seconds"]["sum"] < entry["body_seconds"]["sum"]
+
+    prometheus = dump_injection_stats("prometheus")
+    assert "# TYPE tinyioc_injection_overhead_seconds histogram" in prometheus
+    assert 'tinyioc_injection_body_seconds_count{function="test_instrumentation.test_sampling.<locals>.handler"} 2' \
+        in prometheus
+    assert 'le="+Inf"} 2' in prometheus
+
+    with pytest.raises(IocException):
+        dump_injection_stats("xml")
+    with pytest.raises(IocException):
+        enable_injection_sampling(0)
+
+
+def test_async_sampling(ioc_container, sampling):
+    register_instance(Clock())
+    sampling(1)
+
+    @inject()
+    async def handler(clock: Clock):
+        await asyncio.sleep(0.001)
+        return clock
+
+    assert isinstance(asyncio.run(handler()), Clock)
+    [entry] = json.loads(dump_injection_stats())["functions"]
+    assert entry["sampled"] == 1
+    assert entry["body_seconds"]["sum"] >= 0.001
@@ -0,0 +1,104 @@
+import functools
+
+from tinyioc.container import IocContainer
+from tinyioc.module.module import IocModule
+from tinyioc.types import ServiceLifetime
+
+
+class InterceptedModule(IocModule):
+    pass
+
+
+class Repository:
+    def __init__(self):
+        self.calls = 0
+
+    def find(self, key: str) -> str:
+        self.calls += 1
+        return key.upper()
+
+
+class Plain:
+    pass
+
+
+def recording(calls):
+    def interceptor(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            calls.append(method.__name__)
+            return method(*args, **kwargs)
+        return wrapper
+    return interceptor
+
+
+def test_interceptor():
+    container = IocContainer()
+    container.register_module(InterceptedModule)
+    container.register_service(Repository, ServiceLifetime.TRANSIENT)
+    container.register_service(Repository, ServiceLifetime.TRANSIENT, InterceptedModule)
+    container.register_service(Plain)
+
+    calls = []
+    container.add_interceptor(recording(calls), iface=Repository, module=InterceptedModule)
+
+    repository = container.get(Repository, InterceptedModule)
+    assert isinstance(repository, Repository)
+    assert repository.find("a") == "A"
+    assert repository.calls == 1
+    assert calls == ["find"]
+
+    # Services without interceptors are returned untouched
+    assert type(container.get(Repository)) is Repository
+    assert type(container.get(Plain)) is Plain
+
+    # The subclass is generated once per class and set of interceptors
+    assert type(container.get(Repository, InterceptedModule)) is type(repository)
+
+
+def test_interceptor_order():
+    container = IocContainer()
+    container.register_service(Repository, ServiceLifetime.TRANSIENT)
+
+    calls = []
+
+    def outer(method):
+        def wrapper(*args, **kwargs):
+            calls.append("outer")
+            return method(*args, **kwargs)
+        return wrapper
+
+    def inner(method):
+        def wrapper(*args, **kwargs):
+            calls.append("inner")
+            return method(*args, **kwargs)
+        return wrapper
+
+    container.add_interceptor(outer, iface=Repository)
+    container.add_interceptor(inner, iface=Repository)
+    container.get(Repository).find("a")
+    assert calls == ["outer", "inner"]
+
+    container.remove_interceptor(outer, iface=Repository)
+    container.remove_interceptor(inner, iface=Repository)
+    assert type(container.get(Repository)) is Repository
+
+
+def test_interceptor_builtin_instances():
+    container = IocContainer()
+    container.register_module(InterceptedModule)
+
+    def create_settings() -> dict:
+        return {"debug": True}
+
+    container.register_factory(create_settings, module=InterceptedModule)
+    container.register_factory(lambda: True, register_for=bool, module=InterceptedModule)
+    container.register_service(Repository, ServiceLifetime.TRANSIENT, InterceptedModule)
+    calls = []
+    container.add_interceptor(recording(calls), module=InterceptedModule)
+
+    # The instances whose class can't be switched are left untouched
+    assert container.get(dict, InterceptedModule) == {"debug": True}
+    assert container.get(bool, InterceptedModule) is True
+    assert container.get(Repository, InterceptedModule).find("a") == "A"
+    assert calls == ["find"]
@@ -0,0 +1,153 @@
+import importlib
+import sys
+import threading
+
+import pytest
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.ioc_exception import IocException, IocValidationException
+from tinyioc.module.module import FromModule
+
+API = '''
+class PaymentGateway:
+    pass
+'''
+
+PAYMENTS = '''
+import threading
+
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideSingleton
+from lazypay_api import PaymentGateway
+
+imports = 0
+imports += 1
+
+
+class StripeGateway(PaymentGateway):
+    def __init__(self):
+        # Widen the window of the concurrent first requests
+        threading.Event().wait(0.02)
+
+
+class PaymentsModule(IocModule):
+    provides = [ProvideSingleton(StripeGateway, PaymentGateway)]
+'''
+
+SLOW = '''
+import lazypay_api
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideSingleton
+
+lazypay_api.importing.set()
+lazypay_api.proceed.wait(5)
+
+
+class SlowModule(IocModule):
+    provides = [ProvideSingleton(lazypay_api.PaymentGateway)]
+'''
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    (tmp_path / "lazypay_api.py").write_text(API)
+    (tmp_path / "lazypay.py").write_text(PAYMENTS)
+    (tmp_path / "lazyslow.py").write_text(SLOW)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module("lazypay_api")
+    sys.modules.pop("lazypay", None)
+    sys.modules.pop("lazyslow", None)
+    sys.modules.pop("lazypay_api", None)
+
+
+def test_lazy_module(api):
+    container = IocContainer()
+    container.register_module_lazy("lazypay:PaymentsModule")
+    assert "lazypay" not in sys.modules
+    with pytest.raises(IocException):
+        container.register_module_lazy("lazypay:PaymentsModule")
+
+    gateway = container.get(api.PaymentGateway, "lazypay:PaymentsModule")
+    lazypay = sys.modules["lazypay"]
+    assert isinstance(gateway, lazypay.StripeGateway)
+    assert isinstance(container.get_module("lazypay:PaymentsModule"), lazypay.PaymentsModule)
+    assert container.get(api.PaymentGateway, lazypay.PaymentsModule) is gateway
+    assert container.get(api.PaymentGateway) is None
+
+    container.unregister_module("lazypay:PaymentsModule")
+    assert container.get_module(lazypay.PaymentsModule) is None
+
+
+def test_from_module_path(api, monkeypatch):
+    container = IocContainer()
+    monkeypatch.setattr(IocContainer, "_IocContainer__instance", container)
+    container.register_module_lazy("lazypay:PaymentsModule")
+
+    @inject()
+    def checkout(gateway: api.PaymentGateway = FromModule("lazypay:PaymentsModule")):
+        return gateway
+
+    # The dependencies of a lazy module are only checked once it's imported
+    container.validate([checkout])
+    container.graph([checkout])
+    assert "lazypay" not in sys.modules
+
+    assert isinstance(checkout(), sys.modules["lazypay"].StripeGateway)
+    assert checkout() is checkout()
+    container.validate([checkout])
+
+
+def test_concurrent_first_requests(api):
+    container = IocContainer()
+    container.register_module_lazy("lazypay:PaymentsModule")
+    barrier = threading.Barrier(8)
+    results = []
+
+    def resolve():
+        barrier.wait()
+        results.append(container.get(api.PaymentGateway, "lazypay:PaymentsModule"))
+
+    threads = [threading.Thread(target=resolve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sys.modules["lazypay"].imports == 1
+    assert len({id(gateway) for gateway in results}) == 1
+    assert results[0] is not None
+
+
+def test_unregister_while_importing(api):
+    container = IocContainer()
+    container.register_module_lazy("lazyslow:SlowModule")
+    api.importing = threading.Event()
+    api.proceed = threading.Event()
+    # The import registers the module holding the import lock, while unregister waits for the import
+    importing = threading.Thread(target=container.get_module, args=("lazyslow:SlowModule",), daemon=True)
+    importing.start()
+    assert api.importing.wait(5)
+    unregistering = threading.Thread(target=container.unregister, args=(api.PaymentGateway, "lazyslow:SlowModule"),
+                                     daemon=True)
+    unregistering.start()
+    unregistering.join(0.05)
+    api.proceed.set()
+    importing.join(5)
+    unregistering.join(5)
+
+    assert not importing.is_alive() and not unregistering.is_alive()
+    assert container.lookup(api.PaymentGateway, "lazyslow:SlowModule") is None
+
+
+def test_unknown_lazy_module():
+    container = IocContainer()
+
+    @inject()
+    def checkout(gateway: object = FromModule("lazypay_missing:PaymentsModule")):
+        return gateway
+
+    with pytest.raises(IocValidationException, match="unknown module lazypay_missing:PaymentsModule"):
+        container.validate([checkout])
+    with pytest.raises(IocException):
+        container.get_module("lazypay_missing:PaymentsModule")
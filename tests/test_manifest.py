@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from tinyioc.container import IocContainer
+from tinyioc.ioc_exception import IocException
+from tinyioc.manifest import export_manifest, load_manifest, build_manifest, register_manifest
+from tinyioc.module.module import IocModule
+from tinyioc.types import ServiceLifetime
+
+
+class ManifestModule(IocModule):
+    pass
+
+
+class Repository:
+    pass
+
+
+class SqlRepository(Repository):
+    def __init__(self, url: str):
+        self.url = url
+
+
+class Clock:
+    pass
+
+
+class Reporter:
+    def __init__(self, repository: Repository):
+        self.repository = repository
+
+
+def create_reporter(repository: Repository = None) -> Reporter:
+    return Reporter(repository)
+
+
+def test_manifest_roundtrip(tmp_path):
+    source = IocContainer()
+    source.register_module(ManifestModule)
+    source.register_service(SqlRepository, module=ManifestModule, register_for=Repository,
+                            kwargs={"url": "sqlite://"})
+    source.register_service(Clock, ServiceLifetime.TRANSIENT)
+    source.register_factory(create_reporter, register_for=Reporter, module=ManifestModule)
+    source.register_instance(object())
+
+    path = str(tmp_path / "manifest.json")
+    export_manifest(path, source)
+
+    target = IocContainer()
+    load_manifest(path, target)
+
+    repository = target.get(Repository, ManifestModule)
+    assert isinstance(repository, SqlRepository)
+    assert repository.url == "sqlite://"
+    assert target.get(Repository) is None
+
+    assert target.get(Clock) is not target.get(Clock)
+    assert target.get(Reporter, ManifestModule).repository is repository
+
+    # Registering again the same binding, e.g. by importing the decorated class, is a no-op
+    target.register_service(Clock, ServiceLifetime.TRANSIENT)
+    with pytest.raises(IocException):
+        target.register_service(SqlRepository, register_for=Clock)
+
+
+def test_manifest_not_importable(tmp_path):
+    class LocalService:
+        pass
+
+    source = IocContainer()
+    source.register_service(LocalService)
+
+    with pytest.raises(IocException):
+        export_manifest(str(tmp_path / "manifest.json"), source)
+
+
+def test_manifest_lazy_services():
+    source = IocContainer()
+    source.register_lazy("test_manifest:Clock", "test_manifest:Clock", ServiceLifetime.TRANSIENT)
+    source.register_lazy("test_manifest:Repository", "test_manifest:SqlRepository",
+                         module="test_manifest:ManifestModule", kwargs={"url": "sqlite://"})
+
+    manifest = build_manifest(source)
+    assert len(manifest["services"]) == 2
+
+    target = IocContainer()
+    register_manifest(manifest, target)
+    assert target.get(Clock) is not target.get(Clock)
+    target.register_module(ManifestModule)
+    assert target.get(Repository, ManifestModule).url == "sqlite://"
+
+
+def test_unregister_lazy_service():
+    container = IocContainer()
+    container.register_lazy("test_manifest:Clock", "test_manifest:Clock")
+    container.unregister(Clock)
+    assert container.get(Clock) is None
+    assert build_manifest(container)["services"] == []
+
+
+def test_lazy_miss_without_lock():
+    container = IocContainer()
+    container.register_lazy("test_manifest:Clock", "test_manifest:Clock")
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with container._IocContainer__write_lock:
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    assert held.wait(5)
+    # The services missing from a module holding services registered by path are looked up without the lock
+    reader = threading.Thread(target=container.get, args=(Reporter,), daemon=True)
+    reader.start()
+    reader.join(1)
+    release.set()
+    holder.join()
+    assert not reader.is_alive()
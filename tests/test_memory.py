@@ -0,0 +1,105 @@
+import tracemalloc
+
+import pytest
+
+from tinyioc.decorators import inject
+from tinyioc.helpers import register_instance, register_singleton, register_transient, register_factory, get_service
+from tinyioc.ioc_exception import IocException
+from tinyioc.module.module import GlobalModule
+
+
+class Vocabulary:
+    pass
+
+
+class Model:
+    @inject()
+    def __init__(self, vocabulary: Vocabulary):
+        self.vocabulary = vocabulary
+        self.weights = [float(i) for i in range(10000)]
+
+
+class Tokenizer:
+    @inject()
+    def __init__(self, vocabulary: Vocabulary):
+        self.vocabulary = vocabulary
+        self.words = {str(i): i for i in range(1000)}
+
+
+class Settings:
+    pass
+
+
+def test_memory_report(ioc_container):
+    shared = [str(i) * 10 for i in range(1000)]
+
+    def create_vocabulary() -> Vocabulary:
+        vocabulary = Vocabulary()
+        vocabulary.words = shared
+        return vocabulary
+
+    register_factory(create_vocabulary, register_for=Vocabulary)
+    register_factory(lambda: {"table": shared}, register_for=Settings)
+    register_singleton(Model)
+    register_singleton(Tokenizer)
+    register_transient(list)
+    register_instance(Settings(), register_for=dict)
+
+    @inject()
+    def predict(model: Model, tokenizer: Tokenizer, settings: Settings):
+        return model
+
+    predict()
+    report = ioc_container.memory_report()
+    services = {service.iface: service for service in report.services}
+
+    assert services[Model].size > 80000
+    # The vocabulary is counted in its own service, not in those depending on it
+    assert services[Model].shared == 0
+    assert services[Vocabulary].shared > 0 and services[Settings].shared > 0
+    assert services[Tokenizer].shared == 0
+    assert report.shared == services[Vocabulary].shared
+    assert report.total == sum(service.size for service in report.services) + report.shared
+    assert report.services[0].iface is Model
+    assert list not in services
+    assert services[dict].pinned and not services[Model].pinned
+    assert report.by_module()[GlobalModule] == report.total - report.shared
+    assert "Model" in report.summary()
+    assert report.to_dict()["services"][0]["name"] == "GlobalModule/Model"
+
+
+def test_allocations(ioc_container):
+    register_singleton(Vocabulary)
+    register_singleton(Model)
+    tracemalloc.start()
+    try:
+        get_service(Model)
+    finally:
+        tracemalloc.stop()
+    report = {service.iface: service for service in ioc_container.memory_report().services}
+    assert report[Model].allocated > 80000
+    assert report[Vocabulary].allocated < 10000
+
+
+def test_release_singletons(ioc_container):
+    register_singleton(Vocabulary)
+    register_singleton(Model)
+    register_singleton(Tokenizer)
+    settings = Settings()
+    register_instance(settings)
+    model = get_service(Model)
+    vocabulary = get_service(Vocabulary)
+    get_service(Tokenizer)
+    ioc_container.pin(Vocabulary)
+
+    # The singletons built by other tests are released too
+    ours = {Vocabulary, Model, Tokenizer, Settings}
+    assert [iface for _, iface in ioc_container.release_singletons(min_size=80000) if iface in ours] == [Model]
+    assert get_service(Model) is not model
+    assert {iface for _, iface in ioc_container.release_singletons(GlobalModule) if iface in ours} == {Model, Tokenizer}
+    assert get_service(Vocabulary) is vocabulary
+    assert get_service(Settings) is settings
+    assert ioc_container.release_singletons() == []
+
+    with pytest.raises(IocException):
+        ioc_container.pin(list)
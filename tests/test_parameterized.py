@@ -0,0 +1,121 @@
+import dataclasses
+import gc
+import time
+
+import pytest
+
+from tinyioc.arguments import Arg
+from tinyioc.cache import LruCache
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.helpers import register_parameterized, register_factory, unregister_service, get_service, \
+    get_service_async
+from tinyioc.ioc_exception import IocException, IocValidationException
+from tinyioc.module.module import GlobalModule
+from tinyioc.types import ServiceLifetime
+
+
+class StorageClient:
+    def __init__(self, region: str, bucket: str, timeout: int = 10):
+        self.region = region
+        self.bucket = bucket
+        self.timeout = timeout
+
+
+def test_parameterized():
+    register_parameterized(StorageClient, timeout=30)
+
+    logs = get_service(StorageClient, args=("eu-west-1", "logs"))
+    assert (logs.region, logs.bucket, logs.timeout) == ("eu-west-1", "logs", 30)
+    assert get_service(StorageClient, args=("eu-west-1", "logs")) is logs
+    assert get_service(StorageClient, args=("us-east-1", "logs")) is not logs
+
+    @inject()
+    def export(client: StorageClient = Arg("eu-west-1", "logs")):
+        return client
+
+    assert export() is logs
+
+    stats = IocContainer.get_instance().stats()[GlobalModule][StorageClient]["instances"]
+    assert stats == {"hits": 2, "misses": 2, "evictions": 0, "size": 2}
+
+    unregister_service(StorageClient)
+
+
+def test_parameterized_dataclass_field():
+    @dataclasses.dataclass
+    class Exporter:
+        client: StorageClient = Arg("eu-west-1", "logs")
+
+    container = IocContainer()
+    container.register_service(StorageClient, ServiceLifetime.PARAMETERIZED)
+    container.register_service(Exporter)
+    assert container.get(Exporter).client is container.get(StorageClient, args=("eu-west-1", "logs"))
+
+
+def test_parameterized_eviction():
+    container = IocContainer()
+    container.register_service(StorageClient, ServiceLifetime.PARAMETERIZED, instance_cache=LruCache(maxsize=2))
+
+    first = container.get(StorageClient, args=("eu-west-1", "a"))
+    container.get(StorageClient, args=("eu-west-1", "b"))
+    container.get(StorageClient, args=("eu-west-1", "c"))
+    assert container.stats()[GlobalModule][StorageClient]["instances"]["evictions"] == 1
+    assert container.get(StorageClient, args=("eu-west-1", "a")) is not first
+
+
+def test_parameterized_ttl_and_weak():
+    container = IocContainer()
+    container.register_service(StorageClient, ServiceLifetime.PARAMETERIZED, instance_cache=LruCache(ttl=0.01))
+    first = container.get(StorageClient, args=("eu-west-1", "a"))
+    time.sleep(0.02)
+    assert container.get(StorageClient, args=("eu-west-1", "a")) is not first
+
+    container = IocContainer()
+    container.register_service(StorageClient, ServiceLifetime.PARAMETERIZED, instance_cache=LruCache(weak=True))
+    first = container.get(StorageClient, args=("eu-west-1", "a"))
+    assert container.get(StorageClient, args=("eu-west-1", "a")) is first
+    # Unused instances are released, and evicted
+    del first
+    gc.collect()
+    container.get(StorageClient, args=("eu-west-1", "a"))
+    assert container.stats()[GlobalModule][StorageClient]["instances"]["evictions"] == 1
+
+
+def test_parameterized_errors():
+    container = IocContainer()
+    container.register_service(StorageClient, kwargs={"region": "eu-west-1", "bucket": "logs"})
+    with pytest.raises(IocException):
+        container.get(StorageClient, args=("eu-west-1", "logs"))
+
+    @inject()
+    def export(client: StorageClient = Arg("eu-west-1", "logs")):
+        pass
+
+    with pytest.raises(IocValidationException):
+        container.validate([export])
+
+
+class Formatter:
+    def __init__(self, locale: str):
+        self.locale = locale
+
+
+@pytest.mark.asyncio
+async def test_parameterized_async_factory():
+    async def create_formatter(locale: str) -> Formatter:
+        return Formatter(locale)
+
+    register_factory(create_formatter, ServiceLifetime.PARAMETERIZED, register_for=Formatter)
+
+    italian = await get_service_async(Formatter, args=("it_IT",))
+    assert italian.locale == "it_IT"
+    assert await get_service_async(Formatter, args=("it_IT",)) is italian
+
+    @inject()
+    async def render(formatter: Formatter = Arg("en_US")):
+        return formatter
+
+    assert (await render()).locale == "en_US"
+
+    unregister_service(Formatter)
@@ -0,0 +1,125 @@
+import sys
+
+import pytest
+
+from tinyioc.decorators import inject, injectable
+from tinyioc.helpers import register_instance, activate_container, get_service
+from tinyioc.ioc_exception import IocException, IocValidationException
+from tinyioc.module.decorators import module
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideSingleton, ProvideInstance
+
+
+class MailService:
+    pass
+
+
+class SmtpMailService(MailService):
+    pass
+
+
+class FakeMailService(MailService):
+    pass
+
+
+def test_profiles(ioc_container):
+    injectable(register_for=MailService, profile="prod")(SmtpMailService)
+    injectable(register_for=MailService, profile="!prod")(FakeMailService)
+
+    # Nothing is registered until the container is activated
+    assert get_service(MailService) is None
+    with pytest.raises(IocValidationException, match="must be activated"):
+        ioc_container.validate([])
+
+    activate_container(["prod"])
+    assert ioc_container.profiles == frozenset({"prod"})
+    assert isinstance(get_service(MailService), SmtpMailService)
+
+    with pytest.raises(IocException):
+        activate_container(["local"])
+
+
+def test_default_profile(ioc_container):
+    injectable(register_for=MailService, profile="prod")(SmtpMailService)
+    injectable(register_for=MailService, profile="!prod")(FakeMailService)
+    activate_container()
+    assert isinstance(get_service(MailService), FakeMailService)
+
+
+def test_condition_evaluated_once(ioc_container):
+    calls = []
+
+    def enabled():
+        calls.append(1)
+        return True
+
+    register_instance(SmtpMailService(), register_for=MailService, when=enabled)
+    register_instance(FakeMailService(), register_for=MailService, when=lambda: False)
+    activate_container()
+
+    @inject()
+    def send(mail: MailService):
+        return mail
+
+    for _ in range(3):
+        assert isinstance(send(), SmtpMailService)
+    assert calls == [1]
+
+
+def test_registration_after_activation(ioc_container):
+    activate_container(["prod"])
+    register_instance(FakeMailService(), register_for=MailService, profile="local")
+    assert get_service(MailService) is None
+    register_instance(SmtpMailService(), register_for=MailService, profile=["local", "prod"])
+    assert isinstance(get_service(MailService), SmtpMailService)
+
+
+def test_lazy_loser_not_imported(ioc_container):
+    ioc_container.register_lazy("test_profiles:MailService", "tinyioc_missing.mail:SesMailService", profile="prod")
+    ioc_container.register_lazy("test_profiles:MailService", "test_profiles:FakeMailService", profile="local")
+    activate_container(["local"])
+    assert isinstance(get_service(MailService), FakeMailService)
+    assert "tinyioc_missing" not in sys.modules
+
+
+def test_ambiguous_profiles(ioc_container):
+    register_instance(SmtpMailService(), register_for=MailService, profile="prod")
+    register_instance(FakeMailService(), register_for=MailService, profile="!local")
+    with pytest.raises(IocException):
+        activate_container(["prod"])
+
+
+def test_module_providers(ioc_container):
+    @module()
+    class MailModule(IocModule):
+        provides = [
+            ProvideSingleton(SmtpMailService, MailService, profile="prod"),
+            ProvideInstance(FakeMailService(), MailService, profile="!prod"),
+            ProvideSingleton(SmtpMailService),
+        ]
+
+    assert get_service(SmtpMailService, MailModule) is not None
+    assert get_service(MailService, MailModule) is None
+    activate_container(["prod"])
+    assert isinstance(get_service(MailService, MailModule), SmtpMailService)
+
+
+def test_activation_all_or_nothing(ioc_container):
+    @module()
+    class NotifyModule(IocModule):
+        pass
+
+    register_instance(SmtpMailService(), register_for=MailService, module=NotifyModule, profile="prod")
+    register_instance(FakeMailService(), register_for=FakeMailService, profile="prod")
+    register_instance(FakeMailService(), register_for=FakeMailService)
+
+    # The conflicting registration fails the activation, without registering the others
+    with pytest.raises(IocException, match="already registered"):
+        activate_container(["prod"])
+    assert ioc_container.profiles is None
+    assert get_service(MailService, NotifyModule) is None
+
+    ioc_container.unregister(FakeMailService)
+    activate_container(["prod"])
+    assert isinstance(get_service(MailService, NotifyModule), SmtpMailService)
+    assert isinstance(get_service(FakeMailService), FakeMailService)
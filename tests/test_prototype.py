@@ -0,0 +1,61 @@
+import re
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.helpers import register_prototype, unregister_service
+from tinyioc.module.module import GlobalModule
+from tinyioc.types import ServiceLifetime
+
+
+class Tokenizer:
+    compiled = 0
+
+    def __init__(self, pattern: str):
+        Tokenizer.compiled += 1
+        self.regex = re.compile(pattern)
+        self.tokens = []
+
+
+def test_prototype():
+    Tokenizer.compiled = 0
+    register_prototype(Tokenizer, pattern=r"\w+")
+
+    @inject()
+    def tokenize(text: str, tokenizer: Tokenizer):
+        tokenizer.tokens = tokenizer.regex.findall(text)
+        return tokenizer
+
+    first = tokenize("hello world")
+    second = tokenize("ciao")
+    assert first is not second
+    assert first.tokens == ["hello", "world"]
+    assert second.tokens == ["ciao"]
+    # The copies share the compiled template state, the constructor ran once
+    assert first.regex is second.regex
+    assert Tokenizer.compiled == 1
+    assert IocContainer.get_instance().stats()[GlobalModule][Tokenizer]["constructed"] == 1
+
+    unregister_service(Tokenizer)
+
+
+class Schema:
+    def __init__(self):
+        self.fields = {"name": str}
+        self.errors = []
+
+    def __clone__(self):
+        clone = Schema.__new__(Schema)
+        clone.fields = self.fields
+        clone.errors = []
+        return clone
+
+
+def test_prototype_clone_hook():
+    container = IocContainer()
+    container.register_service(Schema, ServiceLifetime.PROTOTYPE)
+
+    first = container.get(Schema)
+    first.errors.append("name is required")
+    second = container.get(Schema)
+    assert second.errors == []
+    assert second.fields is first.fields
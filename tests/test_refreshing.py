@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tinyioc.helpers import IocContainer, register_refreshing, register_factory, unregister_service, get_service, \
+    get_service_async
+from tinyioc.ioc_exception import IocException
+from tinyioc.module.module import GlobalModule
+from tinyioc.types import ServiceLifetime
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+class Token:
+    issued = 0
+
+    def __init__(self):
+        Token.issued += 1
+        self.value = Token.issued
+
+
+def test_refreshing():
+    Token.issued = 0
+    register_refreshing(Token, refresh_interval=0.01)
+
+    first = get_service(Token)
+    assert first.value == 1
+    wait_for(lambda: get_service(Token) is not first)
+    assert get_service(Token).value > 1
+
+    stats = IocContainer.get_instance().stats()[GlobalModule][Token]
+    assert stats["lifetime"] == ServiceLifetime.REFRESHING
+    assert stats["refreshes"] >= 1
+    assert stats["refresh_failures"] == 0
+
+    # Unregistering the service stops its refresh
+    svc = IocContainer.get_instance().lookup(Token)
+    unregister_service(Token)
+    assert svc.refresher.stopped
+    issued = Token.issued
+    time.sleep(0.05)
+    assert Token.issued <= issued + 1
+
+
+class Config:
+    def __init__(self, version: int):
+        self.version = version
+
+
+def test_refresh_failures():
+    versions = iter([1])
+    release = threading.Event()
+
+    def load_config() -> Config:
+        # The first load succeeds, the next ones fail until released
+        try:
+            return Config(next(versions))
+        except StopIteration:
+            if release.is_set():
+                return Config(2)
+            raise RuntimeError("Config server unavailable")
+
+    register_factory(load_config, ServiceLifetime.REFRESHING, register_for=Config, refresh_interval=0.01)
+    container = IocContainer.get_instance()
+    assert get_service(Config).version == 1
+
+    wait_for(lambda: container.stats()[GlobalModule][Config]["refresh_failures"] >= 2)
+    # The current instance keeps being handed out while the refresh fails
+    assert get_service(Config).version == 1
+    assert isinstance(container.stats()[GlobalModule][Config]["last_refresh_error"], RuntimeError)
+
+    release.set()
+    wait_for(lambda: get_service(Config).version == 2)
+
+    unregister_service(Config)
+
+
+class Client:
+    pass
+
+
+@pytest.mark.asyncio
+async def test_async_refreshing():
+    built = []
+
+    async def connect() -> Client:
+        await asyncio.sleep(0)
+        built.append(Client())
+        return built[-1]
+
+    register_factory(connect, ServiceLifetime.REFRESHING, register_for=Client, refresh_interval=0.01)
+    first = await get_service_async(Client)
+    assert get_service(Client) is first
+
+    while len(built) < 2:
+        await asyncio.sleep(0.01)
+    assert await get_service_async(Client) is built[-1]
+
+    unregister_service(Client)
+
+
+def test_refresh_closed_loop():
+    container = IocContainer()
+
+    async def connect() -> Client:
+        return Client()
+
+    container.register_factory(connect, ServiceLifetime.REFRESHING, register_for=Client, refresh_interval=60)
+    asyncio.run(container.aget(Client))
+
+    svc_stats = container.stats()[GlobalModule][Client]
+    assert svc_stats["refresh_failures"] == 1
+    assert "event loop" in str(svc_stats["last_refresh_error"])
+    container.unregister(Client)
+
+
+def test_refresh_interval_required():
+    with pytest.raises(IocException):
+        register_refreshing(Token, refresh_interval=0)
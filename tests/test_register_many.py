@@ -0,0 +1,88 @@
+import pytest
+
+from tinyioc.container import IocContainer
+from tinyioc.ioc_exception import IocException
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideInstance, ProvideSingleton, ProvideTransient, ProvideFactory
+from tinyioc.types import ServiceLifetime
+
+
+class BulkModule(IocModule):
+    pass
+
+
+class ServiceA:
+    pass
+
+
+class ServiceB:
+    def __init__(self, number: int):
+        self.number = number
+
+
+class ServiceC:
+    pass
+
+
+def create_c() -> ServiceC:
+    return ServiceC()
+
+
+def test_register_many():
+    container = IocContainer()
+    container.register_module(BulkModule)
+    container.register_many([
+        ProvideInstance(ServiceA()),
+        ProvideTransient(ServiceB, number=5),
+        ProvideFactory(create_c, provide_for=ServiceC)
+    ], BulkModule)
+
+    assert isinstance(container.get(ServiceA, BulkModule), ServiceA)
+    assert container.get(ServiceB, BulkModule).number == 5
+    assert container.lookup(ServiceB, BulkModule).scope == ServiceLifetime.TRANSIENT
+    assert isinstance(container.get(ServiceC, BulkModule), ServiceC)
+
+
+def test_register_many_all_or_nothing():
+    container = IocContainer()
+    container.register_service(ServiceB, kwargs={"number": 1})
+
+    with pytest.raises(IocException):
+        container.register_many([
+            ProvideSingleton(ServiceA),
+            ProvideSingleton(ServiceB, number=2)
+        ])
+    assert container.get(ServiceA) is None
+    assert container.get(ServiceB).number == 1
+
+    with pytest.raises(IocException):
+        container.register_many([
+            ProvideSingleton(ServiceA),
+            ProvideSingleton(ServiceA)
+        ])
+    assert container.get(ServiceA) is None
+
+
+def test_register_many_conditional_all_or_nothing():
+    container = IocContainer()
+    container.register_service(ServiceB, kwargs={"number": 1})
+
+    with pytest.raises(IocException):
+        container.register_many([
+            ProvideSingleton(ServiceA, profile="prod"),
+            ProvideSingleton(ServiceB, number=2)
+        ])
+    container.activate(["prod"])
+    assert container.get(ServiceA) is None
+
+    # Once active, the enabled providers are part of the batch
+    with pytest.raises(IocException):
+        container.register_many([
+            ProvideSingleton(ServiceA),
+            ProvideSingleton(ServiceB, number=2, profile="prod")
+        ])
+    assert container.get(ServiceA) is None
+
+    container.register_many([ProvideSingleton(ServiceA), ProvideSingleton(ServiceC, profile="local")])
+    assert container.get(ServiceA) is not None
+    assert container.get(ServiceC) is None
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from tinyioc.helpers import IocContainer, register_instance, register_singleton, unregister_service, get_service
+from tinyioc.ioc_exception import IocException
+
+
+class Credentials:
+    def __init__(self, token: str = "initial"):
+        self.token = token
+
+
+class Endpoint:
+    pass
+
+
+class Dummy:
+    pass
+
+
+def test_replace():
+    register_singleton(Credentials)
+    old = get_service(Credentials)
+    disposed = []
+
+    IocContainer.get_instance().replace(Credentials, Credentials("rotated"), on_dispose=disposed.append)
+
+    assert get_service(Credentials).token == "rotated"
+    assert disposed == [old]
+
+    unregister_service(Credentials)
+
+    with pytest.raises(IocException):
+        IocContainer.get_instance().replace(Credentials, Credentials())
+
+
+def test_replace_many_concurrent_readers():
+    register_instance(Credentials("0"))
+    register_instance(Endpoint())
+    container = IocContainer.get_instance()
+
+    stop = threading.Event()
+    missing = []
+
+    def reader():
+        while not stop.is_set():
+            if container.get(Credentials) is None or container.get(Endpoint) is None:
+                missing.append(True)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+
+    for i in range(1, 500):
+        container.replace_many({Credentials: Credentials(str(i)), Endpoint: Endpoint()})
+
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert not missing
+    assert get_service(Credentials).token == "499"
+
+    with pytest.raises(IocException):
+        container.replace_many({Credentials: Credentials(), Dummy: Dummy()})
+    assert get_service(Credentials).token == "499"
+
+    unregister_service(Credentials)
+    unregister_service(Endpoint)
@@ -0,0 +1,294 @@
+import asyncio
+
+import pytest
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject
+from tinyioc.helpers import register_factory, get_service
+from tinyioc.ioc_exception import IocException, IocValidationException
+from tinyioc.module.module import GlobalModule
+from tinyioc.resources import Resource
+from tinyioc.types import ServiceLifetime
+
+
+class Transaction:
+    def __init__(self, log):
+        self.log = log
+
+
+class Lock:
+    pass
+
+
+def test_resources(ioc_container):
+    log = []
+
+    def transaction():
+        log.append("begin")
+        try:
+            yield Transaction(log)
+        except ValueError:
+            log.append("rollback")
+            raise
+        else:
+            log.append("commit")
+
+    def lock():
+        log.append("acquire")
+        try:
+            yield Lock()
+        finally:
+            log.append("release")
+
+    register_factory(transaction, register_for=Transaction)
+    register_factory(lock, register_for=Lock)
+
+    @inject()
+    def handler(fail, tx: Transaction, lk: Lock):
+        log.append("handler")
+        if fail:
+            raise ValueError()
+        return tx
+
+    first = handler(False)
+    assert log == ["begin", "acquire", "handler", "release", "commit"]
+    assert handler(False) is not first
+
+    log.clear()
+    with pytest.raises(ValueError):
+        handler(True)
+    assert log == ["begin", "acquire", "handler", "release", "rollback"]
+
+    # Resources passed by the caller are left alone
+    log.clear()
+    handler(False, tx=first)
+    assert log == ["acquire", "handler", "release"]
+
+
+def test_resources_validated(monkeypatch):
+    container = IocContainer()
+    monkeypatch.setattr(IocContainer, "_IocContainer__instance", container)
+    closed = []
+
+    def transaction():
+        yield Transaction(closed)
+        closed.append(True)
+
+    container.register_factory(transaction, register_for=Transaction)
+
+    @inject()
+    def handler(tx: Transaction):
+        assert not closed
+        return tx
+
+    container.validate([handler])
+    assert isinstance(handler(), Transaction)
+    assert closed == [True]
+
+
+def test_resource_retrieved_directly(ioc_container):
+    def transaction():
+        yield Transaction([])
+
+    register_factory(transaction, register_for=Transaction)
+    resource = get_service(Transaction)
+    assert isinstance(resource, Resource)
+    with resource as tx:
+        assert isinstance(tx, Transaction)
+
+
+def test_intercepted_resources(ioc_container):
+    log = []
+
+    def transaction():
+        yield Transaction(log)
+        log.append("commit")
+
+    def recording(method):
+        return method
+
+    register_factory(transaction, register_for=Transaction)
+    ioc_container.add_interceptor(recording, module=GlobalModule)
+
+    @inject()
+    def handler(tx: Transaction):
+        return tx
+
+    assert isinstance(handler(), Transaction)
+    assert log == ["commit"]
+
+
+def test_nested_resources(monkeypatch):
+    container = IocContainer()
+    monkeypatch.setattr(IocContainer, "_IocContainer__instance", container)
+    log = []
+
+    class Connection:
+        pass
+
+    def connection():
+        log.append("connect")
+        try:
+            yield Connection()
+        finally:
+            log.append("disconnect")
+
+    def transaction(conn: Connection):
+        log.append("begin")
+        try:
+            yield Transaction(conn)
+        except ValueError:
+            log.append("rollback")
+            raise
+        log.append("commit")
+
+    class Report:
+        def __init__(self, tx: Transaction):
+            self.tx = tx
+
+    def create_report(tx: Transaction) -> Report:
+        return Report(tx)
+
+    container.register_factory(connection, register_for=Connection)
+    container.register_factory(transaction, register_for=Transaction)
+    container.validate([])
+
+    @inject()
+    def handler(fail, tx: Transaction):
+        log.append("handler")
+        if fail:
+            raise ValueError()
+        return tx
+
+    assert isinstance(handler(False).log, Connection)
+    assert log == ["connect", "begin", "handler", "commit", "disconnect"]
+    log.clear()
+    with pytest.raises(ValueError):
+        handler(True)
+    assert log == ["connect", "begin", "handler", "rollback", "disconnect"]
+
+    # A service built once can't hold a resource
+    container.register_factory(create_report)
+    with pytest.raises(IocValidationException, match="requires a resource"):
+        container.validate([])
+    with pytest.raises(IocException):
+        container.get(Report)
+
+
+def test_nested_async_resources(ioc_container):
+    log = []
+
+    class Connection:
+        pass
+
+    def connection():
+        log.append("connect")
+        yield Connection()
+        log.append("disconnect")
+
+    async def transaction(conn: Connection):
+        log.append("begin")
+        yield Transaction(conn)
+        log.append("commit")
+
+    register_factory(connection, register_for=Connection)
+    register_factory(transaction, register_for=Transaction)
+
+    @inject()
+    async def handler(tx: Transaction):
+        log.append("handler")
+        return tx
+
+    assert isinstance(asyncio.run(handler()).log, Connection)
+    assert log == ["connect", "begin", "handler", "commit", "disconnect"]
+
+
+def test_resource_errors(ioc_container):
+    def no_yield():
+        if False:
+            yield
+
+    register_factory(no_yield, register_for=Transaction)
+
+    @inject()
+    def handler(tx: Transaction):
+        return tx
+
+    with pytest.raises(IocException):
+        handler()
+
+    with pytest.raises(IocException):
+        register_factory(no_yield, ServiceLifetime.THREAD_LOCAL, register_for=Lock)
+
+
+def test_async_resources(ioc_container):
+    events = []
+
+    async def transaction():
+        events.append("begin")
+        yield Transaction(events)
+        events.append("committing")
+        await asyncio.sleep(0)
+        events.append("commit")
+
+    async def lock():
+        events.append("acquire")
+        yield Lock()
+        events.append("releasing")
+        await asyncio.sleep(0)
+        events.append("release")
+
+    register_factory(transaction, register_for=Transaction)
+    register_factory(lock, register_for=Lock)
+
+    @inject()
+    async def handler(tx: Transaction, lk: Lock):
+        events.append("handler")
+        return tx
+
+    asyncio.run(handler())
+    assert events[:3] == ["begin", "acquire", "handler"]
+    # The teardowns ran concurrently: both started before either finished
+    assert sorted(events[3:5]) == ["committing", "releasing"]
+    assert sorted(events[5:]) == ["commit", "release"]
+
+    @inject()
+    def sync_handler(tx: Transaction):
+        return tx
+
+    with pytest.raises(IocException):
+        sync_handler()
+
+
+def test_mixed_resources_order(ioc_container):
+    events = []
+
+    class Connection:
+        pass
+
+    class Cursor:
+        pass
+
+    async def transaction():
+        yield Transaction(events)
+        events.append("commit")
+
+    def cursor():
+        yield Cursor()
+        events.append("close cursor")
+
+    async def connection():
+        yield Connection()
+        events.append("disconnect")
+
+    register_factory(transaction, register_for=Transaction)
+    register_factory(cursor, register_for=Cursor)
+    register_factory(connection, register_for=Connection)
+
+    @inject()
+    async def handler(tx: Transaction, cur: Cursor, conn: Connection):
+        return tx
+
+    asyncio.run(handler())
+    # The sync resource is torn down between the async ones, in reverse order
+    assert events == ["disconnect", "close cursor", "commit"]
@@ -0,0 +1,90 @@
+import gc
+
+from tinyioc.container import IocContainer
+from tinyioc.helpers import register_instance, register_singleton, get_service, unregister_service
+from tinyioc.module.decorators import module
+from tinyioc.module.module import IocModule
+from tinyioc.module.provide import ProvideSingleton
+from tinyioc.types import ServiceLifetime
+
+
+class Mailer:
+    pass
+
+
+class FakeMailer(Mailer):
+    pass
+
+
+class Clock:
+    pass
+
+
+class Connection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_snapshot_restore():
+    container = IocContainer.get_instance()
+    register_singleton(Mailer)
+    snapshot = container.snapshot()
+
+    unregister_service(Mailer)
+    register_instance(FakeMailer(), register_for=Mailer)
+    register_singleton(Clock)
+
+    @module()
+    class SnapshotModule(IocModule):
+        provides = [ProvideSingleton(Clock)]
+
+    container.restore(snapshot)
+    assert type(get_service(Mailer)) is Mailer
+    assert get_service(Clock) is None
+    assert container.get_module(SnapshotModule) is None
+
+    # The snapshot can be restored again, after more changes
+    unregister_service(Mailer)
+    container.restore(snapshot)
+    assert type(get_service(Mailer)) is Mailer
+
+    unregister_service(Mailer)
+
+
+def test_fixture_registers(ioc_container):
+    register_singleton(Clock)
+    assert ioc_container.get(Clock) is not None
+
+
+def test_fixture_restored():
+    assert get_service(Clock) is None
+
+
+def test_restore_replaced():
+    container = IocContainer()
+    original = Connection()
+    container.register_instance(original)
+    container.register_service(Clock, ServiceLifetime.REFRESHING, refresh_interval=60)
+    container.get(Clock)
+    snapshot = container.snapshot()
+
+    container.replace(Connection, Connection(), on_dispose=Connection.close)
+    container.unregister(Clock)
+    container.restore(snapshot)
+    # The entries the snapshot restores are left as they were
+    assert container.get(Connection) is original and not original.closed
+    assert not container.lookup(Clock).refresher.stopped
+
+    replacement = Connection()
+    container.replace(Connection, replacement, on_dispose=Connection.close)
+    assert not original.closed
+    del snapshot
+    gc.collect()
+    # Disposed once no snapshot can restore it
+    assert original.closed
+    container.replace(Connection, Connection(), on_dispose=Connection.close)
+    assert replacement.closed
+    container.unregister(Clock)
@@ -0,0 +1,45 @@
+import gc
+import threading
+
+from tinyioc.helpers import IocContainer, register_thread_local, unregister_service, get_service
+from tinyioc.decorators import inject
+from tinyioc.module.module import GlobalModule
+
+
+class Session:
+    pass
+
+
+def test_thread_local():
+    register_thread_local(Session)
+
+    main_session = get_service(Session)
+    assert get_service(Session) is main_session
+
+    sessions = []
+    barrier = threading.Barrier(2)
+
+    @inject()
+    def worker(session: Session):
+        sessions.append(session)
+        assert get_service(Session) is session
+        barrier.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sessions) == 2
+    assert sessions[0] is not sessions[1]
+    assert main_session not in sessions
+
+    # The worker instances are released when their threads end
+    sessions.clear()
+    gc.collect()
+    stats = IocContainer.get_instance().stats()[GlobalModule][Session]
+    assert stats["constructed"] == 3
+    assert stats["threads"] == 1
+
+    unregister_service(Session)
@@ -0,0 +1,130 @@
+import pytest
+
+from tinyioc.container import IocContainer
+from tinyioc.decorators import inject, inject_getter
+from tinyioc.ioc_exception import IocValidationException
+from tinyioc.module.module import IocModule, FromModule
+from tinyioc.types import ServiceLifetime
+
+
+class ServiceA:
+    pass
+
+
+class ServiceB:
+    @inject()
+    def __init__(self, service_a: ServiceA):
+        self.service_a = service_a
+
+
+class ServiceC:
+    pass
+
+
+class ServiceD:
+    pass
+
+
+def create_c(service_d: ServiceD) -> ServiceC:
+    return ServiceC()
+
+
+def create_d(service_c: ServiceC) -> ServiceD:
+    return ServiceD()
+
+
+class MissingModule(IocModule):
+    pass
+
+
+def test_validate_ok():
+    container = IocContainer()
+    container.register_service(ServiceA)
+    container.register_service(ServiceB, ServiceLifetime.TRANSIENT)
+
+    @inject()
+    def test_fun(service_b: ServiceB):
+        pass
+
+    container.validate([test_fun])
+    assert container.validated
+
+    container.unregister(ServiceB)
+    assert not container.validated
+
+
+def test_validate_plain_parameters():
+    container = IocContainer()
+    container.register_service(ServiceA)
+
+    @inject()
+    def endpoint(user_id: int, service_a: ServiceA, retries: int = 3, service_c: ServiceC = None):
+        pass
+
+    @inject()
+    def missing(service_c: ServiceC):
+        pass
+
+    container.validate([endpoint])
+    # The unregistered parameters are still checked at runtime
+    assert endpoint.__tinyioc_validated__ is None
+
+    with pytest.raises(IocValidationException, match="requires ServiceC"):
+        container.validate([missing])
+
+
+def test_validated_functions_only(monkeypatch):
+    container = IocContainer()
+    monkeypatch.setattr(IocContainer, "_IocContainer__instance", container)
+    container.register_service(ServiceA)
+
+    @inject()
+    def checked(service_a: ServiceA):
+        return service_a
+
+    @inject()
+    def unchecked(service_a: ServiceA, retries: int = 3):
+        return retries
+
+    container.validate([checked])
+    assert checked.__tinyioc_validated__ is container.validation
+
+    @inject()
+    def decorated_later(service_a: ServiceA, retries: int = 3):
+        return retries
+
+    assert isinstance(checked(), ServiceA)
+    assert unchecked() == 3
+    assert decorated_later() == 3
+
+    container.register_service(ServiceC)
+    assert checked.__tinyioc_validated__ is not container.validation
+
+
+def test_validate_errors():
+    container = IocContainer()
+    container.register_service(ServiceB)
+    container.register_factory(create_c, register_for=ServiceC)
+    container.register_factory(create_d, register_for=ServiceD)
+    container.register_instance(ServiceA(), MissingModule)
+
+    @inject()
+    def test_fun(service_b: ServiceB, service_a: ServiceA = FromModule(MissingModule)):
+        pass
+
+    class Getter:
+        @inject_getter()
+        def get_service(self) -> int:
+            pass
+
+    with pytest.raises(IocValidationException) as error:
+        container.validate([test_fun, Getter.get_service])
+
+    errors = error.value.errors
+    assert len(errors) == 4
+    assert any("'service_a' of function test_validate_errors.<locals>.test_fun refers to the unknown module"
+               in error for error in errors)
+    assert any("registered into the unknown module MissingModule" in error for error in errors)
+    assert any("requires int" in error for error in errors)
+    assert any("ServiceC -> ServiceD -> ServiceC" in error for error in errors)
+    assert not container.validated
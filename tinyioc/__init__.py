@@ -1,6 +1,17 @@
-from tinyioc.decorators import inject, injectable, inject_getter
-from tinyioc.helpers import register_instance, register_singleton, register_transient, get_service, unregister_service
+from tinyioc.decorators import inject, injectable, inject_getter, cached_method
+from tinyioc.helpers import register_instance, register_singleton, register_transient, register_prototype, \
+    register_thread_local, register_refreshing, register_parameterized, register_factory, get_service, get_services, \
+    get_service_async, replace_service, unregister_service, register_module_lazy, activate_container, \
+    validate_container
 from tinyioc.module.module import IocModule, FromModule
 from tinyioc.module.decorators import module
-from tinyioc.module.provide import ProvideInstance, ProvideSingleton, ProvideTransient
-from tinyioc.types import ServiceLifetime
\ No newline at end of file
+from tinyioc.module.provide import ProvideInstance, ProvideSingleton, ProvideTransient, ProvidePrototype, \
+    ProvideThreadLocal, ProvideRefreshing, ProvideParameterized, ProvideFactory
+from tinyioc.types import ServiceLifetime
+from tinyioc.deferred import Deferred, ServiceRef
+from tinyioc.arguments import Arg
+from tinyioc.cache import LruCache
+from tinyioc.resources import Resource, AsyncResource
+from tinyioc.instrumentation import enable_injection_sampling, disable_injection_sampling, dump_injection_stats, \
+    reset_injection_stats
+from tinyioc.ioc_exception import IocException, IocValidationException
@@ -0,0 +1,61 @@
+"""
+Injection marker for parameterized services
+"""
+
+from typing import Any, Optional, Tuple, Type, TypeVar
+
+from .module.module import IocModule
+
+T = TypeVar("T")
+E = TypeVar("E", bound=IocModule)
+
+
+class Arg:
+    """
+    Injection marker requesting the instance of a parameterized service built with the given arguments.
+    Used as the default value of a parameter annotated with the service, like `FromModule`, it is resolved
+    like `IocContainer.get(service, args=arguments)`
+
+    Example:
+
+    .. code-block::
+
+        @inject()
+        def export_logs(client: StorageClient = Arg("eu-west-1", "logs")):
+            ...
+    """
+    __slots__ = ("svc_type", "args", "module")
+
+    def __init__(self, *args: Any, module: Optional[Type[E]] = None):
+        """
+        :param args: The construction arguments, which must be hashable
+        :param module: The module of the service, defaults to the module of the injection
+        """
+        self.svc_type: Optional[Type[Any]] = None
+        """The class-interface of the parameterized service, taken from the parameter annotation"""
+        self.args: Tuple[Any, ...] = args
+        self.module = module
+
+    @classmethod
+    def of(cls, svc_type: Type[T], args: Tuple[Any, ...] = (), module: Optional[Type[E]] = None) -> "Arg":
+        """
+        :param svc_type: The class-interface of the parameterized service
+        :param args: The construction arguments
+        :param module: The module of the service
+        :return: The marker of the service built with the arguments
+        """
+        marker = cls(*args, module=module)
+        marker.svc_type = svc_type
+        return marker
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Arg) and other.svc_type is self.svc_type and other.args == self.args
+
+    def __hash__(self) -> int:
+        return hash((self.svc_type, self.args))
+
+    def __repr__(self) -> str:
+        args = ", ".join(repr(a) for a in self.args)
+        if self.svc_type is None:
+            return f"Arg({args})"
+        return f"{getattr(self.svc_type, '__qualname__', repr(self.svc_type))} = Arg({args})"
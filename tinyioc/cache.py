@@ -0,0 +1,131 @@
+"""
+Bounded caches managed by the container
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class LruCache:
+    """
+    Thread-safe least-recently-used cache, bounded in size and optionally in the age of its values,
+    counting its hits, misses and evictions
+    """
+
+    def __init__(self, maxsize: Optional[int] = 128, ttl: Optional[float] = None, weak: bool = False):
+        """
+        :param maxsize: The maximum number of values, or `None` for an unbounded cache
+        :param ttl: The time to live of the values in seconds, or `None` for values that never expire
+        :param weak: Whether to hold weak references to the values, which are then evicted
+            once they're no longer used elsewhere
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.weak = weak
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._values: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        """
+        Get a value, counting the hit or the miss
+
+        :param key: The key of the value
+        :param default: The value returned on a miss
+        :return: The cached value, or `default` if it's missing or expired
+        """
+        with self._lock:
+            value = self._find(key)
+            if value is not _MISSING:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a value, without counting the hit or the miss, nor marking it as recently used
+
+        :param key: The key of the value
+        :param default: The value returned on a miss
+        :return: The cached value, or `default` if it's missing or expired
+        """
+        with self._lock:
+            value = self._find(key)
+            return default if value is _MISSING else value
+
+    def _find(self, key: Hashable) -> Any:
+        """ Find a live value, evicting it if it expired or was collected. Must be called holding the lock """
+        item = self._values.get(key)
+        if item is None:
+            return _MISSING
+        value, expires = item
+        alive = True
+        if self.weak:
+            # A weak reference to a collected value is dead, like an expired value
+            value = value()
+            alive = value is not None
+        if alive and (self.ttl is None or expires > time.monotonic()):
+            return value
+        del self._values[key]
+        self.evictions += 1
+        return _MISSING
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used one if the cache is full
+
+        :param key: The key of the value
+        :param value: The value
+        """
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        if self.weak:
+            value = weakref.ref(value)
+        with self._lock:
+            self._values[key] = (value, expires)
+            self._values.move_to_end(key)
+            if self.maxsize is not None and len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """ Remove all the values """
+        with self._lock:
+            self._values.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: The hits, misses, evictions and current size of the cache
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._values)}
+
+
+METHOD_CACHES_ATTR = "__tinyioc_caches__"
+
+
+def method_caches(instance: Any) -> Dict[str, LruCache]:
+    """
+    Get the method caches of an instance, created by the `cached_method` decorator
+
+    :param instance: The service instance
+    :return: The caches, by method name
+    """
+    return getattr(instance, METHOD_CACHES_ATTR, None) or {}
+
+
+def clear_method_caches(instance: Any) -> None:
+    """
+    Clear the method caches of an instance
+
+    :param instance: The service instance
+    """
+    for cache in method_caches(instance).values():
+        cache.clear()
@@ -0,0 +1,328 @@
+"""
+Generate the wiring of the container ahead of time, as a plain Python module: a getter for each service,
+building it with a straight call to its constructor or factory, and a prewired copy of each injected function.
+The app can import the generated module instead of resolving the services through the container:
+
+.. code-block::
+
+    python -m tinyioc.codegen myapp.services myapp.api -o myapp/wiring.py
+
+.. code-block::
+
+    from myapp.wiring import get_user_repository, handle_signup
+
+Singleton, transient and prototype services are wired statically. The singletons and the prototype templates
+are shared with the container: the generated getters keep them in the entries of the container, so the code
+resolving them through the container gets the same instances. The services that can't be wired statically
+(registered instances, other lifetimes, async factories, resources, intercepted services, deferred or non-literal
+constructor arguments) are delegated to the container, so the modules registering them must still be imported.
+The functions injected with resources are not prewired
+"""
+
+import argparse
+import ast
+import importlib
+import inspect
+import re
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .arguments import Arg
+from .container import IocContainer
+from .importing import object_path, import_object
+from .injection_plan import injected_functions
+from .module.module import GlobalModule
+from .service_entry import ServiceEntry
+from .types import ServiceLifetime
+
+STATIC_LIFETIMES = (ServiceLifetime.SINGLETON, ServiceLifetime.TRANSIENT, ServiceLifetime.PROTOTYPE)
+
+_RESERVED = {"get", "SERVICES", "GlobalModule", "IocContainer", "ServiceEntry", "copy", "functools", "_container",
+             "_entry", "_cloner"}
+
+
+class _NotWirable(Exception):
+    """ Raised when a dependency can't be referenced by the generated code """
+
+
+def _snake_case(name: str) -> str:
+    name = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", name.replace(".", "_"))
+    return re.sub(r"\W", "_", name).lower()
+
+
+def _literal(value: Any) -> Optional[str]:
+    """ The source of a literal value, or `None` if the value can't be written as a literal """
+    text = repr(value)
+    try:
+        if ast.literal_eval(text) == value:
+            return text
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+    return None
+
+
+class _Wiring:
+    """ The source of the generated module, built a section at a time """
+
+    def __init__(self, container: IocContainer):
+        self.container = container
+        self.used: Set[str] = set(_RESERVED)
+        self.imports: Dict[Tuple[str, str], str] = {}
+        self.getters: Dict[Tuple[Any, Any], str] = {}
+        self.async_services: Set[Tuple[Any, Any]] = set()
+        self.delegated = False
+        self.shared = False
+        self.prototypes = False
+        self.sections: List[str] = []
+
+    def name(self, preferred: str) -> str:
+        """ Allocate a unique name in the generated module """
+        name = preferred
+        suffix = 2
+        while name in self.used:
+            name = f"{preferred}_{suffix}"
+            suffix += 1
+        self.used.add(name)
+        return name
+
+    def ref(self, obj: Any, path: Optional[str] = None) -> str:
+        """ The expression referencing an imported class or function """
+        if obj is GlobalModule:
+            return "GlobalModule"
+        path = path or object_path(obj)
+        if path is None:
+            raise ValueError(f"{obj!r} can't be imported by its path")
+        module_name, _, qualname = path.partition(":")
+        top, _, rest = qualname.partition(".")
+        alias = self.imports.get((module_name, top))
+        if alias is None:
+            alias = self.imports[(module_name, top)] = self.name(top)
+        return f"{alias}.{rest}" if rest else alias
+
+    def import_lines(self) -> List[str]:
+        names: Dict[str, List[str]] = {}
+        for (module_name, top), alias in sorted(self.imports.items()):
+            names.setdefault(module_name, []).append(top if alias == top else f"{top} as {alias}")
+        lines = []
+        for module_name, module_names in names.items():
+            line = f"from {module_name} import {', '.join(module_names)}"
+            if len(line) > 120:
+                line = f"from {module_name} import (\n" + "".join(f"    {name},\n" for name in module_names) + ")"
+            lines.append(line)
+        return lines
+
+    def is_static(self, svc: ServiceEntry[Any]) -> bool:
+        """ Whether the service can be built by the generated code, rather than by the container """
+        if svc.scope not in STATIC_LIFETIMES or svc.is_async or svc.is_resource or svc.registered_instance \
+                or svc.deferred_kwargs:
+            return False
+        if svc.factory is None and svc.svc_type is None and svc.source is None:
+            return False
+        if self.container.interceptors(svc):
+            return False
+        if any(_literal(value) is None for value in (svc.kwargs or {}).values()):
+            return False
+        if any(isinstance(dep_type, Arg) for _, dep_type, _ in self.container.construction_plan(svc)):
+            return False
+        implementation = svc.factory or svc.svc_type
+        return svc.source is not None or object_path(implementation) is not None
+
+    def dependencies(self, plan: Iterable[Tuple[str, Any, Any]], awaiting: bool = False) -> List[Tuple[str, str]]:
+        """ The expression resolving each registered dependency of a plan """
+        deps = []
+        for name, dep_type, dep_module in plan:
+            dep = self.container.lookup(dep_type, dep_module)
+            if dep is None:
+                continue
+            key = (dep.module, dep.iface)
+            if key not in self.getters or dep.is_resource:
+                raise _NotWirable()
+            if awaiting and key in self.async_services:
+                deps.append((name, f"await _container.aget({self.ref(dep.iface)}, {self.ref(dep.module)})"))
+            else:
+                deps.append((name, f"{self.getters[key]}()"))
+        return deps
+
+    def service(self, module: Any, iface: Any, svc: ServiceEntry[Any]) -> None:
+        getter = self.getters[(module, iface)]
+        comment = f"# {module.__qualname__}/{iface.__qualname__}, {svc.scope.name.lower()}"
+        try:
+            deps = self.dependencies(self.container.construction_plan(svc)) if self.is_static(svc) else None
+        except _NotWirable:
+            deps = None
+        if deps is None:
+            self.delegated = True
+            self.sections.append(f"{comment}, built by the container\n"
+                                 f"def {getter}():\n"
+                                 f"    return _container.get({self.ref(iface)}, {self.ref(module)})\n")
+            return
+
+        if svc.factory is not None or svc.is_factory:
+            target = self.ref(svc.factory, None if svc.factory is not None else svc.source)
+        else:
+            target = self.ref(svc.svc_type, svc.source if svc.svc_type is None else None)
+        arguments = [f"{name}={_literal(value)}" for name, value in (svc.kwargs or {}).items()]
+        arguments += [f"{name}={expression}" for name, expression in deps]
+        construction = f"{target}({', '.join(arguments)})"
+
+        if svc.scope == ServiceLifetime.TRANSIENT:
+            self.sections.append(f"{comment}\n"
+                                 f"def {getter}():\n"
+                                 f"    return {construction}\n")
+            return
+
+        # The entry of the container holding the singleton, or the prototype template
+        holder = self.name(f"_{getter[4:]}")
+        self.shared = True
+        if svc.scope == ServiceLifetime.PROTOTYPE:
+            self.prototypes = True
+            field, construction, result = "clone", f"_cloner({construction})", "value()"
+        else:
+            field, result = "instance", "value"
+        self.sections.append(f"{holder} = None\n\n\n"
+                             f"{comment}, shared with the container\n"
+                             f"def {getter}():\n"
+                             f"    global {holder}\n"
+                             f"    if {holder} is None:\n"
+                             f"        {holder} = _entry({self.ref(iface)}, {self.ref(module)})\n"
+                             f"    value = {holder}.{field}\n"
+                             f"    if value is None:\n"
+                             f"        with {holder}.lock:\n"
+                             f"            value = {holder}.{field}\n"
+                             f"            if value is None:\n"
+                             f"                value = {holder}.{field} = {construction}\n"
+                             f"    return {result}\n")
+
+    def function(self, fn: Callable) -> None:
+        original = getattr(fn, "__wrapped__", None)
+        path = object_path(fn)
+        plan = fn.__tinyioc_plan__
+        # Only module-level functions can be replaced by a plain function
+        if original is None or path is None or "." in fn.__qualname__ or any(name == "return" for name, _, _ in plan):
+            return
+        if any(isinstance(dep_type, Arg) for _, dep_type, _ in plan):
+            return
+        try:
+            if import_object(path) is not fn:
+                return
+        except (ImportError, AttributeError):
+            return
+
+        is_async = inspect.iscoroutinefunction(original)
+        try:
+            deps = self.dependencies(plan, awaiting=is_async)
+        except _NotWirable:
+            return
+        name = self.name(fn.__name__)
+        target = self.name(f"_{fn.__name__}")
+        lines = [f"{target} = {self.ref(fn)}.__wrapped__", "", "",
+                 f"{'async ' if is_async else ''}def {name}(*args, **kwargs):"]
+        for param, expression in deps:
+            lines.append(f"    if {param!r} not in kwargs:")
+            lines.append(f"        kwargs[{param!r}] = {expression}")
+        lines.append(f"    return {'await ' if is_async else ''}{target}(*args, **kwargs)")
+        self.sections.append("\n".join(lines) + "\n")
+
+
+def generate_wiring(container: Optional[IocContainer] = None, functions: Optional[Iterable[Callable]] = None,
+                    sources: Iterable[str] = ()) -> str:
+    """
+    Generate the source of the wiring module of a container
+
+    :param container: The container to wire, defaults to the container singleton
+    :param functions: The injected functions to prewire, defaults to all the functions
+        decorated with `inject`
+    :param sources: The modules registering the services, mentioned in the module docstring
+    :return: The source of the module
+    """
+    container = container or IocContainer.get_instance()
+    if functions is None:
+        functions = list(injected_functions)
+    wiring = _Wiring(container)
+
+    # Only the services referenced by their import path can be wired
+    entries = [(module, iface, svc) for module, iface, svc in container.entries()
+               if (module is GlobalModule or object_path(module)) and object_path(iface)]
+    for module, iface, svc in entries:
+        preferred = _snake_case(iface.__qualname__)
+        if module is not GlobalModule:
+            preferred = f"{_snake_case(module.__qualname__)}_{preferred}"
+        wiring.getters[(module, iface)] = wiring.name(f"get_{preferred}")
+        if svc.is_async:
+            wiring.async_services.add((module, iface))
+
+    functions = sorted(functions, key=lambda fn: (fn.__module__, fn.__qualname__))
+    for fn in functions:
+        if getattr(fn, "__tinyioc_plan__", None) is not None:
+            wiring.function(fn)
+    function_sections = wiring.sections
+    wiring.sections = []
+    for module, iface, svc in entries:
+        wiring.service(module, iface, svc)
+
+    services = ["SERVICES = {"]
+    for (module, iface), getter in wiring.getters.items():
+        services.append(f"    ({wiring.ref(module)}, {wiring.ref(iface)}): {getter},")
+    services.append("}")
+    services.append('"""The getter of each service, by `(module, class-interface)`"""')
+    wiring.sections.append("\n".join(services) + "\n")
+    wiring.sections.append("def get(class_type, module=GlobalModule):\n"
+                           '    """\n'
+                           "    Retrieve a service, or return `None` if it's not wired\n\n"
+                           "    :param class_type: The class name\n"
+                           "    :param module: The module\n"
+                           "    :return: The service, or None if not found\n"
+                           '    """\n'
+                           "    getter = SERVICES.get((module, class_type))\n"
+                           "    return getter() if getter is not None else None\n")
+    if wiring.shared:
+        wiring.sections.insert(0, "def _entry(class_type, module):\n"
+                                  "    entry = _container.lookup(class_type, module)\n"
+                                  "    return entry if entry is not None else ServiceEntry()\n")
+    if wiring.prototypes:
+        wiring.sections.insert(0, "def _cloner(template):\n"
+                                  "    clone = getattr(template, \"__clone__\", None)\n"
+                                  "    return clone if clone is not None else functools.partial(copy.copy, template)\n")
+
+    # The imports are collected while generating the sections, so the header is rendered last
+    command = " ".join(["python -m tinyioc.codegen", *sources])
+    header = [f'"""\nWiring generated by `{command}`, do not edit\n"""', ""]
+    if wiring.prototypes:
+        header += ["import copy", "import functools", ""]
+    uses_container = wiring.delegated or wiring.shared
+    if uses_container:
+        header.append("from tinyioc.container import IocContainer")
+    header.append("from tinyioc.module.module import GlobalModule")
+    if wiring.shared:
+        header.append("from tinyioc.service_entry import ServiceEntry")
+    header += wiring.import_lines()
+    if uses_container:
+        header += ["", "_container = IocContainer.get_instance()"]
+    return "\n".join(header) + "\n\n\n" + "\n\n".join(wiring.sections + function_sections)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Import the application modules, then write the wiring module of the container singleton
+
+    :param argv: The command line arguments, defaults to `sys.argv`
+    """
+    parser = argparse.ArgumentParser(prog="python -m tinyioc.codegen",
+                                     description="Generate the wiring module of the tinyioc container")
+    parser.add_argument("modules", nargs="+", help="The modules registering the services, imported in order")
+    parser.add_argument("-o", "--output", help="The output file, defaults to the standard output")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        importlib.import_module(module)
+
+    source = generate_wiring(sources=args.modules)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Declarative configuration of the container from a TOML or JSON file. The services are registered by the import
+paths of their classes, which are imported only when the services are first requested:
+
+.. code-block:: toml
+
+    [[services]]
+    interface = "myapp.mail:MailService"
+    implementation = "myapp.mail.smtp:SmtpMailService"
+    lifetime = "singleton"
+    kwargs = { host = "smtp.example.com", port = 587 }
+
+    [[modules]]
+    path = "myapp.billing:BillingModule"
+
+    [[modules.services]]
+    implementation = "myapp.billing.stripe:create_client"
+    interface = "myapp.billing:PaymentClient"
+    factory = true
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+from .container import IocContainer
+from .ioc_exception import IocException
+from .types import ServiceLifetime
+
+_SERVICE_KEYS = {"interface", "implementation", "lifetime", "module", "kwargs", "factory", "async", "refresh_interval",
+                 "profile"}
+_MODULE_KEYS = {"path", "services"}
+
+
+def load_config(path: str, container: Optional[IocContainer] = None) -> None:
+    """
+    Register the modules and services declared in a configuration file, without importing them.
+    The format is chosen by the file extension, `.toml` or `.json`. TOML files are read with `tomllib`,
+    or with the `tomli` package before Python 3.11
+
+    :param path: The configuration file path
+    :param container: The container to configure, defaults to the container singleton
+    :raises IocException: If the file can't be read, or a binding is invalid
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".toml":
+        toml = _toml_parser()
+        with open(path, "rb") as f:
+            try:
+                config = toml.load(f)
+            except toml.TOMLDecodeError as e:
+                raise IocException(f"{path}: invalid TOML: {e}")
+    elif extension == ".json":
+        with open(path) as f:
+            try:
+                config = json.load(f)
+            except json.JSONDecodeError as e:
+                raise IocException(f"{path}: invalid JSON: {e}")
+    else:
+        raise IocException(f"{path}: unsupported configuration format, expected a .toml or .json file")
+    configure_container(config, container, path)
+
+
+def configure_container(config: Mapping[str, Any], container: Optional[IocContainer] = None,
+                        source: str = "config") -> None:
+    """
+    Register the modules and services declared in a parsed configuration, without importing them.
+    Every binding is checked before any service is registered
+
+    :param config: The configuration, with its `services` and `modules` lists
+    :param container: The container to configure, defaults to the container singleton
+    :param source: The name of the configuration in the error messages
+    :raises IocException: If a binding is invalid, or its service is already registered
+    """
+    container = container or IocContainer.get_instance()
+    _check_keys(config, {"services", "modules"}, source)
+
+    bindings = [_binding(svc, None, f"{source}: services[{i}]")
+                for i, svc in enumerate(_list(config, "services", source))]
+    for i, module in enumerate(_list(config, "modules", source)):
+        location = f"{source}: modules[{i}]"
+        _check_keys(module, _MODULE_KEYS, location)
+        module_path = _path(module, "path", location)
+        bindings += [_binding(svc, module_path, f"{location}.services[{j}]")
+                     for j, svc in enumerate(_list(module, "services", location))]
+
+    for binding in bindings:
+        container.register_lazy(**binding)
+
+
+def _toml_parser() -> Any:
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise IocException("Reading a TOML configuration requires Python 3.11, or the tomli package")
+    return tomllib
+
+
+def _binding(svc: Any, module: Optional[str], location: str) -> Dict[str, Any]:
+    """ The arguments of `IocContainer.register_lazy` for a service of the configuration """
+    _check_keys(svc, _SERVICE_KEYS, location)
+    implementation = _path(svc, "implementation", location)
+    if module is not None and "module" in svc:
+        raise IocException(f"{location}: the module of the service is set by the enclosing module")
+
+    lifetime = svc.get("lifetime", "singleton")
+    try:
+        scope = ServiceLifetime[str(lifetime).upper()]
+    except KeyError:
+        raise IocException(f"{location}: unknown lifetime {lifetime!r}, expected one of "
+                           f"{', '.join(lifetime.name.lower() for lifetime in ServiceLifetime)}")
+
+    kwargs = svc.get("kwargs")
+    if kwargs is not None and not isinstance(kwargs, dict):
+        raise IocException(f"{location}: kwargs must be a table of constructor arguments")
+
+    return {
+        "interface": _path(svc, "interface", location) if "interface" in svc else implementation,
+        "implementation": implementation,
+        "scope": scope,
+        "module": _path(svc, "module", location) if "module" in svc else module,
+        "kwargs": kwargs or None,
+        "factory": bool(svc.get("factory", False)),
+        "is_async": bool(svc.get("async", False)),
+        "refresh_interval": svc.get("refresh_interval"),
+        "profile": svc.get("profile"),
+    }
+
+
+def _path(table: Mapping[str, Any], key: str, location: str) -> str:
+    """ An import path of the configuration, normalized to `package.module:QualifiedName` """
+    path = table.get(key)
+    if not isinstance(path, str) or not path:
+        raise IocException(f"{location}: {key} must be an import path")
+    if ":" not in path:
+        module_name, _, name = path.rpartition(".")
+        if not module_name:
+            raise IocException(f"{location}: {key} {path!r} is not an import path")
+        path = f"{module_name}:{name}"
+    return path
+
+
+def _list(table: Mapping[str, Any], key: str, location: str) -> List[Any]:
+    items = table.get(key, [])
+    if not isinstance(items, list):
+        raise IocException(f"{location}: {key} must be a list")
+    return items
+
+
+def _check_keys(table: Any, allowed: Set[str], location: str) -> None:
+    if not isinstance(table, Mapping):
+        raise IocException(f"{location}: expected a table")
+    unknown = set(table) - allowed
+    if unknown:
+        raise IocException(f"{location}: unknown keys {', '.join(sorted(unknown))}")
@@ -1,14 +1,92 @@
-from typing import Optional, Type, TypeVar, Dict
+import asyncio
+import collections.abc
+import copy
+import functools
+import inspect
+import threading
+import tracemalloc
+import weakref
+from typing import Optional, Type, TypeVar, Dict, Callable, Any, Iterable, List, Iterator, Tuple, Union, FrozenSet, \
+    Mapping, TYPE_CHECKING, get_type_hints, get_origin, get_args
 
-from .module.module import IocModule, GlobalModule
+from .arguments import Arg
+from .deferred import Deferred, ServiceRef, has_deferred
+from .cache import LruCache, method_caches, clear_method_caches
+from .importing import object_path, import_object
+from .interception import Interceptor, intercept
+from .injection_plan import build_plan, build_class_plan, find_cycles, injected_functions, InjectionPlan
+from .module.module import IocModule, GlobalModule, FromModule
+from .module.provide import Provide, ProvideInstance, ProvideSingleton, ProvideTransient, ProvidePrototype, \
+    ProvideThreadLocal, ProvideRefreshing, ProvideParameterized, ProvideFactory
 from .service_entry import ServiceEntry
-from .ioc_exception import IocException
+from .ioc_exception import IocException, IocValidationException
+from .profiles import Candidate, Condition, Profile
+from .refresh import Refresher
+from .resources import Resource, AsyncResource, PendingResources, inject_services, ainject_services, \
+    nested_resource
+from .resolver import Resolver
 from .types import ServiceLifetime
 
+if TYPE_CHECKING:
+    from .graph import DependencyGraph, GraphNode
+    from .memory import MemoryReport
+
 T = TypeVar('T')
 K= TypeVar('K')
 E = TypeVar('E', bound=IocModule)
 
+PROVIDER_LIFETIMES = {
+    ProvideSingleton: ServiceLifetime.SINGLETON,
+    ProvideTransient: ServiceLifetime.TRANSIENT,
+    ProvidePrototype: ServiceLifetime.PROTOTYPE,
+    ProvideThreadLocal: ServiceLifetime.THREAD_LOCAL,
+    ProvideRefreshing: ServiceLifetime.REFRESHING,
+    ProvideParameterized: ServiceLifetime.PARAMETERIZED,
+}
+
+
+def _module_name(module: Union[Type[E], str]) -> str:
+    return module if isinstance(module, str) else module.__qualname__
+
+
+class _ThreadSlot:
+    """ Holder of a thread-local instance, collected when its thread ends """
+    __slots__ = ("instance", "__weakref__")
+
+    def __init__(self, instance):
+        self.instance = instance
+
+
+class ContainerSnapshot:
+    """ The state of the container registry, captured by `IocContainer.snapshot` """
+    __slots__ = ("modules", "services", "lazy_services", "lazy_modules", "module_paths", "interceptors", "candidates",
+                 "profiles", "entry_ids", "__weakref__")
+
+    def __init__(self, modules, services, lazy_services, lazy_modules, module_paths, interceptors, candidates,
+                 profiles):
+        self.modules = modules
+        self.services = services
+        self.lazy_services = lazy_services
+        self.lazy_modules = lazy_modules
+        self.module_paths = module_paths
+        self.interceptors = interceptors
+        self.candidates = candidates
+        self.profiles = profiles
+        self.entry_ids: Optional[FrozenSet[int]] = None
+
+    def retains(self, svc: ServiceEntry[Any]) -> bool:
+        """
+        :param svc: A service entry
+        :return: Whether restoring the snapshot brings the entry back into the registry
+        """
+        if self.entry_ids is None:
+            # Computed on the first removal only, so that taking a snapshot stays cheap
+            entries = [entry for services in self.services.values() for entry in services.values()]
+            for lazy_services in (*self.lazy_services.values(), *self.lazy_modules.values()):
+                entries.extend(lazy_services.values())
+            self.entry_ids = frozenset(id(entry) for entry in entries)
+        return id(svc) in self.entry_ids
+
 
 class IocContainer:
     """
@@ -23,9 +101,54 @@ class IocContainer:
         Create a new instance of the IocContainer. This class is supposed to be a singleton object,
         so you should never instantiate it by yourself
         """
+        # The modules map is replaced as a whole on every change, so readers see a consistent snapshot
         self.__modules = {
             GlobalModule: GlobalModule()
         }
+        self.__lazy_modules: Dict[str, IocModule] = {}
+        # The modules referenced by their import path: the module class once imported, `None` until then
+        self.__module_paths: Dict[str, Optional[Type[E]]] = {}
+        self.__import_lock = threading.RLock()
+        self.__interceptors: Dict[Tuple[Optional[Type[E]], Optional[Type[Any]]], List[Interceptor]] = {}
+        # The conditional registrations, kept until the container is activated with its profiles
+        self.__candidates: List[Candidate] = []
+        self.__profiles: Optional[FrozenSet[str]] = None
+        # The live snapshots, and the entries removed since that they can restore, with their dispose callback:
+        # their state is released only once no snapshot can bring them back
+        self.__snapshots: "weakref.WeakSet[ContainerSnapshot]" = weakref.WeakSet()
+        self.__retained: List[Tuple[ServiceEntry[Any], Optional[Callable[[Any], None]]]] = []
+        # Writers publish the changes to the services of a module atomically, readers never lock
+        self.__write_lock = threading.RLock()
+        self.__stats_lock = threading.Lock()
+        # The bytes allocated by the dependencies built during the construction running on each thread
+        self.__tracing = threading.local()
+        self.__validation = None
+        # Incremented once every change of the registry is published, for the handles caching its entries
+        self.__generation = 0
+
+    @property
+    def validated(self) -> bool:
+        """
+        Whether the container passed the validation, and has not been changed since
+        """
+        return self.__validation is not None
+
+    @property
+    def generation(self) -> int:
+        """
+        The number of changes published to the registry, which handles like `Resolver` compare
+        to know when their cached entries are stale
+        """
+        return self.__generation
+
+    @property
+    def validation(self) -> Optional[object]:
+        """
+        The token of the last validation the container passed, or `None` if it was changed since.
+        The injected functions whose dependencies were all found registered are marked with it,
+        as `__tinyioc_validated__`
+        """
+        return self.__validation
 
     @staticmethod
     def get_instance() -> 'IocContainer':
@@ -39,33 +162,28 @@ class IocContainer:
             IocContainer.__instance = IocContainer()
         return IocContainer.__instance
 
-    def register_instance(self, instance: T, module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None) -> None:
+    def register_instance(self, instance: T, module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None,
+                          profile: Optional[Profile] = None, when: Optional[Condition] = None) -> None:
         """
         Register a service through the instance provided (singleton scope)
 
         :param instance: The service instance
         :param module: The module to register the service into
         :param register_for: The class-interface to register this instance for
+        :param profile: The profiles enabling the registration, once the container is activated
+        :param when: The condition enabling the registration, evaluated once when the container is activated
         """
-        if module not in self.__modules:
-            module = GlobalModule
-
-        module_instance = self.__modules[module]
         cls_type = instance.__class__
         if register_for:
             cls_type = register_for
 
-        if cls_type not in module_instance.services:
-            entry: ServiceEntry[T] = ServiceEntry()
-            entry.instance = instance
-            entry.svc_type = cls_type
-            entry.scope = ServiceLifetime.SINGLETON
-            module_instance.services[cls_type] = entry
-        else:
-            raise IocException(f"Service {str(cls_type)} is already registered")
+        entry = ServiceEntry(instance, cls_type, registered_instance=True)
+        self.__register_when(module, cls_type, entry, profile, when)
 
     def register_service(self, class_type: Type[T], scope: ServiceLifetime = ServiceLifetime.SINGLETON,
-                         module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None, kwargs: Optional[Dict] = None) -> None:
+                         module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None, kwargs: Optional[Dict] = None,
+                         refresh_interval: Optional[float] = None, instance_cache: Optional[LruCache] = None,
+                         profile: Optional[Profile] = None, when: Optional[Condition] = None) -> None:
         """
         Register a service through the class type (constructor)
 
@@ -74,24 +192,399 @@ class IocContainer:
         :param module: The module to register the service into
         :param register_for: Register this service as the provided class-interface
         :param kwargs: Arguments to pass to the service constructor
+        :param refresh_interval: The seconds between the rebuilds of a refreshing service
+        :param instance_cache: The cache of the instances of a parameterized service, by construction arguments,
+            defaults to a cache of 128 instances
+        :param profile: The profiles enabling the registration, once the container is activated
+        :param when: The condition enabling the registration, evaluated once when the container is activated
         """
-        if module not in self.__modules:
-            module = GlobalModule
-
-        module_instance = self.__modules[module]
         iface = class_type
         if register_for:
             iface = register_for
 
-        if iface not in module_instance.services:
-            entry: ServiceEntry[T] = ServiceEntry()
-            entry.instance = None
-            entry.svc_type = class_type
-            entry.scope = scope
-            entry.kwargs = kwargs
-            module_instance.services[iface] = entry
+        entry = ServiceEntry(svc_type=class_type, scope=scope, kwargs=kwargs, refresh_interval=refresh_interval,
+                             instance_cache=instance_cache)
+        self.__register_when(module, iface, entry, profile, when)
+
+    def register_factory(self, factory: Callable[..., T], scope: ServiceLifetime = ServiceLifetime.SINGLETON,
+                         module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None,
+                         refresh_interval: Optional[float] = None, instance_cache: Optional[LruCache] = None,
+                         profile: Optional[Profile] = None, when: Optional[Condition] = None) -> None:
+        """
+        Register a service through a factory function. The factory parameters are injected
+        from the container, following the same rules of the `inject` decorator
+
+        :param factory: The factory function (sync or async) building the service
+        :param scope: The service scope (singleton or transient)
+        :param module: The module to register the service into
+        :param register_for: Register this service as the provided class-interface, defaults to the return
+            annotation of the factory (the yielded type of a generator factory)
+        :param refresh_interval: The seconds between the rebuilds of a refreshing service
+        :param instance_cache: The cache of the instances of a parameterized service, by construction arguments
+            (passed positionally to the factory), defaults to a cache of 128 instances
+        :param profile: The profiles enabling the registration, once the container is activated
+        :param when: The condition enabling the registration, evaluated once when the container is activated
+        :raises IocException: If no class-interface is given, and the factory has no return annotation
+        """
+        iface = register_for or self.__factory_interface(factory)
+
+        entry = ServiceEntry(scope=scope, factory=factory, refresh_interval=refresh_interval,
+                             instance_cache=instance_cache)
+        self.__register_when(module, iface, entry, profile, when)
+
+    def register_many(self, provides: Iterable[Provide], module: Type[E] = GlobalModule) -> None:
+        """
+        Register a batch of services into a module at once. The batch is validated as a whole
+        and published in a single step: if any service is already registered, none is.
+        The conditional providers are kept until the container is activated, or join the batch
+        if it is already active and they are enabled
+
+        Example:
+
+        .. code-block::
+
+            container.register_many([
+                ProvideInstance(ApiService(base_url="/api")),
+                ProvideSingleton(DatabaseService, host="localhost"),
+                ProvideFactory(create_engine, provide_for=Engine)
+            ], MyModule)
+
+        :param provides: The services to register, as module providers
+        :param module: The module to register the services into
+        :raises IocException: If any service is registered twice, or was already registered
+        """
+        module_instance = self.__module_instance(module)
+        entries = {}
+        candidates = []
+        for provide in provides:
+            iface, entry = self.__entry_for(provide)
+            if provide.profile is not None or provide.when is not None:
+                candidates.append(Candidate((module, iface), provide.profile, provide.when, entry))
+                continue
+            if iface in entries:
+                raise IocException(f"Service {str(iface)} is provided twice")
+            entries[iface] = entry
+
+        with self.__write_lock:
+            profiles = self.__profiles
+            if profiles is not None:
+                for candidate in candidates:
+                    if candidate.matches(profiles):
+                        _, iface = candidate.key
+                        if iface in entries:
+                            raise IocException(f"Service {str(iface)} is provided twice")
+                        entries[iface] = candidate.entry
+                candidates = []
+            self.__add_entries(module_instance, module, entries)
+            if candidates:
+                # Kept only once the rest of the batch is registered
+                self.__validation = None
+                self.__candidates.extend(candidates)
+
+    @staticmethod
+    def __entry_for(provide: Provide) -> Tuple[Type[Any], ServiceEntry[Any]]:
+        """ Create the entry of a module provider """
+        if isinstance(provide, ProvideInstance):
+            entry = ServiceEntry(provide.entry, provide.entry.__class__, registered_instance=True)
+            iface = provide.provide_for or provide.entry.__class__
+        elif isinstance(provide, ProvideFactory):
+            entry = ServiceEntry(scope=provide.lifetime, factory=provide.entry,
+                                 refresh_interval=provide.refresh_interval, instance_cache=provide.instance_cache)
+            iface = provide.provide_for or IocContainer.__factory_interface(provide.entry)
+        else:
+            for provider, scope in PROVIDER_LIFETIMES.items():
+                if isinstance(provide, provider):
+                    break
+            else:
+                raise IocException(f"Unknown provider {str(provide)}")
+            entry = ServiceEntry(svc_type=provide.entry, scope=scope, kwargs=provide.kwargs,
+                                 refresh_interval=getattr(provide, "refresh_interval", None),
+                                 instance_cache=getattr(provide, "instance_cache", None))
+            iface = provide.provide_for or provide.entry
+        return iface, entry
+
+    @staticmethod
+    def __factory_interface(factory: Callable[..., Any]) -> Type[Any]:
+        """ The class-interface of a factory registered without one: its return annotation, or its yielded type """
+        try:
+            returns = get_type_hints(factory).get("return")
+        except Exception:
+            returns = inspect.signature(factory).return_annotation
+            if returns is inspect.Signature.empty or isinstance(returns, str):
+                returns = None
+        if returns is not None and (inspect.isgeneratorfunction(factory) or inspect.isasyncgenfunction(factory)):
+            if get_origin(returns) in (collections.abc.Iterator, collections.abc.Generator, collections.abc.Iterable,
+                                       collections.abc.AsyncIterator, collections.abc.AsyncGenerator,
+                                       collections.abc.AsyncIterable):
+                returns = get_args(returns)[0]
+            else:
+                returns = None
+        if returns is None or returns is type(None):
+            raise IocException(f"Factory {getattr(factory, '__qualname__', factory)} has no return annotation, "
+                               f"register it with a class-interface")
+        return returns
+
+    def register_lazy(self, interface: str, implementation: str, scope: ServiceLifetime = ServiceLifetime.SINGLETON,
+                      module: Optional[str] = None, kwargs: Optional[Dict] = None, factory: bool = False,
+                      is_async: bool = False, refresh_interval: Optional[float] = None,
+                      profile: Optional[Profile] = None, when: Optional[Condition] = None) -> None:
+        """
+        Register a service by the import paths of its interface and implementation, without importing them.
+        The service is bound the first time its interface is requested, and the implementation
+        is imported when the service is first built. The implementation of a conditional registration
+        that is not enabled is never imported
+
+        :param interface: The import path (`package.module:Name`) of the class-interface
+        :param implementation: The import path of the service's class, or of its factory function
+        :param scope: The service scope
+        :param module: The import path of the module to register the service into, defaults to the global module
+        :param kwargs: Arguments to pass to the service constructor
+        :param factory: Whether the implementation is a factory function
+        :param is_async: Whether the factory is a coroutine function
+        :param refresh_interval: The seconds between the rebuilds of a refreshing service
+        :param profile: The profiles enabling the registration, once the container is activated
+        :param when: The condition enabling the registration, evaluated once when the container is activated
+        """
+        entry: ServiceEntry[T] = ServiceEntry(scope=scope, kwargs=kwargs, refresh_interval=refresh_interval)
+        self.__check_refresh_interval(interface, entry)
+        entry.source = implementation
+        entry.is_factory = factory
+        entry.is_async = is_async
+        if scope == ServiceLifetime.THREAD_LOCAL:
+            entry.local = threading.local()
+        elif scope == ServiceLifetime.PARAMETERIZED:
+            entry.instance_cache = LruCache()
+
+        if profile is not None or when is not None:
+            self.__defer(Candidate((module, interface), profile, when, entry))
         else:
-            raise IocException(f"Service {str(class_type)} is already registered")
+            self.__add_lazy_entry(interface, module, entry)
+
+    def __add_lazy_entry(self, interface: str, module: Optional[str], entry: ServiceEntry[Any]) -> None:
+        with self.__write_lock:
+            self.__validation = None
+            self.__check_lazy_entry(interface, module)
+            if module is None:
+                module_instance = self.__modules[GlobalModule]
+            else:
+                module_instance = self.__lazy_module_instance(module)
+            entry.module = module_instance.__class__
+            module_instance.lazy_services[interface] = entry
+
+    def __check_lazy_entry(self, interface: str, module: Optional[str]) -> None:
+        """ Check a service registered by path is not already registered, without creating its module """
+        if module is None:
+            module_instance = self.__modules[GlobalModule]
+        else:
+            module_instance = self.__lazy_module_instance(module, create=False)
+        if module_instance is not None and interface in module_instance.lazy_services:
+            raise IocException(f"Service {interface} is already registered")
+
+    def __register_when(self, module: Type[E], iface: Type[Any], entry: ServiceEntry[Any],
+                        profile: Optional[Profile], when: Optional[Condition]) -> None:
+        """ Add an entry into the module, or keep it until the activation if it's conditional """
+        if profile is None and when is None:
+            self.__add_entries(self.__module_instance(module), module, {iface: entry})
+        else:
+            self.__defer(Candidate((module, iface), profile, when, entry))
+
+    def __defer(self, candidate: Candidate) -> None:
+        """ Keep a conditional registration until the activation, or evaluate it if the container is active """
+        with self.__write_lock:
+            profiles = self.__profiles
+            if profiles is None:
+                self.__validation = None
+                self.__candidates.append(candidate)
+                return
+        if candidate.matches(profiles):
+            with self.__write_lock:
+                self.__register_candidates([candidate])
+
+    def __register_candidates(self, candidates: Iterable[Candidate]) -> None:
+        """
+        Register the enabled conditional registrations at once: they are all checked against the registry
+        before any is published, so none is registered if any of them conflicts. Must be called holding the write lock
+        """
+        self.__validation = None
+        batches: Dict[Any, Dict[Any, ServiceEntry[Any]]] = {}
+        for candidate in candidates:
+            module, iface = candidate.key
+            batches.setdefault(module, {})[iface] = candidate.entry
+
+        published: Dict[int, Tuple[IocModule, Dict[Type[Any], ServiceEntry[Any]]]] = {}
+        lazy = []
+        for module, entries in batches.items():
+            if any(isinstance(iface, str) for iface in entries):
+                # Registered by path, into a module also given by path
+                for interface in entries:
+                    self.__check_lazy_entry(interface, module)
+                lazy.append((module, entries))
+                continue
+            module_instance = self.__module_instance(module)
+            self.__prepare_entries(module_instance, module, entries)
+            changes = self.__check_entries(module_instance, entries)
+            # Several modules fall back to the global module when they are not registered
+            _, pending = published.setdefault(id(module_instance), (module_instance, {}))
+            for iface in changes:
+                if iface in pending:
+                    raise IocException(f"Service {str(iface)} is already registered")
+            pending.update(changes)
+
+        for module_instance, changes in published.values():
+            self.__publish(module_instance, changes)
+        for module, entries in lazy:
+            for interface, entry in entries.items():
+                self.__add_lazy_entry(interface, module, entry)
+
+    @property
+    def profiles(self) -> Optional[FrozenSet[str]]:
+        """
+        The active profiles, or `None` if the container was not activated yet
+        """
+        return self.__profiles
+
+    def activate(self, profiles: Iterable[str] = ()) -> None:
+        """
+        Activate the container with the given profiles, evaluating the profiles and the conditions of the
+        registrations once: only the enabled registrations are stored, the others are discarded. The registrations
+        made after the activation are evaluated immediately. The services are never resolved against the conditions
+
+        Example:
+
+        .. code-block::
+
+            @injectable(profile="prod", register_for=MailService)
+            class SmtpMailService(MailService):
+                ...
+
+            @injectable(profile="!prod", register_for=MailService)
+            class FakeMailService(MailService):
+                ...
+
+            IocContainer.get_instance().activate(os.environ.get("APP_PROFILES", "").split(","))
+
+        :param profiles: The active profiles
+        :raises IocException: If the container is already active, if several enabled registrations
+            provide the same service in the same module, or if any of them is already registered,
+            in which case none is registered and the container stays inactive
+        """
+        with self.__write_lock:
+            if self.__profiles is not None:
+                raise IocException("The container is already active")
+            active = frozenset(profile for profile in profiles if profile)
+            enabled = {}
+            for candidate in self.__candidates:
+                if candidate.matches(active):
+                    if candidate.key in enabled:
+                        module, iface = candidate.key
+                        raise IocException(f"Service {str(iface)} has several enabled registrations "
+                                           f"in module {str(module)}")
+                    enabled[candidate.key] = candidate
+            self.__register_candidates(enabled.values())
+            self.__candidates = []
+            self.__profiles = active
+
+    def __add_entries(self, module_instance: IocModule, requested_module: Type[E],
+                      entries: Dict[Type[Any], ServiceEntry[Any]]) -> None:
+        """ Add new entries into the module, checking none is already registered """
+        self.__prepare_entries(module_instance, requested_module, entries)
+        with self.__write_lock:
+            self.__validation = None
+            self.__publish(module_instance, self.__check_entries(module_instance, entries))
+
+    def __prepare_entries(self, module_instance: IocModule, requested_module: Type[E],
+                          entries: Dict[Type[Any], ServiceEntry[Any]]) -> None:
+        """ Compute the injection plans and the state of new entries, checking their lifetimes """
+        module = module_instance.__class__
+        for iface, entry in entries.items():
+            entry.iface = iface
+            entry.module = module
+            entry.requested_module = requested_module
+            entry.deferred_kwargs = has_deferred(entry.kwargs)
+            if entry.factory is not None:
+                entry.plan = build_plan(entry.factory, module)
+            elif entry.svc_type is not None and entry.instance is None:
+                entry.plan = self.__class_plan(entry.svc_type, module, entry.kwargs)
+            if entry.scope == ServiceLifetime.THREAD_LOCAL:
+                entry.local = threading.local()
+            elif entry.scope == ServiceLifetime.PARAMETERIZED and entry.instance_cache is None:
+                entry.instance_cache = LruCache()
+            self.__check_refresh_interval(iface, entry)
+            self.__check_resource(iface, entry)
+
+    def __check_entries(self, module_instance: IocModule,
+                        entries: Dict[Type[Any], ServiceEntry[Any]]) -> Dict[Type[Any], ServiceEntry[Any]]:
+        """
+        Check none of the new entries is already registered into the module. Must be called holding the write lock
+
+        :return: The entries to publish, without those already registered by their path
+        """
+        changes = {}
+        for iface, entry in entries.items():
+            existing = module_instance.services.get(iface)
+            if existing is None and module_instance.lazy_services:
+                existing = self.__bind_lazy(module_instance, iface)
+
+            if existing is not None:
+                implementation = entry.factory or entry.svc_type
+                if existing.source is not None and existing.source == object_path(implementation):
+                    # The same binding was already registered by its path, e.g. loaded from a manifest
+                    continue
+                raise IocException(f"Service {str(iface)} is already registered")
+            changes[iface] = entry
+        return changes
+
+    @staticmethod
+    def __class_plan(svc_type: Type[T], module: Type[E], kwargs: Optional[Dict]) -> Optional[InjectionPlan]:
+        """ The fields auto-wired into the constructor of a dataclass or attrs service, unless given as arguments """
+        if hasattr(svc_type.__init__, "__tinyioc_plan__"):
+            return None
+        plan = build_class_plan(svc_type, module)
+        if plan and kwargs:
+            plan = [dep for dep in plan if dep[0] not in kwargs]
+        return plan or None
+
+    @staticmethod
+    def __check_refresh_interval(iface: Any, entry: ServiceEntry[Any]) -> None:
+        if entry.scope == ServiceLifetime.REFRESHING and not (entry.refresh_interval or 0) > 0:
+            raise IocException(f"Service {str(iface)} has the refreshing lifetime, "
+                               f"and requires a positive refresh interval")
+
+    @staticmethod
+    def __check_resource(iface: Any, entry: ServiceEntry[Any]) -> None:
+        """ A resource is set up for each call: generator factories have the transient lifetime """
+        if not entry.is_resource:
+            return
+        if entry.scope == ServiceLifetime.SINGLETON:
+            entry.scope = ServiceLifetime.TRANSIENT
+        elif entry.scope != ServiceLifetime.TRANSIENT:
+            raise IocException(f"Service {str(iface)} is provided by a generator, and can only have "
+                               f"the transient lifetime")
+
+    def __publish(self, module_instance: IocModule, changes: Dict[Type[Any], Optional[ServiceEntry[Any]]]) -> None:
+        """
+        Apply the changes to the module services (`None` removes a service). A single change is applied
+        in place, which is atomic, while a batch, or a change to services shared with a snapshot,
+        is applied to a copy, then published at once. Must be called holding the write lock
+        """
+        if len(changes) == 1 and not module_instance.services_shared:
+            (iface, entry), = changes.items()
+            if entry is None:
+                module_instance.services.pop(iface, None)
+            else:
+                module_instance.services[iface] = entry
+            self.__generation += 1
+            return
+
+        services = dict(module_instance.services)
+        for iface, entry in changes.items():
+            if entry is None:
+                services.pop(iface, None)
+            else:
+                services[iface] = entry
+        module_instance.services = services
+        module_instance.services_shared = False
+        self.__generation += 1
 
     def unregister(self, class_type: Type[T], module: Type[E] = GlobalModule) -> None:
         """
@@ -100,44 +593,1029 @@ class IocContainer:
         :param class_type: The service to unregister
         :param module: The module to unregister the service from
         """
-        if module not in self.__modules:
-            module = GlobalModule
+        module = self.__resolve_module(module)
+        with self.__write_lock:
+            self.__validation = None
+            module_instance = self.__module_instance(module)
+            if module_instance.lazy_services:
+                # Registered by path, and not bound yet
+                module_instance.lazy_services.pop(object_path(class_type), None)
+            svc = module_instance.services.get(class_type)
+            if svc is not None:
+                self.__publish(module_instance, {class_type: None})
+                self.__retire(svc)
 
-        module_instance = self.__modules[module]
-        if class_type in module_instance.services:
-            del module_instance.services[class_type]
+    def replace(self, class_type: Type[T], instance: T, module: Type[E] = GlobalModule,
+                on_dispose: Optional[Callable[[T], None]] = None) -> None:
+        """
+        Atomically replace a registered service with a new instance. Concurrent readers get either
+        the old or the new service, never a missing one
 
-    def get(self, class_type: Type[T], module: Type[E] = GlobalModule) -> Optional[T]:
+        :param class_type: The class-interface of the service to replace
+        :param instance: The new service instance
+        :param module: The module of the service
+        :param on_dispose: Called with the old instance right after the swap (or once no snapshot can restore it).
+            A resolution that started before the swap can still return the old instance
+        :raises IocException: If the service is not registered
         """
-        Retrieve the service, or return `None` if it can't be retrieved
+        self.replace_many({class_type: instance}, module, on_dispose)
+
+    def replace_many(self, instances: Dict[Type[Any], Any], module: Type[E] = GlobalModule,
+                     on_dispose: Optional[Callable[[Any], None]] = None) -> None:
+        """
+        Atomically replace a batch of registered services with new instances, all published at once
+
+        :param instances: The new instance of each class-interface
+        :param module: The module of the services
+        :param on_dispose: Called with each old instance right after the swap (or once no snapshot can restore it).
+            A resolution that started before the swap can still return the old instance
+        :raises IocException: If any of the services is not registered, in which case nothing is replaced
+        """
+        changes = {iface: ServiceEntry(instance, iface, registered_instance=True)
+                   for iface, instance in instances.items()}
+        for iface, entry in changes.items():
+            entry.iface = iface
+
+        module = self.__resolve_module(module)
+        with self.__write_lock:
+            self.__validation = None
+            module_instance = self.__module_instance(module)
+            retired = []
+            for iface, entry in changes.items():
+                old = self.lookup(iface, module)
+                if old is None:
+                    raise IocException(f"Service {str(iface)} is not registered")
+                entry.module = old.module
+                entry.requested_module = old.requested_module
+                retired.append(old)
+            self.__publish(module_instance, changes)
+
+        for old in retired:
+            self.__retire(old, on_dispose)
+
+    def __retire(self, svc: ServiceEntry[T], on_dispose: Optional[Callable[[T], None]] = None) -> None:
+        """
+        Release the state of an entry removed from the registry: stop its refresh, clear its caches
+        and dispose its singleton. An entry that a live snapshot can restore is kept as it is, until
+        the snapshots are gone
+        """
+        with self.__write_lock:
+            if any(snapshot.retains(svc) for snapshot in list(self.__snapshots)):
+                self.__retained.append((svc, on_dispose))
+                return
+        if svc.refresher is not None:
+            svc.refresher.stop()
+        if svc.instance_cache is not None:
+            svc.instance_cache.clear()
+        if svc.instance is not None:
+            clear_method_caches(svc.instance)
+        if on_dispose is not None:
+            svc.on_dispose = on_dispose
+            self.__dispose(svc)
+
+    def __release_retained(self) -> None:
+        """ Retire the entries kept for the snapshots, unless they were restored """
+        with self.__write_lock:
+            retained, self.__retained = self.__retained, []
+            if not retained:
+                return
+            live = {id(svc) for _, _, svc in self.entries()}
+            for module_instance in (*self.__modules.values(), *self.__lazy_modules.values()):
+                live.update(id(svc) for svc in module_instance.lazy_services.values())
+        for svc, on_dispose in retained:
+            if id(svc) not in live:
+                self.__retire(svc, on_dispose)
+
+    def __dispose(self, svc: ServiceEntry[T]) -> None:
+        """ Dispose the singleton of a replaced entry, once (if it was built) """
+        with self.__stats_lock:
+            on_dispose = svc.on_dispose
+            if on_dispose is None or svc.instance is None:
+                return
+            svc.on_dispose = None
+        on_dispose(svc.instance)
+
+    def lookup(self, class_type: Type[T], module: Type[E] = GlobalModule) -> Optional[ServiceEntry[T]]:
+        """
+        Retrieve the registration of a service, without building it
 
         :param class_type: The class name
         :param module: The module
+        :return: The service entry, or None if not found
+        """
+        module_instance = self.__module_instance(module)
+        svc = module_instance.services.get(class_type)
+        if svc is None and module_instance.lazy_services:
+            svc = self.__bind_lazy(module_instance, class_type)
+        if svc is None and isinstance(class_type, Arg):
+            return self.lookup(class_type.svc_type, module)
+        return svc
+
+    def get(self, class_type: Type[T], module: Type[E] = GlobalModule, *, args: Tuple[Any, ...] = ()) -> Optional[T]:
+        """
+        Retrieve the service, or return `None` if it can't be retrieved
+
+        :param class_type: The class name, or an `Arg` marker of a parameterized service
+        :param module: The module
+        :param args: The construction arguments of a parameterized service, which must be hashable
         :return: The service, or None if not found
+        :raises IocException: If construction arguments are given for a service that is not parameterized
+        """
+        module_instance = self.__modules.get(module)
+        if module_instance is None:
+            module_instance = self.__module_instance(module)
+
+        svc = module_instance.services.get(class_type)
+        if svc is None and module_instance.lazy_services:
+            svc = self.__bind_lazy(module_instance, class_type)
+        if svc is not None:
+            if args:
+                return self.__resolve_parameterized(svc, args)
+            return self.__resolve(svc)
+        if isinstance(class_type, Arg):
+            return self.get(class_type.svc_type, module, args=class_type.args)
+        return None
+
+    def get_many(self, class_types: Iterable[Type[Any]], module: Type[E] = GlobalModule) -> Tuple[Any, ...]:
+        """
+        Retrieve several services at once from the same module, in a single pass over its registry.
+        A batch of changes published meanwhile by other threads, e.g. by `replace_many` or `register_many`,
+        is seen entirely or not at all, while the single changes (`register_*`, `unregister`, `replace`)
+        are applied in place, and can be seen by part of the services only
+
+        Example:
+
+        .. code-block::
+
+            db, cache, mailer = container.get_many((DbService, CacheService, MailService))
+
+        :param class_types: The class names
+        :param module: The module
+        :return: The services, in the same order, with `None` for those that can't be retrieved
+        """
+        module_instance = self.__modules.get(module)
+        if module_instance is None:
+            module_instance = self.__module_instance(module)
+
+        services = module_instance.services
+        resolved = []
+        for class_type in class_types:
+            svc = services.get(class_type)
+            if svc is None and module_instance.lazy_services:
+                svc = self.__bind_lazy(module_instance, class_type)
+            if svc is not None:
+                resolved.append(self.__resolve(svc))
+            else:
+                resolved.append(self.get(class_type, module) if isinstance(class_type, Arg) else None)
+        return tuple(resolved)
+
+    def resolver(self, class_types: Iterable[Type[Any]], module: Type[E] = GlobalModule) -> "Resolver":
+        """
+        Create a reusable handle resolving a fixed set of services
+
+        Example:
+
+        .. code-block::
+
+            resolve_deps = container.resolver((DbService, CacheService))
+
+            def handle_request(request):
+                db, cache = resolve_deps()
+                ...
+
+        :param class_types: The class names
+        :param module: The module
+        :return: The resolver
+        """
+        return Resolver(self, tuple(class_types), module, self.__resolve)
+
+    def __resolve(self, svc: ServiceEntry[T]) -> Optional[T]:
+        """ Get the instance of a service according to its lifetime """
+        if svc.is_async and svc.instance is None:
+            raise IocException(f"Service {str(svc.svc_type or svc.factory)} is provided by an async factory, "
+                               f"use `aget`")
+        if svc.scope == ServiceLifetime.SINGLETON:
+            # Read once, as the singleton can be released meanwhile
+            instance = svc.instance
+            if instance is None:
+                # Double-checked locking: concurrent threads build the singleton once
+                with svc.lock:
+                    instance = svc.instance
+                    if instance is None:
+                        instance = svc.instance = self.__construct(svc)
+                if svc.on_dispose is not None:
+                    # The entry was replaced while the singleton was being built
+                    self.__dispose(svc)
+            return instance
+        elif svc.scope == ServiceLifetime.THREAD_LOCAL:
+            slot = getattr(svc.local, "slot", None)
+            if slot is None:
+                slot = self.__store_thread_local(svc, self.__construct(svc))
+            return slot.instance
+        elif svc.scope == ServiceLifetime.REFRESHING:
+            if svc.instance is None:
+                # The first instance is built like a singleton, the next ones in the background
+                with svc.lock:
+                    if svc.instance is None:
+                        svc.instance = self.__construct(svc)
+                        svc.refresher = Refresher(svc, svc.refresh_interval, clear_method_caches)
+                        svc.refresher.start(lambda: self.__construct(svc))
+            return svc.instance
+        elif svc.scope == ServiceLifetime.PARAMETERIZED:
+            return self.__resolve_parameterized(svc, ())
+        elif svc.scope == ServiceLifetime.PROTOTYPE:
+            if svc.clone is None:
+                with svc.lock:
+                    if svc.clone is None:
+                        svc.clone = self.__cloner(self.__construct(svc))
+            return svc.clone()
+        else:
+            return self.__construct(svc)
+
+    @staticmethod
+    def __cloner(template: T) -> Callable[[], T]:
+        """ Get the function copying the template of a prototype service: its `__clone__` method, or a shallow copy """
+        clone = getattr(template, "__clone__", None)
+        if clone is not None:
+            return clone
+        return functools.partial(copy.copy, template)
+
+    def __resolve_parameterized(self, svc: ServiceEntry[T], args: Tuple[Any, ...]) -> T:
+        """ Get the instance of a parameterized service built with the arguments, from its cache """
+        if svc.scope != ServiceLifetime.PARAMETERIZED:
+            raise IocException(f"Service {str(svc.iface)} is not parameterized, and can't be built with arguments")
+        if svc.is_async:
+            raise IocException(f"Service {str(svc.iface)} is provided by an async factory, use `aget`")
+        cache = svc.instance_cache
+        instance = cache.get(args, None)
+        if instance is None:
+            # Concurrent threads build the instance of the same arguments once
+            with svc.lock:
+                instance = cache.peek(args)
+                if instance is None:
+                    instance = self.__construct(svc, args)
+                    cache.put(args, instance)
+        return instance
+
+    async def aget(self, class_type: Type[T], module: Type[E] = GlobalModule, *,
+                   args: Tuple[Any, ...] = ()) -> Optional[T]:
         """
-        if module not in self.__modules:
-            module = GlobalModule
+        Retrieve the service, awaiting its construction if it is provided by an async factory,
+        or return `None` if it can't be retrieved
 
-        module_instance = self.__modules[module]
-        if class_type in module_instance.services:
-            svc = module_instance.services[class_type]
+        :param class_type: The class name, or an `Arg` marker of a parameterized service
+        :param module: The module
+        :param args: The construction arguments of a parameterized service, which must be hashable
+        :return: The service, or None if not found
+        """
+        if isinstance(class_type, Arg):
+            class_type, args = class_type.svc_type, class_type.args
+        svc = self.lookup(class_type, module)
+        if svc is not None:
+            if not svc.is_async:
+                return self.get(class_type, module, args=args)
+            if args or svc.scope == ServiceLifetime.PARAMETERIZED:
+                if svc.scope != ServiceLifetime.PARAMETERIZED:
+                    raise IocException(f"Service {str(svc.iface)} is not parameterized, "
+                                       f"and can't be built with arguments")
+                instance = svc.instance_cache.get(args, None)
+                if instance is None:
+                    instance = await self.__aconstruct(svc, args)
+                    # Keep the instance built first by concurrent coroutines
+                    instance = svc.instance_cache.peek(args) or instance
+                    svc.instance_cache.put(args, instance)
+                return instance
             if svc.scope == ServiceLifetime.SINGLETON:
-                if svc.instance is None and svc.svc_type is not None:
-                    svc.instance = svc.svc_type(**(svc.kwargs or {}))
+                instance = svc.instance
+                if instance is None:
+                    # Concurrent coroutines share the same construction
+                    if svc.pending is None:
+                        svc.pending = asyncio.ensure_future(self.__aconstruct(svc))
+                    try:
+                        instance = svc.instance = await svc.pending
+                    finally:
+                        svc.pending = None
+                return instance
+            elif svc.scope == ServiceLifetime.THREAD_LOCAL:
+                slot = getattr(svc.local, "slot", None)
+                if slot is None:
+                    slot = self.__store_thread_local(svc, await self.__aconstruct(svc))
+                return slot.instance
+            elif svc.scope == ServiceLifetime.PROTOTYPE:
+                if svc.clone is None:
+                    if svc.pending is None:
+                        svc.pending = asyncio.ensure_future(self.__aconstruct(svc))
+                    try:
+                        template = await svc.pending
+                    finally:
+                        svc.pending = None
+                    if svc.clone is None:
+                        svc.clone = self.__cloner(template)
+                return svc.clone()
+            elif svc.scope == ServiceLifetime.REFRESHING:
+                if svc.instance is None:
+                    if svc.pending is None:
+                        svc.pending = asyncio.ensure_future(self.__aconstruct(svc))
+                    try:
+                        instance = await svc.pending
+                    finally:
+                        svc.pending = None
+                    if svc.refresher is None:
+                        svc.instance = instance
+                        svc.refresher = Refresher(svc, svc.refresh_interval, clear_method_caches)
+                        svc.refresher.start_async(lambda: self.__aconstruct(svc))
                 return svc.instance
             else:
-                if svc.svc_type is not None:
-                    return svc.svc_type(**(svc.kwargs or {}))
+                return await self.__aconstruct(svc)
         return None
 
-    def get_module(self, module: Type[E]):
+    def __store_thread_local(self, svc: ServiceEntry[T], instance: T) -> _ThreadSlot:
+        """ Store the instance for the current thread, and track it until the thread ends """
+        slot = _ThreadSlot(instance)
+        svc.local.slot = slot
+        with self.__stats_lock:
+            svc.threads += 1
+        weakref.finalize(slot, self.__release_thread_local, svc)
+        return slot
+
+    def __release_thread_local(self, svc: ServiceEntry[T]) -> None:
+        with self.__stats_lock:
+            svc.threads -= 1
+
+    def __construct(self, svc: ServiceEntry[T], args: Tuple[Any, ...] = ()) -> Optional[T]:
+        """ Build a new instance of the service, with the construction arguments of a parameterized service """
+        svc.constructed += 1
+        if tracemalloc.is_tracing():
+            return self.__traced_construct(svc, args)
+        return self.__build(svc, args)
+
+    def __traced_construct(self, svc: ServiceEntry[T], args: Tuple[Any, ...]) -> Optional[T]:
+        """ Build the service, recording the memory allocated by its construction, less that of its dependencies """
+        tracing = self.__tracing
+        outer = getattr(tracing, "nested", 0)
+        tracing.nested = 0
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            return self.__build(svc, args)
+        finally:
+            allocated = tracemalloc.get_traced_memory()[0] - before
+            svc.allocated = allocated - tracing.nested
+            tracing.nested = outer + allocated
+
+    def __build(self, svc: ServiceEntry[T], args: Tuple[Any, ...]) -> Optional[T]:
+        if svc.source is not None and svc.svc_type is None and svc.factory is None:
+            self.__import_source(svc)
+        if svc.factory is not None:
+            deps = {}
+            resources = inject_services(self, svc.plan, deps)
+            if resources is not None:
+                self.__check_resource_dependencies(svc, resources)
+                return nested_resource(svc.factory, args, deps, resources, svc.is_async)
+            instance = svc.factory(*args, **deps)
+            if svc.is_resource:
+                instance = AsyncResource(instance) if svc.is_async else Resource(instance)
+        elif svc.svc_type is not None:
+            kwargs = svc.kwargs or {}
+            if svc.deferred_kwargs:
+                kwargs = {name: value.resolve(self) if isinstance(value, (Deferred, ServiceRef)) else value
+                          for name, value in kwargs.items()}
+            if svc.plan is not None:
+                # The auto-wired fields of a dataclass, resolved through the precomputed plan
+                kwargs = dict(kwargs)
+                resources = inject_services(self, svc.plan, kwargs)
+                if resources is not None:
+                    self.__check_resource_dependencies(svc, resources)
+            instance = svc.svc_type(*args, **kwargs)
+        else:
+            return None
+        if self.__interceptors and not svc.is_resource:
+            # The resource wrapper is unwrapped by the injected function, the interceptors don't apply to it
+            instance = self.__intercept(svc, instance)
+        return instance
+
+    @staticmethod
+    def __check_resource_dependencies(svc: ServiceEntry[T], resources: PendingResources) -> None:
+        """ Only the resources, set up for each call, can depend on other resources """
+        if not svc.is_resource:
+            param, _ = resources[0]
+            raise IocException(f"Service {str(svc.iface)} depends on the resource of its parameter '{param}', "
+                               f"which only resource factories and injected functions can")
+
+    async def __aconstruct(self, svc: ServiceEntry[T], args: Tuple[Any, ...] = ()) -> T:
+        """ Build a new instance of a service provided by an async factory """
+        svc.constructed += 1
+        if svc.factory is None:
+            self.__import_source(svc)
+        deps = {}
+        resources = await ainject_services(self, svc.plan, deps)
+        if resources is not None:
+            self.__check_resource_dependencies(svc, resources)
+            return nested_resource(svc.factory, args, deps, resources, True)
+        if svc.is_resource:
+            # The async generator is set up by the injected function
+            return AsyncResource(svc.factory(*args, **deps))
+        instance = await svc.factory(*args, **deps)
+        if self.__interceptors:
+            instance = self.__intercept(svc, instance)
+        return instance
+
+    def add_interceptor(self, interceptor: Interceptor, iface: Optional[Type[Any]] = None,
+                        module: Optional[Type[E]] = None) -> None:
+        """
+        Register an interceptor, wrapping the public methods of the services built from now on.
+        An interceptor is a decorator, applied once to each method of the service class: the built
+        instances are switched to a generated subclass with the decorated methods
+
+        Example:
+
+        .. code-block::
+
+            def timed(method):
+                @functools.wraps(method)
+                def wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return method(*args, **kwargs)
+                    finally:
+                        metrics.observe(method.__qualname__, time.perf_counter() - start)
+                return wrapper
+
+            container.add_interceptor(timed, iface=DatabaseService)
+
+        :param interceptor: The decorator to apply to the methods
+        :param iface: The class-interface of the intercepted services, defaults to every service of the module
+        :param module: The module of the intercepted services, defaults to any module
+        """
+        if iface is None and module is None:
+            raise IocException("An interceptor requires a class-interface, a module, or both")
+        with self.__write_lock:
+            self.__interceptors.setdefault((module, iface), []).append(interceptor)
+
+    def remove_interceptor(self, interceptor: Interceptor, iface: Optional[Type[Any]] = None,
+                           module: Optional[Type[E]] = None) -> None:
+        """
+        Unregister an interceptor. Services already built are not affected
+
+        :param interceptor: The interceptor
+        :param iface: The class-interface it was registered for
+        :param module: The module it was registered for
+        """
+        with self.__write_lock:
+            interceptors = self.__interceptors.get((module, iface), [])
+            if interceptor in interceptors:
+                interceptors.remove(interceptor)
+            if not interceptors:
+                self.__interceptors.pop((module, iface), None)
+
+    def interceptors(self, svc: ServiceEntry[T]) -> Tuple[Interceptor, ...]:
+        """
+        Get the interceptors applied to the instances of a service
+
+        :param svc: The service entry
+        :return: The interceptors, in the order they are applied
+        """
+        interceptors = self.__interceptors
+        return tuple(interceptors.get((svc.module, svc.iface), []) + interceptors.get((None, svc.iface), []) +
+                     interceptors.get((svc.module, None), []))
+
+    def __intercept(self, svc: ServiceEntry[T], instance: T) -> T:
+        """ Apply the interceptors of the service to the instance, if any """
+        chain = self.interceptors(svc)
+        if not chain:
+            return instance
+        return intercept(instance, chain)
+
+    @staticmethod
+    def __import_source(svc: ServiceEntry[T]) -> None:
+        """ Import the implementation of a service registered by its path """
+        implementation = import_object(svc.source)
+        if svc.is_factory:
+            svc.plan = build_plan(implementation, svc.module)
+            svc.is_resource = inspect.isgeneratorfunction(implementation) or inspect.isasyncgenfunction(implementation)
+            IocContainer.__check_resource(svc.iface, svc)
+            svc.factory = implementation
+        else:
+            svc.plan = IocContainer.__class_plan(implementation, svc.module, svc.kwargs)
+            svc.svc_type = implementation
+
+    def __module_instance(self, module: Union[Type[E], str]) -> IocModule:
+        """ Get the instance of a module, falling back to the global module if it's not registered """
+        if isinstance(module, str):
+            module = self.__import_module(module)
+        module_instance = self.__modules.get(module)
+        if module_instance is None:
+            if self.__lazy_modules:
+                module_instance = self.__bind_lazy_module(module)
+            if module_instance is None:
+                module_instance = self.__modules[GlobalModule]
+        return module_instance
+
+    def __resolve_module(self, module: Union[Type[E], str]) -> Type[E]:
+        """
+        Get a module given by its import path, importing it. Called before taking the write lock: the import
+        holds the import lock, then takes the write lock to register the module and its services
+        """
+        return self.__import_module(module) if isinstance(module, str) else module
+
+    def __import_module(self, path: str) -> Type[E]:
+        """ Get a module by its import path, importing and registering it the first time """
+        module = self.__module_paths.get(path)
+        if module is not None:
+            return module
+        # A dedicated lock, so that the registrations made by the imported modules don't wait for each other
+        with self.__import_lock:
+            module = self.__module_paths.get(path)
+            if module is not None:
+                return module
+            try:
+                module = import_object(path)
+            except (ImportError, AttributeError) as e:
+                raise IocException(f"Module {path} can't be imported: {e}")
+            if not (isinstance(module, type) and issubclass(module, IocModule)):
+                raise IocException(f"{path} is not a module")
+            with self.__write_lock:
+                # The module may have registered itself while being imported, through the `module` decorator
+                if module not in self.__modules:
+                    self.register_module(module)
+                    if hasattr(module, "provides"):
+                        self.register_many(module.provides, module)
+                self.__module_paths = {**self.__module_paths, path: module}
+        return module
+
+    def __lazy_module_instance(self, path: str, create: bool = True) -> Optional[IocModule]:
+        """
+        Get the instance of a module by its path, keeping it pending if the module was not imported yet
+
+        :param path: The import path of the module
+        :param create: Whether to create the pending module, when it's not known yet
+        """
+        for module, module_instance in self.__modules.items():
+            if object_path(module) == path:
+                return module_instance
+        if not create:
+            return self.__lazy_modules.get(path)
+        if path not in self.__lazy_modules:
+            self.__lazy_modules[path] = IocModule()
+        return self.__lazy_modules[path]
+
+    def __bind_lazy_module(self, module: Type[E]) -> Optional[IocModule]:
+        """ Register a module that was only known by its path, moving its pending services """
+        with self.__write_lock:
+            if module in self.__modules:
+                return self.__modules[module]
+            pending = self.__lazy_modules.pop(object_path(module), None)
+            if pending is None:
+                return None
+            module_instance = module()
+            module_instance.lazy_services = pending.lazy_services
+            for svc in module_instance.lazy_services.values():
+                svc.module = module
+            self.__modules = {**self.__modules, module: module_instance}
+            self.__generation += 1
+        return module_instance
+
+    def __bind_lazy(self, module_instance: IocModule, class_type: Type[T]) -> Optional[ServiceEntry[T]]:
+        """ Bind a service that was registered by the path of its interface """
+        path = object_path(class_type)
+        if path not in module_instance.lazy_services:
+            # A miss is decided without the lock: the entries registered by path are only removed under the lock
+            return module_instance.services.get(class_type)
+        with self.__write_lock:
+            svc = module_instance.services.get(class_type)
+            if svc is not None:
+                return svc
+            svc = module_instance.lazy_services.pop(path, None)
+            if svc is not None:
+                svc.iface = class_type
+                if not svc.is_factory and svc.source == path:
+                    svc.plan = self.__class_plan(class_type, svc.module, svc.kwargs)
+                    svc.svc_type = class_type
+                self.__publish(module_instance, {class_type: svc})
+        return svc
+
+    def entries(self) -> Iterator[Tuple[Type[E], Type[Any], ServiceEntry[Any]]]:
+        """
+        Iterate over the registered services
+
+        :return: An iterator of `(module, class-interface, entry)` tuples
+        """
+        for module, module_instance in list(self.__modules.items()):
+            for iface, svc in list(module_instance.services.items()):
+                yield module, iface, svc
+
+    def lazy_entries(self) -> Iterator[Tuple[Optional[str], str, ServiceEntry[Any]]]:
+        """
+        Iterate over the services registered by path that are not bound yet, including those of the modules
+        that were not imported yet
+
+        :return: An iterator of `(module path, class-interface path, entry)` tuples, the module path being `None`
+            for the global module
+        """
+        for module, module_instance in list(self.__modules.items()):
+            path = None if module is GlobalModule else object_path(module)
+            for interface, svc in list(module_instance.lazy_services.items()):
+                yield path, interface, svc
+        for path, module_instance in list(self.__lazy_modules.items()):
+            for interface, svc in list(module_instance.lazy_services.items()):
+                yield path, interface, svc
+
+    def validate(self, functions: Optional[Iterable[Callable]] = None) -> None:
+        """
+        Check the whole object graph against the registry, reporting every error at once:
+        dependencies that can't be found, unknown modules (which would silently be replaced
+        by the global module) and dependency cycles between services
+
+        The parameters that are not services, those with a builtin or generic type, or with a default value
+        other than `FromModule`, are only checked when their type is registered.
+        Once the validation passes, the injection into the checked functions whose dependencies are all
+        registered skips the runtime checks, until the container is changed again
+
+        :param functions: The injected functions to check, defaults to all the functions
+            decorated with `inject` or `inject_getter`
+        :raises IocValidationException: If any error is found
+        """
+        errors = []
+        if functions is None:
+            functions = list(injected_functions)
+
+        if self.__candidates:
+            errors.append(f"{len(self.__candidates)} conditional registrations are pending, "
+                          f"the container must be activated first")
+        complete = []
+        for fn in functions:
+            plan = getattr(fn, "__tinyioc_plan__", None)
+            if plan is not None:
+                fn_errors, resolved = self.__validate_plan(plan, f"function {fn.__qualname__}",
+                                                           inspect.signature(fn).parameters)
+                errors.extend(fn_errors)
+                if resolved:
+                    complete.append(fn)
+
+        graph = {}
+        for module, module_instance in self.__modules.items():
+            for iface, svc in module_instance.services.items():
+                if svc.requested_module is not None and not self.__is_known_module(svc.requested_module):
+                    errors.append(f"Service {iface.__qualname__} is registered into the unknown module "
+                                  f"{svc.requested_module.__qualname__}")
+                plan = self.construction_plan(svc)
+                parameters = inspect.signature(svc.factory).parameters if svc.factory is not None else None
+                errors.extend(self.__validate_plan(plan, f"service {iface.__qualname__}", parameters, svc)[0])
+                graph[(module, iface)] = [(dep_module, dep_type) for _, dep_type, dep_module in plan]
+
+        for cycle in find_cycles(graph):
+            path = " -> ".join(iface.__qualname__ for _, iface in cycle)
+            errors.append(f"Dependency cycle: {path}")
+
+        if errors:
+            raise IocValidationException(errors)
+        validation = object()
+        for fn in complete:
+            fn.__tinyioc_validated__ = validation
+        self.__validation = validation
+
+    def graph(self, functions: Optional[Iterable[Callable]] = None) -> "DependencyGraph":
+        """
+        Build the dependency graph of the registered services, from their construction plans,
+        and of the injected functions, to analyse it or export it
+
+        Example:
+
+        .. code-block::
+
+            graph = container.graph()
+            print(graph.summary())
+            with open("services.dot", "w") as f:
+                f.write(graph.to_dot())
+
+        :param functions: The injected functions to include, defaults to all the functions
+            decorated with `inject` or `inject_getter`
+        :return: The dependency graph
+        """
+        # Imported on use, so that the module can run as `python -m tinyioc.graph`
+        from .graph import DependencyGraph, GraphNode
+
+        if functions is None:
+            functions = list(injected_functions)
+
+        graph = DependencyGraph()
+        pending = []
+        for module, iface, svc in self.entries():
+            graph.add_node(self.__graph_node(module, iface, svc))
+            parameters = inspect.signature(svc.factory).parameters if svc.factory is not None else None
+            pending.append(((module, iface), self.construction_plan(svc), parameters))
+        for fn in functions:
+            plan = getattr(fn, "__tinyioc_plan__", None)
+            if plan is not None:
+                graph.add_node(GraphNode(fn, f"{fn.__module__}.{fn.__qualname__}", "function"))
+                pending.append((fn, plan, inspect.signature(fn).parameters))
+
+        for source, plan, parameters in pending:
+            for name, dep_type, dep_module in plan:
+                if isinstance(dep_module, str) and self.__module_paths.get(dep_module) is None:
+                    # The lazy modules are not imported to build the graph
+                    continue
+                svc = self.lookup(dep_type, dep_module)
+                if svc is not None:
+                    node = self.__graph_node(svc.module, svc.iface, svc)
+                elif parameters is not None and name in parameters \
+                        and not self.__is_service_parameter(parameters[name], dep_type):
+                    # A plain argument, like `validate` skips
+                    continue
+                else:
+                    node = self.__graph_node(self.__module_instance(dep_module).__class__, dep_type, None)
+                graph.add_node(node)
+                graph.add_dependency(source, node.key)
+        return graph
+
+    @staticmethod
+    def __graph_node(module: Type[E], iface: Type[Any], svc: Optional[ServiceEntry[Any]]) -> "GraphNode":
+        from .graph import GraphNode
+
+        name = f"{module.__qualname__}/{getattr(iface, '__qualname__', str(iface))}"
+        if svc is None:
+            return GraphNode((module, iface), name, "service", module.__qualname__, registered=False)
+        return GraphNode((module, iface), name, "service", module.__qualname__, svc.scope, constructed=svc.constructed)
+
+    @staticmethod
+    def construction_plan(svc: ServiceEntry[T]) -> InjectionPlan:
+        """
+        Get the dependencies injected when a service is built: the parameters of its factory,
+        or of its constructor, and its service references
+
+        :param svc: The service entry
+        :return: The injection plan, empty for the services registered as instances
+        """
+        if svc.factory is not None:
+            return svc.plan
+        if svc.svc_type is not None and svc.instance is None:
+            plan = list(svc.plan or getattr(svc.svc_type.__init__, "__tinyioc_plan__", None) or [])
+            if svc.deferred_kwargs:
+                plan.extend((name, value.svc_type, value.module) for name, value in svc.kwargs.items()
+                            if isinstance(value, ServiceRef))
+            return plan
+        return []
+
+    def __validate_plan(self, plan: InjectionPlan, owner: str,
+                        parameters: Optional[Mapping[str, inspect.Parameter]] = None,
+                        owner_svc: Optional[ServiceEntry[Any]] = None) -> Tuple[List[str], bool]:
+        """
+        Check the dependencies of a function, or of a service
+
+        :param plan: The injection plan
+        :param owner: The function or service, in the error messages
+        :param parameters: The parameters of the function, to tell the services from the other parameters
+        :param owner_svc: The entry of the service, to check it can depend on resources
+        :return: The errors, and whether every dependency was found registered
+        """
+        errors = []
+        resolved = True
+        for name, dep_type, dep_module in plan:
+            if not self.__is_known_module(dep_module):
+                errors.append(f"Parameter '{name}' of {owner} refers to the unknown module {_module_name(dep_module)}")
+            elif isinstance(dep_module, str) and self.__module_paths.get(dep_module) is None:
+                # The services of a lazy module are checked once it's imported
+                resolved = False
+            else:
+                svc = self.lookup(dep_type, dep_module)
+                if svc is None:
+                    resolved = False
+                    if parameters is not None and name in parameters \
+                            and not self.__is_service_parameter(parameters[name], dep_type):
+                        continue
+                    errors.append(f"Parameter '{name}' of {owner} requires "
+                                  f"{getattr(dep_type, '__qualname__', dep_type)}, "
+                                  f"which is not registered into {_module_name(dep_module)}")
+                elif isinstance(dep_type, Arg) and svc.scope != ServiceLifetime.PARAMETERIZED:
+                    errors.append(f"Parameter '{name}' of {owner} requires {dep_type!r}, "
+                                  f"but the service is not parameterized")
+                elif owner_svc is not None and svc.is_resource and not owner_svc.is_resource:
+                    errors.append(f"Parameter '{name}' of {owner} requires a resource, which only resource "
+                                  f"factories and injected functions can depend on")
+                elif owner_svc is not None and svc.is_resource and svc.is_async and not owner_svc.is_async:
+                    errors.append(f"Parameter '{name}' of {owner} requires an async resource, "
+                                  f"but the service is provided by a generator")
+        return errors, resolved
+
+    @staticmethod
+    def __is_service_parameter(parameter: inspect.Parameter, dep_type: Any) -> bool:
+        """ Whether an unregistered parameter is a missing service, rather than a plain argument """
+        if isinstance(parameter.default, (FromModule, Arg)) or isinstance(dep_type, Arg):
+            return True
+        if parameter.default is not inspect.Parameter.empty:
+            return False
+        return isinstance(dep_type, type) and dep_type.__module__ != "builtins"
+
+    def __is_known_module(self, module: Union[Type[E], str]) -> bool:
+        if isinstance(module, str):
+            return module in self.__module_paths or module in self.__lazy_modules
+        return module in self.__modules or object_path(module) in self.__lazy_modules
+
+    def stats(self) -> Dict[Type[E], Dict[Type[Any], Dict[str, Any]]]:
+        """
+        Collect the statistics of the registered services, by module and service
+
+        Example:
+
+        .. code-block::
+
+            {GlobalModule: {DbSession: {"lifetime": ServiceLifetime.THREAD_LOCAL, "constructed": 4, "threads": 2}}}
+
+        :return: The statistics of each service: how many instances have been built (approximate
+            when they are built concurrently),
+            for thread-local services how many live threads hold one, for refreshing services how many
+            refreshes succeeded and failed, with the last error, for parameterized services the hits, misses,
+            evictions and size of their instance cache, and for singletons with
+            cached methods the hits, misses and evictions of each method cache
+        """
+        stats = {}
+        with self.__stats_lock:
+            for module, module_instance in self.__modules.items():
+                module_stats = {}
+                for iface, svc in module_instance.services.items():
+                    svc_stats = {"lifetime": svc.scope, "constructed": svc.constructed}
+                    if svc.scope == ServiceLifetime.THREAD_LOCAL:
+                        svc_stats["threads"] = svc.threads
+                    elif svc.refresher is not None:
+                        svc_stats["refreshes"] = svc.refresher.refreshes
+                        svc_stats["refresh_failures"] = svc.refresher.failures
+                        svc_stats["last_refresh_error"] = svc.refresher.last_error
+                    elif svc.instance_cache is not None:
+                        svc_stats["instances"] = svc.instance_cache.stats()
+                    caches = method_caches(svc.instance)
+                    if caches:
+                        svc_stats["method_caches"] = {name: cache.stats() for name, cache in caches.items()}
+                    module_stats[iface] = svc_stats
+                stats[module] = module_stats
+        return stats
+
+    def memory_report(self) -> "MemoryReport":
+        """
+        Estimate the memory retained by the materialized services, by module and service: the singletons,
+        the instances of the refreshing services, the templates of the prototypes and the instance caches
+        of the parameterized services. Objects retained by several services are counted once, as shared.
+        While `tracemalloc` is tracing, the report also gives the bytes allocated by the construction
+        of each service, excluding its dependencies
+
+        Example:
+
+        .. code-block::
+
+            tracemalloc.start()
+            ...
+            print(container.memory_report().summary())
+
+        :return: The report
+        """
+        from .memory import ServiceMemory, build_report
+
+        roots = []
+        for module, iface, svc in self.entries():
+            if svc.scope in (ServiceLifetime.SINGLETON, ServiceLifetime.REFRESHING):
+                root = svc.instance
+            elif svc.scope == ServiceLifetime.PROTOTYPE:
+                root = svc.clone
+            elif svc.scope == ServiceLifetime.PARAMETERIZED:
+                root = svc.instance_cache
+            else:
+                root = None
+            if root is not None:
+                name = f"{module.__qualname__}/{getattr(iface, '__qualname__', str(iface))}"
+                roots.append((ServiceMemory(module, iface, name, svc.scope, svc.allocated,
+                                            svc.pinned or svc.registered_instance), root))
+        return build_report(roots, excluded=(self,))
+
+    def pin(self, class_type: Type[T], module: Type[E] = GlobalModule, pinned: bool = True) -> None:
+        """
+        Keep a singleton when the container releases the unpinned singletons, e.g. a connection pool
+        that is expensive to rebuild. The services registered as instances are always pinned
+
+        :param class_type: The class-interface of the service
+        :param module: The module of the service
+        :param pinned: False to unpin the service
+        :raises IocException: If the service is not registered
+        """
+        svc = self.lookup(class_type, module)
+        if svc is None:
+            raise IocException(f"Service {str(class_type)} is not registered")
+        svc.pinned = pinned
+
+    def release_singletons(self, module: Optional[Type[E]] = None,
+                           min_size: int = 0) -> List[Tuple[Type[E], Type[Any]]]:
+        """
+        Release the singletons built by the container that are not pinned, to reclaim their memory
+        under pressure. They are built again when next requested, while the code holding them keeps
+        using the released instances. The singletons of async factories are kept, as `get` can't rebuild them
+
+        :param module: Release only the singletons of this module
+        :param min_size: Release only the singletons retaining at least these bytes, as estimated
+            by `memory_report`
+        :return: The `(module, class-interface)` of the released singletons
+        """
+        sizes = None
+        if min_size:
+            sizes = {(service.module, service.iface): service.size for service in self.memory_report().services}
+        released = []
+        for svc_module, iface, svc in self.entries():
+            if (module is not None and svc_module is not module) or svc.scope != ServiceLifetime.SINGLETON \
+                    or svc.pinned or svc.registered_instance or svc.is_async or svc.on_dispose is not None:
+                continue
+            if sizes is not None and sizes.get((svc_module, iface), 0) < min_size:
+                continue
+            with svc.lock:
+                instance = svc.instance
+                if instance is None:
+                    continue
+                svc.instance = None
+                svc.allocated = None
+            clear_method_caches(instance)
+            released.append((svc_module, iface))
+        if released:
+            with self.__write_lock:
+                self.__generation += 1
+        return released
+
+    def snapshot(self) -> ContainerSnapshot:
+        """
+        Capture the state of the registry, to restore it later. The services of each module are shared with the
+        snapshot rather than copied, and copied only by the next change: taking a snapshot costs a few operations
+        for each module, regardless of the number of services
+
+        Example:
+
+        .. code-block::
+
+            snapshot = container.snapshot()
+            register_instance(FakeMailService(), register_for=MailService)
+            ...
+            container.restore(snapshot)
+
+        :return: The snapshot
+        """
+        with self.__write_lock:
+            services = {}
+            lazy_services = {}
+            for module_instance in self.__modules.values():
+                module_instance.services_shared = True
+                services[module_instance] = module_instance.services
+                if module_instance.lazy_services:
+                    lazy_services[module_instance] = dict(module_instance.lazy_services)
+            lazy_modules = {path: dict(pending.lazy_services) for path, pending in self.__lazy_modules.items()}
+            interceptors = {key: list(chain) for key, chain in self.__interceptors.items()}
+            snapshot = ContainerSnapshot(dict(self.__modules), services, lazy_services, lazy_modules,
+                                         dict(self.__module_paths), interceptors, list(self.__candidates),
+                                         self.__profiles)
+            self.__snapshots.add(snapshot)
+        weakref.finalize(snapshot, self.__release_retained)
+        return snapshot
+
+    def restore(self, snapshot: ContainerSnapshot) -> None:
+        """
+        Restore the registry to the state captured by a snapshot, discarding the modules and services
+        registered since. Singletons built meanwhile, by services that were already registered, are kept,
+        while the services registered since stop refreshing. The services replaced or unregistered since
+        come back as they were: their singletons are disposed, and their refresh stopped, only once
+        no live snapshot can restore them
+
+        :param snapshot: The snapshot, which can be restored again later
+        """
+        with self.__write_lock:
+            self.__validation = None
+            refreshing = [svc for _, _, svc in self.entries() if svc.refresher is not None]
+            for module_instance, services in snapshot.services.items():
+                module_instance.services = services
+                module_instance.services_shared = True
+                module_instance.lazy_services = dict(snapshot.lazy_services.get(module_instance, {}))
+            self.__modules = dict(snapshot.modules)
+
+            self.__lazy_modules = {}
+            for path, lazy_services in snapshot.lazy_modules.items():
+                pending = IocModule()
+                pending.lazy_services = dict(lazy_services)
+                self.__lazy_modules[path] = pending
+            self.__module_paths = dict(snapshot.module_paths)
+            self.__interceptors = {key: list(chain) for key, chain in snapshot.interceptors.items()}
+            self.__candidates = list(snapshot.candidates)
+            self.__profiles = snapshot.profiles
+            self.__generation += 1
+
+        for svc in refreshing:
+            if not snapshot.retains(svc):
+                self.__retire(svc)
+        # The entries brought back are no longer retired
+        self.__release_retained()
+
+    def get_module(self, module: Union[Type[E], str]):
         """
         Get a module by its class name
 
-        :param module: The module class name
+        :param module: The module class name, or the import path of a module registered lazily
         """
+        if isinstance(module, str):
+            module = self.__import_module(module)
         if module in self.__modules:
             return self.__modules[module]
+        if self.__lazy_modules:
+            return self.__bind_lazy_module(module)
         return None
 
     def register_module(self, module: Type[E]):
@@ -146,16 +1624,58 @@ class IocContainer:
 
         :param module: The module class name
         """
-        if module not in self.__modules:
-            self.__modules[module] = module()
-        else:
-            raise IocException(f"Module {str(module)} is already registered!")
+        with self.__write_lock:
+            self.__validation = None
+            if module not in self.__modules:
+                if self.__lazy_modules and self.__bind_lazy_module(module) is not None:
+                    return
+                self.__modules = {**self.__modules, module: module()}
+                self.__generation += 1
+            else:
+                raise IocException(f"Module {str(module)} is already registered!")
 
-    def unregister_module(self, module: Type[E]):
+    def register_module_lazy(self, path: str) -> None:
+        """
+        Register a module by its import path, without importing it. The module is imported, and its `provides`
+        registered, the first time a service is retrieved from it, e.g. by a function injected with
+        `FromModule("package.module:ModuleName")`. The import happens once, even when several threads request
+        the module at the same time
+
+        Example:
+
+        .. code-block::
+
+            container.register_module_lazy("myapp.payments:PaymentsModule")
+
+            @inject()
+            def checkout(gateway: PaymentGateway = FromModule("myapp.payments:PaymentsModule")):
+                ...
+
+        :param path: The import path of the module, as `package.module:ModuleName`
+        :raises IocException: If the module is already registered
+        """
+        with self.__write_lock:
+            self.__validation = None
+            if path in self.__module_paths or any(object_path(module) == path for module in self.__modules):
+                raise IocException(f"Module {path} is already registered!")
+            self.__module_paths = {**self.__module_paths, path: None}
+
+    def unregister_module(self, module: Union[Type[E], str]):
         """
         Unregister a module
 
-        :param module: The module class name
+        :param module: The module class name, or the import path of a module registered lazily
         """
-        if module in self.__modules:
-            del self.__modules[module]
+        with self.__write_lock:
+            self.__validation = None
+            if isinstance(module, str):
+                path = module
+                module = self.__module_paths.get(path)
+            else:
+                path = object_path(module)
+            if module in self.__modules:
+                self.__modules = {key: value for key, value in self.__modules.items() if key is not module}
+                self.__generation += 1
+            self.__lazy_modules.pop(path, None)
+            if path in self.__module_paths:
+                self.__module_paths = {key: value for key, value in self.__module_paths.items() if key != path}
@@ -2,11 +2,17 @@
 Decorators to inject and register services
 """
 
+import functools
 import inspect
 from typing import Callable, TypeVar, Type, Optional
+from .cache import LruCache, METHOD_CACHES_ATTR
 from .container import IocContainer
-from .module.module import GlobalModule, IocModule, FromModule
-from inspect import signature, Parameter
+from .injection_plan import build_plan, injected_functions
+from .instrumentation import SAMPLING, InjectionStats, call_sampled, acall_sampled
+from .module.module import GlobalModule, IocModule
+from .profiles import Condition, Profile
+from .resources import call_with_resources, acall_with_resources, inject_services, ainject_services
+from inspect import Parameter
 
 from .types import ServiceLifetime
 
@@ -31,6 +37,14 @@ def inject(module: Type[E] = GlobalModule):
           user = database_service.getUser(...)
           ...
 
+  The services provided by generator factories are per-call resources: they are set up
+  before the call, in order, and torn down after it in reverse order, also when the
+  function raises. In coroutine functions, the consecutive resources of async generators
+  are torn down concurrently.
+
+  With `enable_injection_sampling`, a fraction of the calls record the time spent
+  injecting the services and in the function body.
+
   This behavior is optimal for tests, where you call the
   function with your mocked object. e.g.
 
@@ -50,32 +64,49 @@ def inject(module: Type[E] = GlobalModule):
   """
 
   def inner(fn: Callable):
-    # Get the function signature (declared parameters)
-    sig = signature(fn)
-
+    # Compute the dependencies once, from the function signature (declared parameters)
+    plan = build_plan(fn, module)
+    stats = InjectionStats(f"{fn.__module__}.{fn.__qualname__}")
+
+    if inspect.iscoroutinefunction(fn):
+      @functools.wraps(fn)
+      async def async_wrapper(*args, **kwargs):
+        if SAMPLING.period:
+          stats.calls += 1
+          if not stats.calls % SAMPLING.period:
+            return await acall_sampled(fn, plan, args, kwargs, stats)
+
+        resources = await ainject_services(IocContainer.get_instance(), plan, kwargs)
+        if resources is not None:
+          return await acall_with_resources(fn, args, kwargs, resources)
+        return await fn(*args, **kwargs)
+
+      async_wrapper.__tinyioc_plan__ = plan
+      async_wrapper.__tinyioc_stats__ = stats
+      injected_functions.add(async_wrapper)
+      return async_wrapper
+
+    @functools.wraps(fn)
     def wrapper(*args, **kwargs):
-      inj_kwargs = {}
-
-      for param in sig.parameters:
-        param_def = sig.parameters[param].default
-        cls_type = sig.parameters[param].annotation
-        # If the function parameter is a named service in the container,
-        # and it has not been already provided to the function, inject it
-        if cls_type is not Parameter.empty and param not in kwargs:
-          param_module = module
-          param_cls = cls_type
-
-          if isinstance(param_def, FromModule):
-            param_module = param_def.module
-
-          svc_instance = IocContainer.get_instance().get(param_cls, param_module)
-          if svc_instance is not None:
-            inj_kwargs[param] = svc_instance
-
-      # Merge the original parameters with the injected services
-      kwargs.update(inj_kwargs)
+      if SAMPLING.period:
+        stats.calls += 1
+        if not stats.calls % SAMPLING.period:
+          return call_sampled(fn, plan, args, kwargs, stats)
+
+      container = IocContainer.get_instance()
+      validation = container.validation
+      # The services the caller didn't pass are injected, the missing ones are left unfilled,
+      # unless the validation found every dependency registered
+      resources = inject_services(container, plan, kwargs,
+                                  validation is not None and wrapper.__tinyioc_validated__ is validation)
+      if resources is not None:
+        return call_with_resources(fn, args, kwargs, resources)
       return fn(*args, **kwargs)
 
+    wrapper.__tinyioc_plan__ = plan
+    wrapper.__tinyioc_stats__ = stats
+    wrapper.__tinyioc_validated__ = None
+    injected_functions.add(wrapper)
     return wrapper
 
   return inner
@@ -99,6 +130,7 @@ def inject_getter(module: Type[E] = GlobalModule):
   """
 
   def inner(fn: Callable[[], T]) -> Callable[[], T]:
+    @functools.wraps(fn)
     def wrapper(*args, **kwargs):
       svc = IocContainer.get_instance().get(ret_type, module)
       return svc
@@ -107,6 +139,8 @@ def inject_getter(module: Type[E] = GlobalModule):
     ret_type = sig.return_annotation
 
     if ret_type is not Parameter.empty:
+      wrapper.__tinyioc_plan__ = [("return", ret_type, module)]
+      injected_functions.add(wrapper)
       return wrapper
     else:
       return fn
@@ -115,9 +149,12 @@ def inject_getter(module: Type[E] = GlobalModule):
 
 
 def injectable(scope: ServiceLifetime = ServiceLifetime.SINGLETON, module: Type[E] = GlobalModule,
-               register_for: Optional[Type[K]] = None, **kwargs):
+               register_for: Optional[Type[K]] = None, refresh_interval: Optional[float] = None,
+               instance_cache: Optional[LruCache] = None, profile: Optional[Profile] = None,
+               when: Optional[Condition] = None, **kwargs):
   """
-  Registers the class into the IOC container
+  Registers the class into the IOC container. With a `profile` or a `when` condition, the class is only
+  registered if they match when the container is activated
 
   Example:
 
@@ -127,14 +164,71 @@ def injectable(scope: ServiceLifetime = ServiceLifetime.SINGLETON, module: Type[
       class MailService:
           ...
 
+      @injectable(register_for=MailService, profile="local")
+      class ConsoleMailService(MailService):
+          ...
+
   :param scope: The scope of this service (singleton, transient)
   :param module: The module to register this service into
   :param register_for: Register this instance for the provided class-interface
+  :param refresh_interval: The seconds between the rebuilds of a refreshing service
+  :param instance_cache: The cache of the instances of a parameterized service, by construction arguments
+  :param profile: The profiles enabling the registration (`"prod"`, `"!prod"`, or several)
+  :param when: The condition enabling the registration, evaluated once when the container is activated
   :param kwargs: Params to call the class constructor with
   """
 
   def inner(cls: Type[T]) -> Type[T]:
-    IocContainer.get_instance().register_service(cls, scope, module, register_for, kwargs)
+    IocContainer.get_instance().register_service(cls, scope, module, register_for, kwargs, refresh_interval,
+                                                 instance_cache, profile, when)
     return cls
 
   return inner
+
+
+def cached_method(maxsize: Optional[int] = 128, ttl: Optional[float] = None):
+  """
+  Memoize the results of a service method, in a cache bound to the service instance.
+  The cache is cleared when the service is unregistered or replaced, and its hits, misses and evictions
+  are reported by the container stats. The method arguments must be hashable
+
+  Example:
+
+  .. code-block::
+
+      @injectable()
+      class FeatureFlags:
+          @cached_method(maxsize=1024, ttl=60)
+          def is_enabled(self, flag: str) -> bool:
+              ...
+
+  :param maxsize: The maximum number of results kept for each instance, or `None` for no limit
+  :param ttl: The time to live of the results in seconds, or `None` for results that never expire
+  """
+
+  def inner(fn: Callable) -> Callable:
+    missing = object()
+    kwargs_mark = object()
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+      caches = getattr(self, METHOD_CACHES_ATTR, None)
+      if caches is None:
+        caches = {}
+        setattr(self, METHOD_CACHES_ATTR, caches)
+      cache = caches.get(name)
+      if cache is None:
+        cache = caches.setdefault(name, LruCache(maxsize, ttl))
+
+      # The marker keeps the keyword arguments apart from positional ones
+      key = (*args, kwargs_mark, frozenset(kwargs.items())) if kwargs else args
+      result = cache.get(key, missing)
+      if result is missing:
+        result = fn(self, *args, **kwargs)
+        cache.put(key, result)
+      return result
+
+    return wrapper
+
+  return inner
@@ -0,0 +1,93 @@
+"""
+Constructor arguments evaluated when the service is built, rather than when it is registered
+"""
+
+import threading
+from typing import Callable, Generic, Type, TypeVar, TYPE_CHECKING
+
+from .module.module import IocModule, GlobalModule
+
+if TYPE_CHECKING:
+    from .container import IocContainer
+
+T = TypeVar("T")
+E = TypeVar("E", bound=IocModule)
+
+_UNSET = object()
+
+
+class Deferred(Generic[T]):
+    """
+    Constructor argument computed by a function when the service is built
+
+    Example:
+
+     .. code-block::
+
+        @injectable(config=Deferred(load_config))
+        class ApiService:
+            def __init__(self, config: Config):
+                ...
+    """
+
+    def __init__(self, provider: Callable[[], T], memoize: bool = False):
+        """
+        :param provider: The function computing the argument
+        :param memoize: Compute the argument once, and share it between all the instances built
+            (singletons are built once anyway)
+        """
+        self.provider = provider
+        self.memoize = memoize
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    def resolve(self, container: "IocContainer") -> T:
+        """
+        Compute the argument
+
+        :param container: The container building the service
+        :return: The argument value
+        """
+        if not self.memoize:
+            return self.provider()
+        if self._value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    self._value = self.provider()
+        return self._value
+
+
+class ServiceRef(Generic[T]):
+    """
+    Constructor argument referencing another service, retrieved when the service is built
+
+    Example:
+
+     .. code-block::
+
+        register_singleton(ReportService, database=ServiceRef(DatabaseService, ModuleA))
+    """
+
+    def __init__(self, svc_type: Type[T], module: Type[E] = GlobalModule):
+        """
+        :param svc_type: The class of the referenced service
+        :param module: The module to retrieve the referenced service from
+        """
+        self.svc_type = svc_type
+        self.module = module
+
+    def resolve(self, container: "IocContainer") -> T:
+        """
+        Retrieve the referenced service
+
+        :param container: The container building the service
+        :return: The service
+        """
+        return container.get(self.svc_type, self.module)
+
+
+def has_deferred(kwargs) -> bool:
+    """
+    :return: Whether any constructor argument must be evaluated when the service is built
+    """
+    return kwargs is not None and any(isinstance(value, (Deferred, ServiceRef)) for value in kwargs.values())
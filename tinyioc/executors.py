@@ -0,0 +1,79 @@
+"""
+Executors running injected functions on thread and process pools, with the state of the submitting code:
+the context variables for threads, and the registry of the container for processes
+
+.. code-block::
+
+    @inject()
+    def resize(image_id: str, storage: StorageService):
+        ...
+
+    with ContainerProcessPoolExecutor() as executor:
+        list(executor.map(resize, image_ids))
+
+The injected functions defined at module level are pickled by reference, like plain functions,
+and their services are resolved in the worker
+"""
+
+import contextvars
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .container import IocContainer
+from .manifest import build_manifest, register_manifest
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    A thread pool running each task in a copy of the context of the code submitting it, so that the context
+    variables it set (e.g. the current request, or tenant) are seen by the injected functions and services
+    """
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Schedule a function, to run in a copy of the current context
+
+        :param fn: The function
+        :param args: The positional arguments
+        :param kwargs: The keyword arguments
+        :return: The future of the result
+        """
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class ContainerProcessPoolExecutor(ProcessPoolExecutor):
+    """
+    A process pool bootstrapping the container registry once in each worker, from the manifest of the
+    submitting process: the worker registers the services by their import paths, and imports those it uses.
+    Forked workers of the container singleton inherit its registry, and skip the bootstrap.
+    Services registered as instances are not part of the manifest, and must be registered by the `initializer`
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, mp_context: Optional[Any] = None,
+                 initializer: Optional[Callable[..., Any]] = None, initargs: Tuple[Any, ...] = (),
+                 container: Optional[IocContainer] = None, **kwargs: Any):
+        """
+        :param max_workers: The number of worker processes, defaults to the number of CPUs
+        :param mp_context: The multiprocessing context starting the workers
+        :param initializer: Called in each worker, after the bootstrap of the registry
+        :param initargs: The arguments of the initializer
+        :param container: The container whose registry is copied to the workers, defaults to the container singleton
+        :param kwargs: Other arguments of `ProcessPoolExecutor`
+        :raises IocException: If a service can't be referenced by its import path
+        """
+        start_method = (mp_context or multiprocessing).get_start_method()
+        if start_method == "fork" and container in (None, IocContainer.get_instance()):
+            manifest = None
+        else:
+            manifest = build_manifest(container)
+        super().__init__(max_workers, mp_context, _bootstrap, (manifest, initializer, initargs), **kwargs)
+
+
+def _bootstrap(manifest: Optional[Dict[str, Any]], initializer: Optional[Callable[..., Any]],
+               initargs: Tuple[Any, ...]) -> None:
+    """ Register the services of the manifest into the container singleton of the worker """
+    if manifest is not None:
+        register_manifest(manifest)
+    if initializer is not None:
+        initializer(*initargs)
@@ -0,0 +1,275 @@
+"""
+The dependency graph of the container, to inspect and analyse what it holds across modules.
+
+It can be exported from the command line, importing the modules that register the services first:
+
+.. code-block::
+
+    python -m tinyioc.graph myapp.services myapp.api --format dot --output graph.dot
+"""
+
+import argparse
+import importlib
+import json
+import sys
+from typing import Any, Dict, Hashable, List, Optional
+
+from .injection_plan import find_cycles
+from .types import ServiceLifetime
+
+
+class GraphNode:
+    """ A service, or an injected function, of the dependency graph """
+    __slots__ = ("key", "name", "kind", "module", "lifetime", "registered", "constructed")
+
+    def __init__(self, key: Hashable, name: str, kind: str, module: Optional[str] = None,
+                 lifetime: Optional[ServiceLifetime] = None, registered: bool = True, constructed: int = 0):
+        self.key = key
+        self.name = name
+        """The node identifier: `Module/Interface` for services, `package.module.Function` for functions"""
+        self.kind = kind
+        """Either `service` or `function`"""
+        self.module = module
+        self.lifetime = lifetime
+        self.registered = registered
+        """Whether the service is registered, or only required by other nodes"""
+        self.constructed = constructed
+        """How many instances of the service have been built"""
+
+
+class DependencyGraph:
+    """
+    The dependencies between the registered services, and of the injected functions.
+    Create it through `IocContainer.graph`
+    """
+
+    def __init__(self):
+        self.nodes: Dict[Hashable, GraphNode] = {}
+        self.edges: Dict[Hashable, List[Hashable]] = {}
+        """The dependencies of each node, by node key"""
+        self.__dependents: Dict[Hashable, List[Hashable]] = {}
+
+    def add_node(self, node: GraphNode) -> None:
+        """
+        Add a node, unless it's already part of the graph
+
+        :param node: The node
+        """
+        if node.key not in self.nodes:
+            self.nodes[node.key] = node
+            self.edges[node.key] = []
+            self.__dependents[node.key] = []
+
+    def add_dependency(self, source: Hashable, target: Hashable) -> None:
+        """
+        Add a dependency between two nodes of the graph
+
+        :param source: The key of the dependent node
+        :param target: The key of the node it depends on
+        """
+        if target not in self.edges[source]:
+            self.edges[source].append(target)
+            self.__dependents[target].append(source)
+
+    def services(self) -> List[GraphNode]:
+        return [node for node in self.nodes.values() if node.kind == "service"]
+
+    def dependencies(self, key: Hashable) -> List[GraphNode]:
+        """
+        :param key: The node key
+        :return: The nodes the node depends on
+        """
+        return [self.nodes[target] for target in self.edges[key]]
+
+    def dependents(self, key: Hashable) -> List[GraphNode]:
+        """
+        :param key: The node key
+        :return: The nodes depending on the node
+        """
+        return [self.nodes[source] for source in self.__dependents[key]]
+
+    def fan_in(self, key: Hashable) -> int:
+        return len(self.__dependents[key])
+
+    def fan_out(self, key: Hashable) -> int:
+        return len(self.edges[key])
+
+    def cycles(self) -> List[List[GraphNode]]:
+        """
+        :return: The dependency cycles, each one as the path of nodes starting and ending with the same node
+        """
+        return [[self.nodes[key] for key in cycle] for cycle in find_cycles(self.edges)]
+
+    def depth(self, key: Hashable) -> int:
+        """
+        The length of the longest chain of dependencies built along with the node, ignoring the cycles
+
+        :param key: The node key
+        :return: The depth, 0 for a node without dependencies
+        """
+        return len(self.__longest_chains()[key]) - 1
+
+    def critical_path(self) -> List[GraphNode]:
+        """
+        The longest chain of services built one from the other, which bounds the cost of building a service
+
+        :return: The nodes of the chain, from the dependent service to its deepest dependency
+        """
+        chains = self.__longest_chains()
+        services = [key for key, node in self.nodes.items() if node.kind == "service"]
+        if not services:
+            return []
+        longest = max(services, key=lambda key: len(chains[key]))
+        return [self.nodes[key] for key in chains[longest]]
+
+    def unused(self) -> List[GraphNode]:
+        """
+        The registered services that no service or injected function depends on, and that have never been built:
+        candidates for removal, or for a lazy registration. Services retrieved directly through the
+        container, without being built (e.g. registered instances), are reported too
+
+        :return: The unused services
+        """
+        return [node for node in self.services()
+                if node.registered and not node.constructed and not self.__dependents[node.key]]
+
+    def __longest_chains(self) -> Dict[Hashable, List[Hashable]]:
+        """ The longest chain of dependencies of each node, computed iteratively, skipping the edges closing a cycle """
+        chains: Dict[Hashable, List[Hashable]] = {}
+        for root in self.nodes:
+            if root in chains:
+                continue
+            path = [root]
+            on_path = {root}
+            stack = [iter(self.edges[root])]
+            while stack:
+                node = next(stack[-1], None)
+                if node is None:
+                    stack.pop()
+                    done = path.pop()
+                    on_path.discard(done)
+                    deepest = max((chains[dep] for dep in self.edges[done] if dep in chains), key=len, default=[])
+                    chains[done] = [done] + deepest
+                elif node not in chains and node not in on_path:
+                    path.append(node)
+                    on_path.add(node)
+                    stack.append(iter(self.edges[node]))
+        return chains
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: The graph as a JSON-serializable dict, with its nodes, edges and analysis
+        """
+        chains = self.__longest_chains()
+        nodes = []
+        for key, node in self.nodes.items():
+            nodes.append({
+                "id": node.name,
+                "kind": node.kind,
+                "module": node.module,
+                "lifetime": node.lifetime.name if node.lifetime is not None else None,
+                "registered": node.registered,
+                "constructed": node.constructed,
+                "fan_in": self.fan_in(key),
+                "fan_out": self.fan_out(key),
+                "depth": len(chains[key]) - 1,
+            })
+        edges = [{"from": self.nodes[source].name, "to": self.nodes[target].name}
+                 for source, targets in self.edges.items() for target in targets]
+        return {
+            "nodes": nodes,
+            "edges": edges,
+            "cycles": [[node.name for node in cycle] for cycle in self.cycles()],
+            "critical_path": [node.name for node in self.critical_path()],
+            "unused": [node.name for node in self.unused()],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_dot(self) -> str:
+        """
+        :return: The graph in the Graphviz DOT format. Functions are drawn as ellipses, services as boxes,
+            unused services greyed out and missing ones in red
+        """
+        unused = {node.key for node in self.unused()}
+        lines = ["digraph tinyioc {", "    rankdir=LR;"]
+        for key, node in self.nodes.items():
+            attrs = {"shape": "box" if node.kind == "service" else "ellipse"}
+            if node.lifetime is not None:
+                attrs["label"] = f"{node.name}\\n{node.lifetime.name.lower()}"
+            if not node.registered:
+                attrs["color"] = "red"
+            elif key in unused:
+                attrs["style"] = "dashed"
+                attrs["fontcolor"] = "grey"
+            attributes = ", ".join(f"{name}={_quote(value)}" for name, value in attrs.items())
+            lines.append(f"    {_quote(node.name)} [{attributes}];")
+        for source, targets in self.edges.items():
+            for target in targets:
+                lines.append(f"    {_quote(self.nodes[source].name)} -> {_quote(self.nodes[target].name)};")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """
+        :return: A readable report of the graph analysis
+        """
+        services = self.services()
+        lines = [f"{len(services)} services, {len(self.nodes) - len(services)} injected functions"]
+        missing = [node.name for node in services if not node.registered]
+        if missing:
+            lines.append(f"Missing services: {', '.join(missing)}")
+        for cycle in self.cycles():
+            lines.append(f"Dependency cycle: {' -> '.join(node.name for node in cycle)}")
+        path = self.critical_path()
+        if len(path) > 1:
+            lines.append(f"Critical path (depth {len(path) - 1}): {' -> '.join(node.name for node in path)}")
+        fan_in = sorted(services, key=lambda node: self.fan_in(node.key), reverse=True)[:5]
+        if fan_in:
+            lines.append("Highest fan-in: " + ", ".join(f"{node.name} ({self.fan_in(node.key)})" for node in fan_in))
+        unused = self.unused()
+        if unused:
+            lines.append(f"Unused services: {', '.join(node.name for node in unused)}")
+        return "\n".join(lines)
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', '\\"') + '"'
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Import the application modules, then write the dependency graph of the container singleton
+
+    :param argv: The command line arguments, defaults to `sys.argv`
+    """
+    parser = argparse.ArgumentParser(prog="python -m tinyioc.graph",
+                                     description="Export the dependency graph of the tinyioc container")
+    parser.add_argument("modules", nargs="+", help="The modules registering the services, imported in order")
+    parser.add_argument("--format", choices=("summary", "dot", "json"), default="summary")
+    parser.add_argument("--output", help="The output file, defaults to the standard output")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        importlib.import_module(module)
+
+    from .container import IocContainer
+    graph = IocContainer.get_instance().graph()
+
+    if args.format == "dot":
+        output = graph.to_dot()
+    elif args.format == "json":
+        output = graph.to_json()
+    else:
+        output = graph.summary() + "\n"
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+
+
+if __name__ == "__main__":
+    main()
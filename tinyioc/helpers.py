@@ -2,9 +2,11 @@
 Helper functions to register and retrieve services procedurally
 """
 
+from .cache import LruCache
 from .container import IocContainer
-from typing import Type, TypeVar, Optional
+from typing import Type, TypeVar, Optional, Callable, Iterable, Tuple, Any
 from .module.module import IocModule, GlobalModule
+from .profiles import Condition, Profile
 from .types import ServiceLifetime
 
 T = TypeVar("T")
@@ -12,15 +14,18 @@ K = TypeVar("K")
 E = TypeVar("E", bound=IocModule)
 
 
-def register_instance(instance: T, module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None):
+def register_instance(instance: T, module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None,
+                      profile: Optional[Profile] = None, when: Optional[Condition] = None):
     """
     Register the instance of a service
 
     :param instance: The instance of the service
     :param module: The module to register this instance into
     :param register_for: The class-interface to register this instance as
+    :param profile: The profiles enabling the registration, once the container is activated
+    :param when: The condition enabling the registration, evaluated once when the container is activated
     """
-    IocContainer.get_instance().register_instance(instance, module, register_for=register_for)
+    IocContainer.get_instance().register_instance(instance, module, register_for, profile, when)
 
 
 def register_singleton(cls: Type[T], module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None, **kwargs):
@@ -45,6 +50,95 @@ def register_transient(cls: Type[T], module: Type[E] = GlobalModule, register_fo
     IocContainer.get_instance().register_service(cls, ServiceLifetime.TRANSIENT, module, register_for, kwargs)
 
 
+def register_prototype(cls: Type[T], module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None, **kwargs):
+    """
+    Register a class with prototype scope (a template instance is built once, and copied every time
+    the service is injected, through its `__clone__` method if it has one, or `copy.copy`)
+
+    :param cls: The class to register
+    :param module: The module to register the service into
+    :param register_for: The class-interface to register this service as
+    """
+    IocContainer.get_instance().register_service(cls, ServiceLifetime.PROTOTYPE, module, register_for, kwargs)
+
+
+def register_thread_local(cls: Type[T], module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None,
+                          **kwargs):
+    """
+    Register a class with thread-local scope (one instance for each thread, released when the thread ends)
+
+    :param cls: The class to register
+    :param module: The module to register the service into
+    :param register_for: The class-interface to register this service as
+    """
+    IocContainer.get_instance().register_service(cls, ServiceLifetime.THREAD_LOCAL, module, register_for, kwargs)
+
+
+def register_refreshing(cls: Type[T], refresh_interval: float, module: Type[E] = GlobalModule,
+                        register_for: Optional[Type[K]] = None, **kwargs):
+    """
+    Register a class with refreshing scope (one instance shared across the module, rebuilt every
+    `refresh_interval` seconds in the background while the current one keeps being injected)
+
+    :param cls: The class to register
+    :param refresh_interval: The seconds between the rebuilds of the service
+    :param module: The module to register the service into
+    :param register_for: The class-interface to register this service as
+    """
+    IocContainer.get_instance().register_service(cls, ServiceLifetime.REFRESHING, module, register_for, kwargs,
+                                                 refresh_interval)
+
+
+def register_parameterized(cls: Type[T], module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None,
+                           instance_cache: Optional[LruCache] = None, **kwargs):
+    """
+    Register a class with parameterized scope (one instance for each set of construction arguments,
+    passed positionally to the constructor, kept in a bounded cache)
+
+    :param cls: The class to register
+    :param module: The module to register the service into
+    :param register_for: The class-interface to register this service as
+    :param instance_cache: The cache of the instances, by construction arguments, defaults to a cache of 128 instances
+    """
+    IocContainer.get_instance().register_service(cls, ServiceLifetime.PARAMETERIZED, module, register_for, kwargs,
+                                                 instance_cache=instance_cache)
+
+
+def register_factory(factory: Callable[..., T], lifetime: ServiceLifetime = ServiceLifetime.SINGLETON,
+                     module: Type[E] = GlobalModule, register_for: Optional[Type[K]] = None,
+                     refresh_interval: Optional[float] = None, instance_cache: Optional[LruCache] = None,
+                     profile: Optional[Profile] = None, when: Optional[Condition] = None):
+    """
+    Register a factory function building the service. The factory parameters
+    are injected from the container when the service is built
+
+    :param factory: The factory function (sync or async)
+    :param lifetime: The lifetime of the built service
+    :param module: The module to register the service into
+    :param register_for: The class-interface to register this service as, defaults to the return annotation
+        of the factory
+    :param refresh_interval: The seconds between the rebuilds of a refreshing service
+    :param instance_cache: The cache of the instances of a parameterized service, by construction arguments
+    :param profile: The profiles enabling the registration, once the container is activated
+    :param when: The condition enabling the registration, evaluated once when the container is activated
+    """
+    IocContainer.get_instance().register_factory(factory, lifetime, module, register_for, refresh_interval,
+                                                 instance_cache, profile, when)
+
+
+def replace_service(cls: Type[T], instance: T, module: Type[E] = GlobalModule,
+                    on_dispose: Optional[Callable[[T], None]] = None):
+    """
+    Atomically replace a registered service with a new instance
+
+    :param cls: The service class
+    :param instance: The new instance
+    :param module: The module of the service
+    :param on_dispose: Called with the old instance right after the swap, see `IocContainer.replace`
+    """
+    IocContainer.get_instance().replace(cls, instance, module, on_dispose)
+
+
 def unregister_service(cls: Type[T], module: Type[E] = GlobalModule):
     """
     Unregister a service
@@ -55,6 +149,16 @@ def unregister_service(cls: Type[T], module: Type[E] = GlobalModule):
     IocContainer.get_instance().unregister(cls, module)
 
 
+def register_module_lazy(path: str):
+    """
+    Register a module by its import path, importing it only when a service is first retrieved from it.
+    See `IocContainer.register_module_lazy`
+
+    :param path: The import path of the module, as `package.module:ModuleName`
+    """
+    IocContainer.get_instance().register_module_lazy(path)
+
+
 def unregister_module(module: Type[E]):
     """
     Unregister a module
@@ -64,12 +168,57 @@ def unregister_module(module: Type[E]):
     IocContainer.get_instance().unregister_module(module)
 
 
-def get_service(cls: Type[T], module: Type[E] = GlobalModule) -> Optional[T]:
+def activate_container(profiles: Iterable[str] = ()):
+    """
+    Activate the container with the given profiles, keeping only the conditional registrations
+    they enable. See `IocContainer.activate`
+
+    :param profiles: The active profiles
+    """
+    IocContainer.get_instance().activate(profiles)
+
+
+def validate_container():
+    """
+    Check that every injected function and service dependency can be resolved, reporting
+    all the errors at once. See `IocContainer.validate`
+
+    :raises IocValidationException: If any error is found
+    """
+    IocContainer.get_instance().validate()
+
+
+def get_service(cls: Type[T], module: Type[E] = GlobalModule, *, args: Tuple[Any, ...] = ()) -> Optional[T]:
     """
     Retrieve a service from the container
 
     :param cls: The service class
     :param module: The module to retrieve the service from
+    :param args: The construction arguments of a parameterized service
+    :return: The service, or `None` if it couldn't be retrieved
+    """
+    return IocContainer.get_instance().get(cls, module, args=args)
+
+
+def get_services(classes: Iterable[Type[Any]], module: Type[E] = GlobalModule) -> Tuple[Any, ...]:
+    """
+    Retrieve several services from the container at once
+
+    :param classes: The service classes
+    :param module: The module to retrieve the services from
+    :return: The services, in the same order, with `None` for those that couldn't be retrieved
+    """
+    return IocContainer.get_instance().get_many(classes, module)
+
+
+async def get_service_async(cls: Type[T], module: Type[E] = GlobalModule, *,
+                            args: Tuple[Any, ...] = ()) -> Optional[T]:
+    """
+    Retrieve a service from the container, awaiting it if it's built by an async factory
+
+    :param cls: The service class
+    :param module: The module to retrieve the service from
+    :param args: The construction arguments of a parameterized service
     :return: The service, or `None` if it couldn't be retrieved
     """
-    return IocContainer.get_instance().get(cls, module)
+    return await IocContainer.get_instance().aget(cls, module, args=args)
@@ -0,0 +1,38 @@
+"""
+Helpers to reference classes and functions by their import path (`package.module:QualifiedName`)
+"""
+
+import importlib
+from typing import Any, Optional
+
+
+def object_path(obj: Any) -> Optional[str]:
+    """
+    Get the import path of a class or function
+
+    :param obj: The class or function
+    :return: The path as `package.module:QualifiedName`, or `None` if the object can't be imported by path
+    """
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None)
+    if module is None or qualname is None or "<locals>" in qualname:
+        return None
+    return f"{module}:{qualname}"
+
+
+def import_object(path: str) -> Any:
+    """
+    Import a class or function by its path
+
+    :param path: The path as `package.module:QualifiedName` (or `package.module.Name`)
+    :return: The imported object
+    """
+    if ":" in path:
+        module_name, _, qualname = path.partition(":")
+    else:
+        module_name, _, qualname = path.rpartition(".")
+
+    obj = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
@@ -0,0 +1,124 @@
+"""
+Injection plans: the list of dependencies of a function, computed once
+"""
+
+import dataclasses
+import weakref
+from inspect import signature, Parameter
+from typing import Callable, List, Tuple, Any, Type, TypeVar, Dict, Hashable, Optional, get_type_hints
+
+from .arguments import Arg
+from .module.module import IocModule, FromModule
+
+E = TypeVar("E", bound=IocModule)
+
+InjectionPlan = List[Tuple[str, Any, Type[E]]]
+"""List of `(parameter name, service type, module)` to inject into a function"""
+
+injected_functions: "weakref.WeakSet[Callable]" = weakref.WeakSet()
+"""The functions decorated with `inject` or `inject_getter`, exposing their plan as `__tinyioc_plan__`"""
+
+
+def build_plan(fn: Callable, module: Type[E]) -> InjectionPlan:
+    """
+    Compute the injection plan of a function from its signature. Every annotated
+    parameter is a dependency, retrieved from `module` unless its default value
+    is a `FromModule` instance. A parameter whose default value is an `Arg` marker
+    depends on the parameterized service built with its arguments
+
+    :param fn: The function to inspect
+    :param module: The default module to retrieve the dependencies from
+    :return: The injection plan
+    """
+    plan = []
+    for name, param in signature(fn).parameters.items():
+        if param.annotation is Parameter.empty:
+            continue
+
+        param_module = module
+        dep_type = param.annotation
+        if isinstance(param.default, FromModule):
+            param_module = param.default.module
+        elif isinstance(param.default, Arg):
+            param_module = param.default.module or module
+            dep_type = Arg.of(dep_type, param.default.args)
+        plan.append((name, dep_type, param_module))
+    return plan
+
+
+def build_class_plan(cls: type, module: Type[E]) -> Optional[InjectionPlan]:
+    """
+    Compute the injection plan of the constructor of a dataclass, or of an attrs class, from its fields.
+    Every constructor field without a default value is a dependency, as well as the fields whose default
+    value is a `FromModule` instance, retrieved from that module, or an `Arg` marker. The fields with other
+    defaults are left to their default
+
+    :param cls: The class to inspect
+    :param module: The default module to retrieve the dependencies from
+    :return: The injection plan, or `None` if the class is neither a dataclass nor an attrs class
+    """
+    if dataclasses.is_dataclass(cls):
+        fields = [(f.name, f.name, f.type, f.default) for f in dataclasses.fields(cls)
+                  if f.init and f.default_factory is dataclasses.MISSING]
+        missing = dataclasses.MISSING
+    elif hasattr(cls, "__attrs_attrs__"):
+        import attr
+
+        # attrs strips the leading underscores of the private attributes in the constructor
+        fields = [(getattr(a, "alias", None) or a.name.lstrip("_"), a.name, a.type, a.default)
+                  for a in cls.__attrs_attrs__ if a.init and not isinstance(a.default, attr.Factory)]
+        missing = attr.NOTHING
+    else:
+        return None
+
+    try:
+        hints = get_type_hints(cls)
+    except Exception:
+        # Annotations that can't be evaluated are left as they are
+        hints = {}
+
+    plan = []
+    for name, attribute, field_type, default in fields:
+        field_type = hints.get(attribute, field_type)
+        if field_type is None or isinstance(field_type, str):
+            continue
+        if isinstance(default, FromModule):
+            plan.append((name, field_type, default.module))
+        elif isinstance(default, Arg):
+            plan.append((name, Arg.of(field_type, default.args), default.module or module))
+        elif default is missing:
+            plan.append((name, field_type, module))
+    return plan
+
+
+def find_cycles(graph: Dict[Hashable, List[Hashable]]) -> List[List[Hashable]]:
+    """
+    Find the cycles of a dependency graph
+
+    :param graph: The dependencies of each node
+    :return: The cycles found, each one as the path of nodes starting and ending with the same node
+    """
+    cycles = []
+    visited = set()
+
+    for root in graph:
+        if root in visited:
+            continue
+        # Iterative depth-first search, keeping the current path on a stack
+        path = [root]
+        on_path = {root}
+        stack = [iter(graph.get(root, ()))]
+        visited.add(root)
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                on_path.discard(path.pop())
+            elif node in on_path:
+                cycles.append(path[path.index(node):] + [node])
+            elif node not in visited:
+                visited.add(node)
+                path.append(node)
+                on_path.add(node)
+                stack.append(iter(graph.get(node, ())))
+    return cycles
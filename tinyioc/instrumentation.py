@@ -0,0 +1,291 @@
+"""
+Sampled instrumentation of the injected functions: the time the `inject` wrapper adds to a call
+(resolving the services, setting up and tearing down the resources) compared with the time of the function body.
+
+.. code-block::
+
+    enable_injection_sampling(0.01)
+    ...
+    print(dump_injection_stats("prometheus"))
+
+The latencies are recorded into log-linear histograms with fixed buckets, so their memory is constant.
+When sampling is enabled, the calls that are not sampled only increment a counter
+"""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from .container import IocContainer
+from .injection_plan import InjectionPlan, injected_functions
+from .ioc_exception import IocException
+from .resources import call_with_resources, acall_with_resources, inject_services, ainject_services
+
+_MIN_EXP = 6
+"""The histograms start at 2^6 ns (64 ns), shorter latencies are counted in the first bucket"""
+_MAX_EXP = 36
+"""The histograms end at 2^36 ns (about 69 s), longer latencies are counted in the last bucket"""
+_SUB_BITS = 3
+_SUBS = 1 << _SUB_BITS
+"""Each power of two is split into 8 linear buckets, bounding the relative error to 12.5%"""
+_BUCKETS = (_MAX_EXP - _MIN_EXP) * _SUBS + 2
+
+
+class LatencyHistogram:
+    """ A histogram of latencies with log-linear buckets, from 64 ns to about 69 s """
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def bucket(seconds: float) -> int:
+        """
+        :param seconds: The latency
+        :return: The index of the bucket of the latency
+        """
+        ns = int(seconds * 1e9)
+        exp = ns.bit_length() - 1
+        if exp < _MIN_EXP:
+            return 0
+        if exp >= _MAX_EXP:
+            return _BUCKETS - 1
+        return 1 + (exp - _MIN_EXP) * _SUBS + ((ns >> (exp - _SUB_BITS)) & (_SUBS - 1))
+
+    @staticmethod
+    def upper_bound(index: int) -> float:
+        """
+        :param index: The index of a bucket
+        :return: The upper bound in seconds of the latencies counted in the bucket
+        """
+        if index == 0:
+            return (1 << _MIN_EXP) / 1e9
+        if index == _BUCKETS - 1:
+            return float("inf")
+        exp, sub = divmod(index - 1, _SUBS)
+        exp += _MIN_EXP
+        return ((_SUBS + sub + 1) << (exp - _SUB_BITS)) / 1e9
+
+    def record(self, seconds: float) -> None:
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        :param q: The quantile, between 0 and 1
+        :return: The upper bound of the bucket holding the quantile, or 0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.upper_bound(index), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": [[self.upper_bound(index), count] for index, count in enumerate(self.counts) if count],
+        }
+
+
+class InjectionStats:
+    """ The instrumentation of an injected function """
+    __slots__ = ("function", "calls", "overhead", "body", "lock")
+
+    def __init__(self, function: str):
+        self.function = function
+        self.calls = 0
+        """How many calls were counted while sampling was enabled (approximate when called concurrently)"""
+        self.overhead = LatencyHistogram()
+        """The time added by the wrapper to the sampled calls"""
+        self.body = LatencyHistogram()
+        """The time of the function body in the sampled calls"""
+        self.lock = threading.Lock()
+
+    def record(self, overhead: float, body: float) -> None:
+        with self.lock:
+            self.overhead.record(overhead)
+            self.body.record(body)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.calls = 0
+            self.overhead = LatencyHistogram()
+            self.body = LatencyHistogram()
+
+
+class _Sampling:
+    __slots__ = ("period",)
+
+    def __init__(self):
+        self.period = 0
+        """One call every `period` is sampled, 0 when sampling is disabled"""
+
+
+SAMPLING = _Sampling()
+
+
+def enable_injection_sampling(rate: float = 0.01) -> None:
+    """
+    Enable the sampled instrumentation of the injected functions
+
+    :param rate: The fraction of the calls to instrument, between 0 (excluded) and 1
+    :raises IocException: If the rate is out of range
+    """
+    if not 0 < rate <= 1:
+        raise IocException(f"The sampling rate must be between 0 and 1, got {rate}")
+    SAMPLING.period = max(1, round(1 / rate))
+
+
+def disable_injection_sampling() -> None:
+    """ Disable the instrumentation of the injected functions, keeping the recorded stats """
+    SAMPLING.period = 0
+
+
+def reset_injection_stats() -> None:
+    """ Discard the stats recorded so far """
+    for fn in list(injected_functions):
+        stats = getattr(fn, "__tinyioc_stats__", None)
+        if stats is not None:
+            stats.reset()
+
+
+def dump_injection_stats(output_format: str = "json") -> str:
+    """
+    Export the stats of the injected functions that were sampled
+
+    :param output_format: `json`, or `prometheus` for the Prometheus text exposition format
+    :return: The stats
+    :raises IocException: If the format is unknown
+    """
+    stats = sorted((s for s in (getattr(fn, "__tinyioc_stats__", None) for fn in list(injected_functions))
+                    if s is not None and s.calls), key=lambda s: s.function)
+    if output_format == "json":
+        return json.dumps({
+            "sampling_rate": 1 / SAMPLING.period if SAMPLING.period else 0,
+            "functions": [{
+                "function": s.function,
+                "calls": s.calls,
+                "sampled": s.body.count,
+                "overhead_seconds": s.overhead.to_dict(),
+                "body_seconds": s.body.to_dict(),
+            } for s in stats],
+        }, indent=2)
+    if output_format == "prometheus":
+        lines = ["# HELP tinyioc_injected_calls_total Calls of the injected functions while sampling",
+                 "# TYPE tinyioc_injected_calls_total counter"]
+        lines += [f'tinyioc_injected_calls_total{{function="{_label(s.function)}"}} {s.calls}' for s in stats]
+        for name, help_text, histogram in (
+                ("tinyioc_injection_overhead_seconds", "Time added by the inject wrapper to the sampled calls",
+                 lambda s: s.overhead),
+                ("tinyioc_injection_body_seconds", "Time of the body of the sampled calls", lambda s: s.body)):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for s in stats:
+                lines += _prometheus_histogram(name, _label(s.function), histogram(s))
+        return "\n".join(lines) + "\n"
+    raise IocException(f"Unknown stats format {output_format}, expected json or prometheus")
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _prometheus_histogram(name: str, function: str, histogram: LatencyHistogram) -> List[str]:
+    """ The cumulative buckets of a histogram, one for each power of two to keep the bucket set small """
+    lines = []
+    cumulative = 0
+    for index, count in enumerate(histogram.counts[:-1]):
+        cumulative += count
+        if index % _SUBS == 0:
+            lines.append(f'{name}_bucket{{function="{function}",le="{histogram.upper_bound(index):.9g}"}} '
+                         f'{cumulative}')
+    lines.append(f'{name}_bucket{{function="{function}",le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{function="{function}"}} {histogram.total:.9g}')
+    lines.append(f'{name}_count{{function="{function}"}} {histogram.count}')
+    return lines
+
+
+class _Timed:
+    """ Measures the time of the function body """
+    __slots__ = ("fn", "elapsed")
+
+    def __init__(self, fn: Callable):
+        self.fn = fn
+        self.elapsed = 0.0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    async def call_async(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self.fn(*args, **kwargs)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+
+def call_sampled(fn: Callable, plan: InjectionPlan, args: Tuple[Any, ...], kwargs: Dict[str, Any],
+                 stats: InjectionStats) -> Any:
+    """
+    Inject the services into a function and call it, recording the time of the injection and of the body
+
+    :param fn: The injected function
+    :param plan: Its injection plan
+    :param args: The positional arguments
+    :param kwargs: The keyword arguments
+    :param stats: The stats of the function
+    :return: The function result
+    """
+    start = time.perf_counter()
+    resources = inject_services(IocContainer.get_instance(), plan, kwargs)
+    body = _Timed(fn)
+    try:
+        if resources is not None:
+            return call_with_resources(body, args, kwargs, resources)
+        return body(*args, **kwargs)
+    finally:
+        stats.record(time.perf_counter() - start - body.elapsed, body.elapsed)
+
+
+async def acall_sampled(fn: Callable, plan: InjectionPlan, args: Tuple[Any, ...], kwargs: Dict[str, Any],
+                        stats: InjectionStats) -> Any:
+    """
+    Inject the services into a coroutine function and await it, recording the time of the injection
+    and of the body
+
+    :param fn: The injected coroutine function
+    :param plan: Its injection plan
+    :param args: The positional arguments
+    :param kwargs: The keyword arguments
+    :param stats: The stats of the function
+    :return: The function result
+    """
+    start = time.perf_counter()
+    resources = await ainject_services(IocContainer.get_instance(), plan, kwargs)
+    body = _Timed(fn)
+    try:
+        if resources is not None:
+            return await acall_with_resources(body.call_async, args, kwargs, resources)
+        return await body.call_async(*args, **kwargs)
+    finally:
+        stats.record(time.perf_counter() - start - body.elapsed, body.elapsed)
@@ -0,0 +1,64 @@
+"""
+Interception of the methods of resolved services, through generated subclasses
+"""
+
+import inspect
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+Interceptor = Callable[[Callable], Callable]
+"""A decorator wrapping a method of the intercepted service"""
+
+_intercepted_classes: Dict[Tuple[type, Tuple[Interceptor, ...]], Optional[type]] = {}
+"""The generated subclasses, or `None` for the classes that can't be intercepted"""
+
+_MISSING = object()
+
+
+def intercept(instance: T, interceptors: Tuple[Interceptor, ...]) -> T:
+    """
+    Apply the interceptors to the methods of an instance, by switching its class to a subclass
+    whose public methods are decorated by the interceptors (the first one being the outermost).
+    The subclass is generated once for each class and set of interceptors, so the methods
+    cost no more than the interceptors themselves. The instances whose class can't be switched,
+    like builtins and many extension types, are returned untouched
+
+    :param instance: The instance to intercept
+    :param interceptors: The interceptors to apply
+    :return: The same instance, intercepted if possible
+    """
+    cls = type(instance)
+    key = (cls, interceptors)
+    intercepted = _intercepted_classes.get(key, _MISSING)
+    if intercepted is _MISSING:
+        try:
+            intercepted = _generate_subclass(cls, interceptors)
+        except TypeError:
+            # The class can't be subclassed
+            intercepted = None
+        intercepted = _intercepted_classes.setdefault(key, intercepted)
+    if intercepted is None:
+        return instance
+
+    try:
+        instance.__class__ = intercepted
+    except TypeError:
+        # The layout of the class doesn't allow switching it, which is the same for all its instances
+        _intercepted_classes[key] = None
+    return instance
+
+
+def _generate_subclass(cls: type, interceptors: Tuple[Interceptor, ...]) -> type:
+    namespace = {"__slots__": (), "__module__": cls.__module__, "__qualname__": cls.__qualname__}
+
+    for name in dir(cls):
+        attr = inspect.getattr_static(cls, name)
+        if name.startswith("_") or isinstance(attr, (staticmethod, classmethod)) or not callable(attr):
+            continue
+        method = getattr(cls, name)
+        for interceptor in reversed(interceptors):
+            method = interceptor(method)
+        namespace[name] = method
+
+    return type(cls.__name__, (cls,), namespace)
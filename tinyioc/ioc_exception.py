@@ -2,3 +2,10 @@
 
 class IocException(Exception):
     pass
+
+
+class IocValidationException(IocException):
+    """ Raised when the container validation fails, listing all the errors found """
+    def __init__(self, errors):
+        super().__init__("Container validation failed:\n" + "\n".join(f"- {error}" for error in errors))
+        self.errors = errors
@@ -0,0 +1,119 @@
+"""
+Export the container registrations to a manifest file, and load them back
+without importing the services, e.g. to bootstrap worker processes
+"""
+
+import json
+from typing import Optional, Dict, Any
+
+from .container import IocContainer
+from .importing import object_path
+from .ioc_exception import IocException
+from .module.module import GlobalModule
+from .types import ServiceLifetime
+
+MANIFEST_VERSION = 1
+
+
+def export_manifest(path: str, container: Optional[IocContainer] = None) -> None:
+    """
+    Write the registrations of the container into a JSON manifest: every service with its
+    class-interface, implementation, module, lifetime and constructor arguments, including the services
+    registered by path that were not bound yet.
+    Services registered as instances can't be exported, and must be registered again by the process
+    loading the manifest
+
+    :param path: The manifest file path
+    :param container: The container to export, defaults to the container singleton
+    :raises IocException: If a service or module can't be referenced by its import path,
+        or its constructor arguments can't be serialized
+    """
+    data = json.dumps(build_manifest(container), separators=(",", ":"))
+    with open(path, "w") as f:
+        f.write(data)
+
+
+def build_manifest(container: Optional[IocContainer] = None) -> Dict[str, Any]:
+    """
+    Build the manifest of the registrations of the container, without writing it. See `export_manifest`
+
+    :param container: The container to export, defaults to the container singleton
+    :return: The manifest, which can be serialized to JSON or pickled
+    :raises IocException: If a service or module can't be referenced by its import path,
+        or its constructor arguments can't be serialized
+    """
+    container = container or IocContainer.get_instance()
+    services = []
+
+    for module, iface, svc in container.entries():
+        if svc.registered_instance:
+            continue
+
+        implementation = svc.factory or svc.svc_type
+        services.append({
+            "interface": _require_path(iface),
+            "implementation": svc.source or _require_path(implementation),
+            "factory": svc.factory is not None or svc.is_factory,
+            "async": svc.is_async,
+            "lifetime": svc.scope.name,
+            "module": _require_path(module) if module is not GlobalModule else None,
+            "kwargs": svc.kwargs or {},
+            "refresh_interval": svc.refresh_interval,
+        })
+
+    # The services registered by path, e.g. by a configuration or a manifest, that were not requested yet
+    for module, interface, svc in container.lazy_entries():
+        services.append({
+            "interface": interface,
+            "implementation": svc.source,
+            "factory": svc.is_factory,
+            "async": svc.is_async,
+            "lifetime": svc.scope.name,
+            "module": module,
+            "kwargs": svc.kwargs or {},
+            "refresh_interval": svc.refresh_interval,
+        })
+
+    manifest = {"version": MANIFEST_VERSION, "services": services}
+    try:
+        json.dumps(manifest)
+    except TypeError as e:
+        raise IocException(f"The services constructor arguments can't be exported: {e}")
+    return manifest
+
+
+def load_manifest(path: str, container: Optional[IocContainer] = None) -> None:
+    """
+    Register the services listed in a manifest file, without importing them. Each service is bound
+    when its class-interface is first requested, and its implementation is imported when it is first built
+
+    :param path: The manifest file path
+    :param container: The container to load the manifest into, defaults to the container singleton
+    """
+    with open(path) as f:
+        manifest: Dict[str, Any] = json.load(f)
+    register_manifest(manifest, container)
+
+
+def register_manifest(manifest: Dict[str, Any], container: Optional[IocContainer] = None) -> None:
+    """
+    Register the services listed in a manifest, without importing them. See `load_manifest`
+
+    :param manifest: The manifest, as built by `build_manifest`
+    :param container: The container to load the manifest into, defaults to the container singleton
+    """
+    container = container or IocContainer.get_instance()
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise IocException(f"Unsupported manifest version {manifest.get('version')}")
+
+    for svc in manifest["services"]:
+        container.register_lazy(svc["interface"], svc["implementation"], ServiceLifetime[svc["lifetime"]],
+                                svc["module"], svc["kwargs"] or None, svc["factory"], svc["async"],
+                                svc.get("refresh_interval"))
+
+
+def _require_path(obj: Any) -> str:
+    path = object_path(obj)
+    if path is None:
+        raise IocException(f"{str(obj)} can't be exported, as it can't be imported by its path")
+    return path
@@ -0,0 +1,176 @@
+"""
+The memory retained by the services materialized in the container, to find out which singletons, by module,
+make the process grow:
+
+.. code-block::
+
+    report = IocContainer.get_instance().memory_report()
+    print(report.summary())
+
+The sizes are estimated by walking the objects reachable from each instance, counting every object once:
+the objects reachable from several services are reported as shared, rather than in each of them.
+The walk stops at the instances of the other services, and at classes, modules and functions
+"""
+
+import gc
+import sys
+import types
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from .types import ServiceLifetime
+
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.CodeType,
+                  types.FrameType)
+"""Objects shared by the whole process, which a service refers to without retaining them"""
+
+_SHARED = -1
+
+
+class ServiceMemory:
+    """ The memory retained by a materialized service """
+    __slots__ = ("module", "iface", "name", "lifetime", "size", "shared", "objects", "allocated", "pinned")
+
+    def __init__(self, module: type, iface: Hashable, name: str, lifetime: ServiceLifetime,
+                 allocated: Optional[int], pinned: bool):
+        self.module = module
+        self.iface = iface
+        self.name = name
+        """The service identifier, `Module/Interface`"""
+        self.lifetime = lifetime
+        self.size = 0
+        """The estimated bytes retained by the service alone"""
+        self.shared = 0
+        """The estimated bytes the service retains together with other services"""
+        self.objects = 0
+        """How many objects the service retains alone"""
+        self.allocated = allocated
+        """The bytes allocated by its last construction according to `tracemalloc`, excluding its dependencies,
+        or `None` if tracemalloc wasn't tracing then"""
+        self.pinned = pinned
+        """Whether the service is kept by `IocContainer.release_singletons`"""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "lifetime": self.lifetime.name.lower(),
+            "size": self.size,
+            "shared": self.shared,
+            "objects": self.objects,
+            "allocated": self.allocated,
+            "pinned": self.pinned,
+        }
+
+
+class MemoryReport:
+    """
+    The memory retained by the materialized services of the container. Create it through `IocContainer.memory_report`
+    """
+
+    def __init__(self, services: List[ServiceMemory], shared: int):
+        self.services = services
+        """The materialized services, by decreasing size"""
+        self.shared = shared
+        """The estimated bytes retained by several services, counted once"""
+
+    @property
+    def total(self) -> int:
+        """ The estimated bytes retained by all the services """
+        return sum(service.size for service in self.services) + self.shared
+
+    def by_module(self) -> Dict[type, int]:
+        """
+        :return: The estimated bytes retained by the services of each module alone
+        """
+        sizes: Dict[type, int] = {}
+        for service in self.services:
+            sizes[service.module] = sizes.get(service.module, 0) + service.size
+        return sizes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "shared": self.shared,
+            "modules": {module.__qualname__: size for module, size in self.by_module().items()},
+            "services": [service.to_dict() for service in self.services],
+        }
+
+    def summary(self, limit: int = 10) -> str:
+        """
+        :param limit: How many of the largest services to list
+        :return: A readable report of the memory retained by the services
+        """
+        lines = [f"{len(self.services)} materialized services, {_format_size(self.total)} "
+                 f"({_format_size(self.shared)} shared)"]
+        modules = sorted(self.by_module().items(), key=lambda item: item[1], reverse=True)
+        if modules:
+            lines.append("By module: " + ", ".join(f"{module.__qualname__} ({_format_size(size)})"
+                                                    for module, size in modules))
+        for service in self.services[:limit]:
+            details = [f"{service.objects} objects"]
+            if service.shared:
+                details.append(f"{_format_size(service.shared)} shared")
+            if service.allocated is not None:
+                details.append(f"{_format_size(service.allocated)} allocated at construction")
+            if service.pinned:
+                details.append("pinned")
+            lines.append(f"  {service.name}: {_format_size(service.size)} ({', '.join(details)})")
+        return "\n".join(lines)
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def build_report(roots: Iterable[Tuple[ServiceMemory, Any]], excluded: Iterable[Any] = ()) -> MemoryReport:
+    """
+    Estimate the memory retained by each service, walking the objects reachable from its root
+
+    :param roots: The services, with the object holding their instances
+    :param excluded: Other objects the walk must not enter, like the container
+    :return: The report
+    """
+    roots = list(roots)
+    # The walk of a service stops at the instances of the other services
+    stops = {id(root) for _, root in roots}
+    stops.update(id(obj) for obj in excluded)
+    owners: Dict[int, int] = {}
+    sizes: Dict[int, int] = {}
+    reached: List[Set[int]] = []
+    for index, (_, root) in enumerate(roots):
+        seen = _walk(root, stops - {id(root)}, sizes)
+        for obj_id in seen:
+            owner = owners.setdefault(obj_id, index)
+            if owner != index:
+                owners[obj_id] = _SHARED
+        reached.append(seen)
+
+    for (service, _), seen in zip(roots, reached):
+        for obj_id in seen:
+            if owners[obj_id] == _SHARED:
+                service.shared += sizes[obj_id]
+            else:
+                service.size += sizes[obj_id]
+                service.objects += 1
+    services = sorted((service for service, _ in roots), key=lambda service: service.size, reverse=True)
+    shared = sum(sizes[obj_id] for obj_id, owner in owners.items() if owner == _SHARED)
+    return MemoryReport(services, shared)
+
+
+def _walk(root: Any, stops: Set[int], sizes: Dict[int, int]) -> Set[int]:
+    """ The ids of the objects reachable from the root, recording their sizes """
+    seen = set()
+    pending = [root]
+    while pending:
+        obj = pending.pop()
+        obj_id = id(obj)
+        if obj_id in seen or obj_id in stops or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(obj_id)
+        if obj_id not in sizes:
+            sizes[obj_id] = sys.getsizeof(obj, 0)
+        pending.extend(gc.get_referents(obj))
+    return seen
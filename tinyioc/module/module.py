@@ -1,4 +1,4 @@
-from typing import TypeVar, Type, Dict, List
+from typing import TypeVar, Type, Dict, List, Union
 from .provide import Provide
 from ..service_entry import ServiceEntry
 
@@ -11,10 +11,18 @@ class IocModule:
     """
     services: Dict[Type[T], ServiceEntry[T]]
 
+    lazy_services: Dict[str, ServiceEntry[T]]
+    """Services registered by the import path of their interface, bound when first requested"""
+
+    services_shared: bool
+    """Whether the services are shared with a container snapshot, and must be copied before being changed"""
+
     provides: List[Provide]
 
     def __init__(self):
         self.services = {}
+        self.lazy_services = {}
+        self.services_shared = False
 
 
 class GlobalModule(IocModule):
@@ -26,15 +34,19 @@ E = TypeVar("E", bound=IocModule)
 
 class FromModule:
     """
-    Helper class to define the module from which a dependency is injected
+    Helper class to define the module from which a dependency is injected. The module can be referenced
+    by its import path, to import it only when the dependency is first injected
 
     Example:
 
      .. code-block::
      
         @inject()
-        def my_fun(dep_a: DependencyA = FromModule(ModuleA), dep_b: DependencyB = FromModule(ModuleB)):
+        def my_fun(dep_a: DependencyA = FromModule(ModuleA), dep_b: DependencyB = FromModule("pkg.sub:ModuleB")):
             ...
     """
-    def __init__(self, module: Type[E]):
+    def __init__(self, module: Union[Type[E], str]):
+        """
+        :param module: The module class, or its import path as `package.module:ModuleName`
+        """
         self.module = module
@@ -1,4 +1,8 @@
-from typing import Union, Type, TypeVar, Dict, Optional
+from typing import Union, Type, TypeVar, Dict, Optional, Callable
+
+from ..cache import LruCache
+from ..profiles import Condition, Profile
+from ..types import ServiceLifetime
 
 T = TypeVar("T")
 E = TypeVar("E")
@@ -9,40 +13,161 @@ class Provide:
     entry: Union[T, Type[T]]
     provide_for: Optional[Type[E]]
     kwargs: Optional[Dict]
+    profile: Optional[Profile] = None
+    """The profiles enabling the provider, once the container is activated"""
+    when: Optional[Condition] = None
+    """The condition enabling the provider, evaluated once when the container is activated"""
 
 
 class ProvideInstance(Provide):
     """ Class for providing instances in modules """
-    def __init__(self, entry: T, provide_for: Optional[Type[E]] = None):
+    def __init__(self, entry: T, provide_for: Optional[Type[E]] = None, *, profile: Optional[Profile] = None,
+                 when: Optional[Condition] = None):
         """
         :param entry: The instance to register
         :param provide_for: The interface class to register this instance as
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
         """
         self.entry = entry
         self.provide_for = provide_for
+        self.profile = profile
+        self.when = when
 
 
 class ProvideSingleton(Provide):
     """ Class for providing singletons in modules """
-    def __init__(self, entry: Type[T], provide_for: Optional[Type[E]] = None, **kwargs):
+    def __init__(self, entry: Type[T], provide_for: Optional[Type[E]] = None, *, profile: Optional[Profile] = None,
+                 when: Optional[Condition] = None, **kwargs):
         """
         :param entry: The class to register
         :param provide_for: The interface class to register this instance as
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
         :param kwargs: Arguments for the class constructor
         """
         self.entry = entry
         self.provide_for = provide_for
         self.kwargs = kwargs
+        self.profile = profile
+        self.when = when
 
 
 class ProvideTransient(Provide):
     """ Class for providing transient services in modules """
-    def __init__(self, entry: Type[T], provide_for: Optional[Type[E]] = None, **kwargs):
+    def __init__(self, entry: Type[T], provide_for: Optional[Type[E]] = None, *, profile: Optional[Profile] = None,
+                 when: Optional[Condition] = None, **kwargs):
+        """
+        :param entry: The class to register
+        :param provide_for: The interface class to register this instance as
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
+        :param kwargs: Arguments for the class constructor
+        """
+        self.entry = entry
+        self.provide_for = provide_for
+        self.kwargs = kwargs
+        self.profile = profile
+        self.when = when
+
+
+class ProvidePrototype(Provide):
+    """ Class for providing prototype services, copied from a template instance, in modules """
+    def __init__(self, entry: Type[T], provide_for: Optional[Type[E]] = None, *, profile: Optional[Profile] = None,
+                 when: Optional[Condition] = None, **kwargs):
+        """
+        :param entry: The class to register
+        :param provide_for: The interface class to register this instance as
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
+        :param kwargs: Arguments for the class constructor
+        """
+        self.entry = entry
+        self.provide_for = provide_for
+        self.kwargs = kwargs
+        self.profile = profile
+        self.when = when
+
+
+class ProvideThreadLocal(Provide):
+    """ Class for providing thread-local services in modules """
+    def __init__(self, entry: Type[T], provide_for: Optional[Type[E]] = None, *, profile: Optional[Profile] = None,
+                 when: Optional[Condition] = None, **kwargs):
+        """
+        :param entry: The class to register
+        :param provide_for: The interface class to register this instance as
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
+        :param kwargs: Arguments for the class constructor
+        """
+        self.entry = entry
+        self.provide_for = provide_for
+        self.kwargs = kwargs
+        self.profile = profile
+        self.when = when
+
+
+class ProvideRefreshing(Provide):
+    """ Class for providing services rebuilt periodically in the background in modules """
+    def __init__(self, entry: Type[T], refresh_interval: float, provide_for: Optional[Type[E]] = None, *,
+                 profile: Optional[Profile] = None, when: Optional[Condition] = None, **kwargs):
         """
         :param entry: The class to register
+        :param refresh_interval: The seconds between the rebuilds of the service
         :param provide_for: The interface class to register this instance as
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
         :param kwargs: Arguments for the class constructor
         """
         self.entry = entry
+        self.refresh_interval = refresh_interval
         self.provide_for = provide_for
         self.kwargs = kwargs
+        self.profile = profile
+        self.when = when
+
+
+class ProvideParameterized(Provide):
+    """ Class for providing parameterized services, one instance for each set of construction arguments, in modules """
+    def __init__(self, entry: Type[T], provide_for: Optional[Type[E]] = None,
+                 instance_cache: Optional[LruCache] = None, *, profile: Optional[Profile] = None,
+                 when: Optional[Condition] = None, **kwargs):
+        """
+        :param entry: The class to register
+        :param provide_for: The interface class to register this instance as
+        :param instance_cache: The cache of the instances, by construction arguments
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
+        :param kwargs: Arguments for the class constructor, besides the construction arguments
+        """
+        self.entry = entry
+        self.provide_for = provide_for
+        self.instance_cache = instance_cache
+        self.kwargs = kwargs
+        self.profile = profile
+        self.when = when
+
+
+class ProvideFactory(Provide):
+    """ Class for providing services built by a factory function in modules """
+    def __init__(self, entry: Callable[..., T], provide_for: Optional[Type[E]] = None,
+                 lifetime: ServiceLifetime = ServiceLifetime.SINGLETON, refresh_interval: Optional[float] = None,
+                 instance_cache: Optional[LruCache] = None, profile: Optional[Profile] = None,
+                 when: Optional[Condition] = None):
+        """
+        :param entry: The factory function (sync or async), its parameters are injected from the module
+        :param provide_for: The interface class to register the built service as, defaults to the return
+            annotation of the factory
+        :param lifetime: The lifetime of the built service
+        :param refresh_interval: The seconds between the rebuilds of a refreshing service
+        :param instance_cache: The cache of the instances of a parameterized service, by construction arguments
+        :param profile: The profiles enabling the provider, once the container is activated
+        :param when: The condition enabling the provider, evaluated once when the container is activated
+        """
+        self.entry = entry
+        self.provide_for = provide_for
+        self.lifetime = lifetime
+        self.refresh_interval = refresh_interval
+        self.instance_cache = instance_cache
+        self.profile = profile
+        self.when = when
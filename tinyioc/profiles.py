@@ -0,0 +1,59 @@
+"""
+Conditional registrations, kept until the container is activated with its profiles
+"""
+
+from typing import Any, Callable, FrozenSet, Iterable, Optional, Tuple, Union
+
+Profile = Union[str, Iterable[str]]
+"""A profile name, or several (the registration is active if any matches). A name prefixed with `!`
+matches when the profile is not active"""
+
+Condition = Callable[[], Any]
+"""A predicate enabling a registration when it returns a truthy value"""
+
+
+def profile_matches(profile: Profile, profiles: FrozenSet[str]) -> bool:
+    """
+    Check a profile expression against the active profiles
+
+    :param profile: The profile name (`"prod"`, or `"!prod"` when the profile is not active), or several
+    :param profiles: The active profiles
+    :return: Whether any of the names matches
+    """
+    names = [profile] if isinstance(profile, str) else list(profile)
+    for name in names:
+        if name.startswith("!"):
+            if name[1:] not in profiles:
+                return True
+        elif name in profiles:
+            return True
+    return False
+
+
+class Candidate:
+    """ A registration that only takes effect if its profile and condition match, once the container is activated """
+    __slots__ = ("key", "profile", "when", "entry")
+
+    def __init__(self, key: Tuple[Any, Any], profile: Optional[Profile], when: Optional[Condition], entry: Any):
+        """
+        :param key: The `(module, class-interface)` of the registration, to detect the ambiguous ones,
+            or their import paths for a service registered by path
+        :param profile: The profiles enabling the registration, if any
+        :param when: The condition enabling the registration, if any
+        :param entry: The service entry to register
+        """
+        self.key = key
+        self.profile = profile
+        self.when = when
+        self.entry = entry
+
+    def matches(self, profiles: FrozenSet[str]) -> bool:
+        """
+        Evaluate the profile and the condition of the registration
+
+        :param profiles: The active profiles
+        :return: Whether the registration is enabled
+        """
+        if self.profile is not None and not profile_matches(self.profile, profiles):
+            return False
+        return self.when is None or bool(self.when())
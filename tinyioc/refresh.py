@@ -0,0 +1,102 @@
+"""
+Background refresh of the services with the refreshing lifetime
+"""
+
+import asyncio
+import threading
+from typing import Callable, Awaitable, Optional, Any
+
+
+class Refresher:
+    """
+    Rebuild a service periodically, on a daemon thread or on an asyncio task, and swap the new instance in.
+    The current instance keeps being handed out while the next one is built, and a failed refresh
+    keeps the current instance until the next attempt
+    """
+
+    def __init__(self, svc: Any, interval: float, on_swap: Optional[Callable[[Any], None]] = None):
+        """
+        :param svc: The service entry to refresh
+        :param interval: The seconds between the end of a refresh and the start of the next one
+        :param on_swap: Called with the previous instance, once the new one is swapped in
+        """
+        self.svc = svc
+        self.interval = interval
+        self.on_swap = on_swap
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[BaseException] = None
+        self.__stopped = threading.Event()
+        self.__task: Optional[asyncio.Task] = None
+
+    @property
+    def stopped(self) -> bool:
+        return self.__stopped.is_set()
+
+    def start(self, build: Callable[[], Any]) -> None:
+        """
+        Refresh the service on a daemon thread
+
+        :param build: Builds a new instance of the service
+        """
+        name = f"tinyioc-refresh-{getattr(self.svc.iface, '__qualname__', self.svc.iface)}"
+        threading.Thread(target=self.__run, args=(build,), name=name, daemon=True).start()
+
+    def start_async(self, build: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Refresh the service on a task of the running event loop
+
+        :param build: Builds a new instance of the service
+        """
+        self.__task = asyncio.ensure_future(self.__arun(build))
+
+    def stop(self) -> None:
+        """ Stop refreshing the service. A refresh already running completes, but its instance is discarded """
+        self.__stopped.set()
+        task = self.__task
+        if task is not None and not task.done():
+            loop = task.get_loop()
+            # The loop may be closed already, e.g. once `asyncio.run` returned
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(task.cancel)
+
+    def __run(self, build: Callable[[], Any]) -> None:
+        while not self.__stopped.wait(self.interval):
+            try:
+                instance = build()
+            except Exception as e:
+                self.__fail(e)
+            else:
+                self.__swap(instance)
+
+    async def __arun(self, build: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            while not self.__stopped.is_set():
+                await asyncio.sleep(self.interval)
+                if self.__stopped.is_set():
+                    break
+                try:
+                    instance = await build()
+                except Exception as e:
+                    self.__fail(e)
+                else:
+                    self.__swap(instance)
+        except asyncio.CancelledError:
+            if not self.__stopped.is_set():
+                # Cancelled with its event loop: the service is no longer refreshed
+                self.__fail(RuntimeError("The refresh was cancelled with its event loop"))
+            raise
+
+    def __fail(self, error: BaseException) -> None:
+        self.failures += 1
+        self.last_error = error
+
+    def __swap(self, instance: Any) -> None:
+        if self.__stopped.is_set():
+            return
+        previous = self.svc.instance
+        # A single assignment: readers get either the previous or the new instance
+        self.svc.instance = instance
+        self.refreshes += 1
+        if self.on_swap is not None and previous is not None:
+            self.on_swap(previous)
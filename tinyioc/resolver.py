@@ -0,0 +1,67 @@
+from typing import Tuple, Type, Any, TypeVar, Callable, Optional, TYPE_CHECKING
+
+from .arguments import Arg
+from .module.module import IocModule
+from .service_entry import ServiceEntry
+from .types import ServiceLifetime
+
+if TYPE_CHECKING:
+    from .container import IocContainer
+
+E = TypeVar("E", bound=IocModule)
+
+
+class Resolver:
+    """
+    Reusable handle resolving a fixed set of services from a module, in a single pass.
+    The entries of the services are looked up once, and again only after the registry changed.
+    When they are all singletons, the instances are kept as well, once built.
+    Create it through `IocContainer.resolver`
+    """
+
+    def __init__(self, container: "IocContainer", class_types: Tuple[Type[Any], ...], module: Type[E],
+                 resolve_entry: Callable[[ServiceEntry[Any]], Any]):
+        """
+        :param container: The container
+        :param class_types: The class names
+        :param module: The module
+        :param resolve_entry: Gets the instance of a service entry according to its lifetime
+        """
+        self.container = container
+        self.class_types = class_types
+        self.module = module
+        self.__resolve_entry = resolve_entry
+        self.__generation = -1
+        self.__entries: Tuple[Optional[ServiceEntry[Any]], ...] = ()
+        self.__singletons = False
+        self.__instances: Optional[Tuple[Any, ...]] = None
+
+    def __lookup(self) -> None:
+        """ Look the entries up, with `None` for the missing services and the parameterized ones """
+        # Read before the entries: a change published meanwhile is looked up again by the next call
+        generation = self.container.generation
+        self.__entries = tuple(None if isinstance(class_type, Arg) else self.container.lookup(class_type, self.module)
+                               for class_type in self.class_types)
+        self.__singletons = all(svc is not None and svc.scope == ServiceLifetime.SINGLETON for svc in self.__entries)
+        self.__instances = None
+        self.__generation = generation
+
+    def resolve(self) -> Tuple[Any, ...]:
+        """
+        Retrieve the services
+
+        :return: The services, in the same order as the class names, with `None` for those that can't be retrieved
+        """
+        if self.__generation != self.container.generation:
+            self.__lookup()
+        elif self.__instances is not None:
+            return self.__instances
+        resolve_entry = self.__resolve_entry
+        instances = tuple([resolve_entry(svc) if svc is not None else self.container.get(class_type, self.module)
+                           for class_type, svc in zip(self.class_types, self.__entries)])
+        if self.__singletons:
+            # Singletons are only replaced, or released, by publishing a change
+            self.__instances = instances
+        return instances
+
+    __call__ = resolve
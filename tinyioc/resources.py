@@ -0,0 +1,317 @@
+"""
+Per-call resources, provided by generator factories: the code before the `yield` sets the resource up,
+the code after it tears it down once the injected function returns
+
+.. code-block::
+
+    def transaction(db: Database) -> Iterator[Transaction]:
+        tx = db.begin()
+        try:
+            yield tx
+        except Exception:
+            tx.rollback()
+            raise
+        else:
+            tx.commit()
+
+    register_factory(transaction, ServiceLifetime.TRANSIENT, register_for=Transaction)
+"""
+
+import asyncio
+import contextlib
+from typing import Any, AsyncGenerator, Callable, Generator, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from .injection_plan import InjectionPlan
+from .ioc_exception import IocException
+
+if TYPE_CHECKING:
+    from .container import IocContainer
+
+
+class Resource:
+    """
+    A resource provided by a generator factory, not yet set up: entering it runs the generator up to its `yield`,
+    exiting it runs the rest, raising the exception of the injected function at the `yield`.
+    Retrieved directly from the container, a resource service is returned as this context manager
+    """
+    __slots__ = ("gen",)
+
+    def __init__(self, gen: Generator[Any, None, None]):
+        self.gen = gen
+
+    def __enter__(self) -> Any:
+        try:
+            return next(self.gen)
+        except StopIteration:
+            raise IocException(f"The resource factory {self.gen.__qualname__} didn't yield")
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        if exc is None:
+            try:
+                next(self.gen)
+            except StopIteration:
+                return False
+            raise IocException(f"The resource factory {self.gen.__qualname__} yielded more than once")
+        try:
+            self.gen.throw(exc)
+        except StopIteration:
+            # The exception of the injected function is never suppressed by the teardown
+            return False
+        except BaseException as e:
+            if e is exc:
+                return False
+            raise
+        raise IocException(f"The resource factory {self.gen.__qualname__} yielded more than once")
+
+
+class AsyncResource:
+    """
+    A resource provided by an async generator factory, not yet set up.
+    Retrieved directly from the container, a resource service is returned as this async context manager
+    """
+    __slots__ = ("gen",)
+
+    def __init__(self, gen: AsyncGenerator[Any, None]):
+        self.gen = gen
+
+    async def __aenter__(self) -> Any:
+        try:
+            return await self.gen.__anext__()
+        except StopAsyncIteration:
+            raise IocException(f"The resource factory {self.gen.__qualname__} didn't yield")
+
+    async def __aexit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        if exc is None:
+            try:
+                await self.gen.__anext__()
+            except StopAsyncIteration:
+                return False
+            raise IocException(f"The resource factory {self.gen.__qualname__} yielded more than once")
+        try:
+            await self.gen.athrow(exc)
+        except StopAsyncIteration:
+            return False
+        except BaseException as e:
+            if e is exc:
+                return False
+            raise
+        raise IocException(f"The resource factory {self.gen.__qualname__} yielded more than once")
+
+
+RESOURCE_TYPES = frozenset((Resource, AsyncResource))
+
+PendingResources = List[Tuple[str, Union[Resource, AsyncResource]]]
+"""The resources to set up for a call, by parameter name"""
+
+
+def nested_resource(factory: Callable, args: Tuple[Any, ...], kwargs: dict, resources: PendingResources,
+                    is_async: bool = False) -> Union[Resource, AsyncResource]:
+    """
+    The resource of a generator factory depending on other resources: they are set up before it, in order,
+    and torn down after it, in reverse order, as part of the resources of the call
+
+    :param factory: The generator factory
+    :param args: The positional arguments of the factory
+    :param kwargs: The keyword arguments of the factory, filled with the resources once set up
+    :param resources: The resources the factory depends on, by parameter name
+    :param is_async: Whether the factory is an async generator
+    :return: The resource
+    :raises IocException: If a generator depends on the resource of an async generator
+    """
+    if is_async:
+        async def setup():
+            async with contextlib.AsyncExitStack() as stack:
+                for param, resource in resources:
+                    if isinstance(resource, AsyncResource):
+                        kwargs[param] = await stack.enter_async_context(resource)
+                    else:
+                        kwargs[param] = stack.enter_context(resource)
+                yield await stack.enter_async_context(AsyncResource(factory(*args, **kwargs)))
+
+        gen = setup()
+        gen.__qualname__ = factory.__qualname__
+        return AsyncResource(gen)
+
+    for param, resource in resources:
+        if isinstance(resource, AsyncResource):
+            raise IocException(f"The resource factory {factory.__qualname__} can't depend on the async resource "
+                               f"of its parameter '{param}'")
+
+    def setup():
+        with contextlib.ExitStack() as stack:
+            for param, resource in resources:
+                kwargs[param] = stack.enter_context(resource)
+            yield stack.enter_context(Resource(factory(*args, **kwargs)))
+
+    gen = setup()
+    gen.__qualname__ = factory.__qualname__
+    return Resource(gen)
+
+
+def inject_services(container: "IocContainer", plan: InjectionPlan, kwargs: dict,
+                    validated: bool = False) -> Optional[PendingResources]:
+    """
+    Retrieve the services of an injected function that the caller didn't pass, into its keyword arguments.
+    The resources are returned apart, to be set up around the call
+
+    :param container: The container
+    :param plan: The injection plan of the function
+    :param kwargs: The keyword arguments, filled with the services
+    :param validated: Whether the validation found every dependency registered, skipping the missing services check
+    :return: The resources, or `None` if there are none
+    """
+    resources = None
+    for param, cls_type, param_module in plan:
+        if param not in kwargs:
+            svc_instance = container.get(cls_type, param_module)
+            if svc_instance.__class__ in RESOURCE_TYPES:
+                if resources is None:
+                    resources = []
+                resources.append((param, svc_instance))
+            elif validated or svc_instance is not None:
+                kwargs[param] = svc_instance
+    return resources
+
+
+async def ainject_services(container: "IocContainer", plan: InjectionPlan,
+                           kwargs: dict) -> Optional[PendingResources]:
+    """
+    Retrieve the services of an injected coroutine function that the caller didn't pass, awaiting those provided by
+    async factories. See `inject_services`
+    """
+    resources = None
+    for param, cls_type, param_module in plan:
+        if param not in kwargs:
+            svc_instance = await container.aget(cls_type, param_module)
+            if svc_instance.__class__ in RESOURCE_TYPES:
+                if resources is None:
+                    resources = []
+                resources.append((param, svc_instance))
+            elif svc_instance is not None:
+                kwargs[param] = svc_instance
+    return resources
+
+
+def call_with_resources(fn: Callable, args: Tuple[Any, ...], kwargs: dict, resources: PendingResources) -> Any:
+    """
+    Call a function, setting up its resources before, in order, and tearing them down after, in reverse order,
+    also when the function raises
+
+    :param fn: The function
+    :param args: The positional arguments
+    :param kwargs: The keyword arguments, filled with the resources
+    :param resources: The resources, by parameter name
+    :return: The function result
+    """
+    for param, resource in resources:
+        if resource.__class__ is AsyncResource:
+            raise IocException(f"Parameter '{param}' requires a resource provided by an async generator, "
+                               f"which can only be injected into coroutine functions")
+
+    if len(resources) == 1:
+        # The common case, without the bookkeeping of several resources
+        param, resource = resources[0]
+        kwargs[param] = resource.__enter__()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            resource.__exit__(e.__class__, e, e.__traceback__)
+            raise
+        resource.__exit__(None, None, None)
+        return result
+
+    entered = []
+    try:
+        for param, resource in resources:
+            kwargs[param] = resource.__enter__()
+            entered.append(resource)
+        result = fn(*args, **kwargs)
+    except BaseException as e:
+        _close(entered, e)
+        raise
+    _close(entered, None)
+    return result
+
+
+async def acall_with_resources(fn: Callable, args: Tuple[Any, ...], kwargs: dict, resources: PendingResources) -> Any:
+    """
+    Call a coroutine function, setting up its resources before, in order, and tearing them down after,
+    in reverse order. The consecutive async resources are torn down concurrently
+
+    :param fn: The coroutine function
+    :param args: The positional arguments
+    :param kwargs: The keyword arguments, filled with the resources
+    :param resources: The resources, by parameter name
+    :return: The function result
+    """
+    entered = []
+    try:
+        for param, resource in resources:
+            if isinstance(resource, AsyncResource):
+                kwargs[param] = await resource.__aenter__()
+            else:
+                kwargs[param] = resource.__enter__()
+            entered.append(resource)
+        result = await fn(*args, **kwargs)
+    except BaseException as e:
+        await _aclose(entered, e)
+        raise
+    await _aclose(entered, None)
+    return result
+
+
+def _close(entered: List[Resource], error: Optional[BaseException]) -> None:
+    """ Tear down the resources in reverse order, raising the first teardown error, if any """
+    failure = None
+    for resource in reversed(entered):
+        try:
+            resource.__exit__(type(error) if error is not None else None, error,
+                              error.__traceback__ if error is not None else None)
+        except BaseException as e:
+            if failure is None:
+                failure = e
+    if failure is not None:
+        raise failure
+
+
+async def _aclose(entered: List[Union[Resource, AsyncResource]], error: Optional[BaseException]) -> None:
+    """
+    Tear down the resources in reverse order, the consecutive async ones concurrently,
+    raising the first teardown error, if any
+    """
+    exc_info = (type(error), error, error.__traceback__) if error is not None else (None, None, None)
+    failure = None
+    index = len(entered)
+    while index:
+        index -= 1
+        resource = entered[index]
+        if not isinstance(resource, AsyncResource):
+            try:
+                resource.__exit__(*exc_info)
+            except BaseException as e:
+                if failure is None:
+                    failure = e
+            continue
+        start = index
+        while start and isinstance(entered[start - 1], AsyncResource):
+            start -= 1
+        if start == index:
+            results = [await _aexit(resource, exc_info)]
+        else:
+            results = await asyncio.gather(*[resource.__aexit__(*exc_info)
+                                              for resource in reversed(entered[start:index + 1])],
+                                           return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and failure is None:
+                failure = result
+        index = start
+    if failure is not None:
+        raise failure
+
+
+async def _aexit(resource: AsyncResource, exc_info: Tuple[Any, Any, Any]) -> Any:
+    """ Tear down an async resource, returning its teardown error rather than raising it """
+    try:
+        return await resource.__aexit__(*exc_info)
+    except BaseException as e:
+        return e
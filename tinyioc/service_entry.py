@@ -1,5 +1,8 @@
-from typing import TypeVar, Optional, Type, Literal, Generic, Dict
+import inspect
+import threading
+from typing import TypeVar, Optional, Type, Literal, Generic, Dict, Callable, Awaitable, Any
 
+from tinyioc.cache import LruCache
 from tinyioc.types import ServiceLifetime
 
 T = TypeVar('T')
@@ -7,7 +10,70 @@ T = TypeVar('T')
 
 class ServiceEntry(Generic[T]):
     """ Service model class for the IOC container """
-    instance: Optional[T]
-    svc_type: Optional[Type[T]]
-    scope: ServiceLifetime
-    kwargs: Dict
+    instance: Optional[T] = None
+    svc_type: Optional[Type[T]] = None
+    scope: ServiceLifetime = ServiceLifetime.SINGLETON
+    kwargs: Optional[Dict] = None
+    deferred_kwargs: bool = False
+    """Whether some constructor arguments are evaluated when the service is built"""
+    factory: Optional[Callable[..., T]] = None
+    """The factory function building the service, if registered through a factory"""
+    plan: Optional[list] = None
+    """The injection plan of the factory, or of the fields of a dataclass, computed at registration"""
+    is_async: bool = False
+    """Whether the factory is a coroutine function, or an async generator"""
+    is_resource: bool = False
+    """Whether the factory is a generator, providing a resource set up and torn down around each injected call"""
+    lock: threading.RLock
+    """Serializes the construction of the singleton"""
+    pending: Optional[Awaitable[T]] = None
+    """The running construction of an async singleton"""
+    local: Optional[threading.local] = None
+    """The per-thread storage of a thread-local service"""
+    constructed: int = 0
+    """How many instances of the service have been built"""
+    threads: int = 0
+    """How many live threads hold an instance of a thread-local service"""
+    refresh_interval: Optional[float] = None
+    """The seconds between the rebuilds of a refreshing service"""
+    refresher: Optional[Any] = None
+    """The background refresh of a refreshing service, started when it is first built"""
+    instance_cache: Optional[LruCache] = None
+    """The instances of a parameterized service, by construction arguments"""
+    clone: Optional[Callable[[], T]] = None
+    """Copies the template instance of a prototype service, built when it is first requested"""
+    requested_module: Optional[type] = None
+    """The module requested at registration, which could have been replaced by the global module"""
+    iface: Optional[type] = None
+    """The class-interface the service is registered as"""
+    module: Optional[type] = None
+    """The module the service is registered into"""
+    registered_instance: bool = False
+    """Whether the instance was registered directly, rather than built by the container"""
+    source: Optional[str] = None
+    """The import path of the implementation, for services registered by path"""
+    is_factory: bool = False
+    """Whether the import path refers to a factory function"""
+    on_dispose: Optional[Callable[[T], None]] = None
+    """Called with the instance of a replaced entry, once it's no longer handed out"""
+    pinned: bool = False
+    """Whether the singleton is kept when the container releases the unpinned singletons"""
+    allocated: Optional[int] = None
+    """The bytes allocated by the last construction, when `tracemalloc` was tracing"""
+
+    def __init__(self, instance: Optional[T] = None, svc_type: Optional[Type[T]] = None,
+                 scope: ServiceLifetime = ServiceLifetime.SINGLETON, kwargs: Optional[Dict] = None,
+                 factory: Optional[Callable[..., T]] = None, registered_instance: bool = False,
+                 refresh_interval: Optional[float] = None, instance_cache: Optional[LruCache] = None):
+        self.instance = instance
+        self.svc_type = svc_type
+        self.scope = scope
+        self.kwargs = kwargs
+        self.factory = factory
+        self.registered_instance = registered_instance
+        self.refresh_interval = refresh_interval
+        self.instance_cache = instance_cache
+        self.lock = threading.RLock()
+        if factory is not None:
+            self.is_async = inspect.iscoroutinefunction(factory) or inspect.isasyncgenfunction(factory)
+            self.is_resource = inspect.isgeneratorfunction(factory) or inspect.isasyncgenfunction(factory)
@@ -0,0 +1,28 @@
+"""
+Pytest fixtures isolating the container state between tests.
+The module is registered as a pytest plugin, so the fixtures are available once tinyioc is installed
+"""
+
+import pytest
+
+from .container import IocContainer
+
+
+@pytest.fixture
+def ioc_container():
+    """
+    Provide the container singleton, restoring its registry after the test:
+    the services and modules registered by the test are discarded
+
+    Example:
+
+    .. code-block::
+
+        def test_checkout(ioc_container):
+            register_instance(FakePaymentGateway(), register_for=PaymentGateway)
+            ...
+    """
+    container = IocContainer.get_instance()
+    snapshot = container.snapshot()
+    yield container
+    container.restore(snapshot)
@@ -3,10 +3,21 @@ from enum import Enum
 
 class ServiceLifetime(Enum):
     """
-    The service lifetime. Can be singleton (one instance shared through the whole app)
-    or transient (new instance every time it is injected)
+    The service lifetime. Can be singleton (one instance shared through the whole app),
+    transient (new instance every time it is injected), thread-local (one instance per thread),
+    refreshing (one instance shared through the whole app, rebuilt periodically in the background),
+    parameterized (one instance for each set of construction arguments)
+    or prototype (a copy of a template instance every time it is injected)
     """
     SINGLETON = 0
     """Singleton scope: one instance shared through the whole app"""
     TRANSIENT = 1
     """Transient scope: new instance every time it is injected"""
+    THREAD_LOCAL = 2
+    """Thread-local scope: one instance for each thread, released when the thread ends"""
+    REFRESHING = 3
+    """Refreshing scope: one instance shared through the whole app, rebuilt every `refresh_interval` seconds"""
+    PARAMETERIZED = 4
+    """Parameterized scope: one instance for each set of construction arguments, kept in a bounded cache"""
+    PROTOTYPE = 5
+    """Prototype scope: a copy of a template instance, built once, every time it is injected"""